@@ -0,0 +1,87 @@
+"""
+逐帧数据通路基准 (不含模型)：比较 UNet 之外的帧转换开销。
+  legacy : JPEG 解码 -> PIL -> float 数组 (管线预处理) ... float 数组 -> PIL -> JPEG 编码
+  array  : 帧存储中的 uint8 数组 -> float 张量 ... float 张量 -> uint8 数组 (直接写入编码管道)
+安装了 torch 时 array 路径使用 TensorFrameIO (有 CUDA 时在显存中完成)，否则用 NumPy 模拟同等转换。
+完整管线上的前后对比请在设置中开启 profile_frames，并分别以 tensor_io=True/False 渲染同一段视频。
+
+用法: python benchmarks/bench_frame_path.py [--frames 100] [--width 512] [--height 288]
+"""
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_path(jpeg_bytes):
+    # 旧流程：磁盘 JPEG -> PIL -> 管线预处理 (float32 / 255) ... 输出 -> PIL -> JPEG
+    img = Image.open(io.BytesIO(jpeg_bytes)).convert("RGB")
+    pre = np.asarray(img, dtype=np.float32) / 255.0
+    post = Image.fromarray((pre * 255).round().astype(np.uint8))
+    buf = io.BytesIO()
+    post.save(buf, format="JPEG", quality=95)
+    return buf.tell()
+
+
+def numpy_path(frame):
+    pre = frame.astype(np.float32) / 255.0
+    return (pre * 255).round().astype(np.uint8).nbytes
+
+
+def make_tensor_path(height, width):
+    try:
+        import torch
+        from core.tensor_io import TensorFrameIO
+    except ImportError:
+        return None, "numpy"
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    io_ = TensorFrameIO(height, width, device=device)
+
+    def run(frame):
+        tensor = io_.to_input(frame)
+        out = io_.to_numpy(tensor)
+        return out.nbytes
+
+    return run, f"torch-{device}"
+
+
+def timed(fn, inputs):
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - start) / len(inputs) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="逐帧数据通路基准")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=288)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, size=(args.height, args.width, 3), dtype=np.uint8)
+              for _ in range(args.frames)]
+    jpegs = []
+    for frame in frames:
+        buf = io.BytesIO()
+        Image.fromarray(frame).save(buf, format="JPEG", quality=95)
+        jpegs.append(buf.getvalue())
+
+    tensor_fn, tensor_name = make_tensor_path(args.height, args.width)
+    print(f">> {args.frames} 帧 {args.width}x{args.height}，每帧平均耗时 (ms)")
+    print(f"legacy (PIL + JPEG) : {timed(legacy_path, jpegs):8.2f}")
+    print(f"array  (numpy)      : {timed(numpy_path, frames):8.2f}")
+    if tensor_fn is not None:
+        print(f"array  ({tensor_name:<11}): {timed(tensor_fn, frames):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
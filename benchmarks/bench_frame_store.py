@@ -0,0 +1,92 @@
+"""
+中间帧存储基准：比较 JPEG 图片序列 / 分段内存映射文件 / 分块压缩文件
+的写入、顺序读取、随机读取耗时以及文件数量与磁盘占用。
+
+用法: python benchmarks/bench_frame_store.py [--frames 240] [--width 512] [--height 288]
+仅依赖 numpy 与 Pillow，无需 GPU / ffmpeg。
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_store import create_frame_store, open_frame_store, store_path  # noqa: E402
+
+
+def synthetic_frames(n, width, height, seed=0):
+    """生成带平滑渐变与噪声的合成帧 (比纯随机噪声更接近真实画面的可压缩性)"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    for i in range(n):
+        base = ((xx + yy + i * 4) % 256).astype(np.uint8)
+        noise = rng.integers(0, 16, size=(height, width), dtype=np.uint8)
+        yield np.stack([base, base // 2 + noise, 255 - base], axis=-1)
+
+
+def disk_usage(path):
+    if os.path.isdir(path):
+        files = [os.path.join(path, f) for f in os.listdir(path)]
+    else:
+        # chunked 的 .idx 索引、memmap 的各段文件
+        files = [p for p in [path] + glob.glob(glob.escape(path) + ".*") if os.path.exists(p)]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def bench(kind, frames, work_dir, random_reads):
+    base = os.path.join(work_dir, kind)
+
+    start = time.perf_counter()
+    store = create_frame_store(kind, base)
+    for frame in frames:
+        store.append(frame)
+    store.close()
+    write_s = time.perf_counter() - start
+
+    store = open_frame_store(kind, base)
+    start = time.perf_counter()
+    checksum = 0
+    for frame in store:
+        checksum += int(frame[0, 0, 0])
+    seq_s = time.perf_counter() - start
+
+    order = list(range(len(store)))
+    random.Random(0).shuffle(order)
+    order = order[:random_reads]
+    start = time.perf_counter()
+    for idx in order:
+        checksum += int(store[idx][0, 0, 0])
+    rand_s = time.perf_counter() - start
+    store.close()
+
+    n_files, size = disk_usage(store_path(kind, base))
+    return write_s, seq_s, rand_s / max(1, len(order)), n_files, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="中间帧存储基准")
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--height", type=int, default=288)
+    parser.add_argument("--random-reads", type=int, default=100)
+    args = parser.parse_args()
+
+    frames = list(synthetic_frames(args.frames, args.width, args.height))
+    print(f">> {args.frames} 帧 {args.width}x{args.height}")
+    print(f"{'格式':<10}{'写入(s)':>10}{'顺序读(s)':>12}{'随机读(ms/帧)':>16}{'文件数':>8}{'体积(MB)':>10}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for kind in ("jpeg", "memmap", "chunked"):
+            write_s, seq_s, rand_s, n_files, size = bench(kind, frames, work_dir, args.random_reads)
+            print(f"{kind:<10}{write_s:>10.3f}{seq_s:>12.3f}{rand_s * 1000:>16.3f}"
+                  f"{n_files:>8}{size / 1024 / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+显存策略基准：在若干分辨率下依次以手动模式套用每一种 (注意力切片, VAE 切片, VAE 分块) 组合生成一帧，报告
+  - 实测显存峰值 (torch.cuda.max_memory_allocated，扣除加载后的常驻占用) 与 core/memory_policy.py 的估算值
+  - 每帧耗时 (ms)；显存不足的组合记为 OOM
+最后列出 auto 模式在当前可用显存下为每个分辨率选择的组合，用于校准估算系数。
+
+依赖: torch, diffusers (需要 GPU 与本地模型)
+用法: python benchmarks/bench_memory_policy.py --model model.safetensors [--widths 512,768,1024] [--batch 1] [--steps 10]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import memory_policy
+from core.config import GenerationConfig
+from core.pipeline_utils import PipelineLoader
+
+
+def run_once(pipe, config, width, height, batch_size):
+    """生成一次，返回 (激活峰值字节数, 耗时 ms)"""
+    import torch
+    from PIL import Image
+
+    image = Image.new("RGB", (width, height), (128, 128, 128))
+    torch.cuda.synchronize()
+    torch.cuda.reset_peak_memory_stats()
+    base = torch.cuda.memory_allocated()
+    start = time.perf_counter()
+    pipe(
+        **PipelineLoader.prompt_kwargs(pipe, config, batch_size=batch_size),
+        image=[image] * batch_size if batch_size > 1 else image,
+        num_inference_steps=config.steps,
+        guidance_scale=config.cfg_scale,
+        strength=1.0,
+        generator=torch.Generator(device="cuda").manual_seed(config.seed),
+    )
+    torch.cuda.synchronize()
+    return torch.cuda.max_memory_allocated() - base, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="显存策略基准 (各组合的显存峰值与速度)")
+    parser.add_argument("--model", required=True, help=".safetensors 模型路径")
+    parser.add_argument("--widths", default="512,768,1024", help="逗号分隔的宽度列表 (高度按 16:9 计算)")
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    import torch
+
+    config = GenerationConfig(model_path=args.model, enable_pose=False, steps=args.steps, memory_policy="manual")
+    pipe = PipelineLoader.get_pipeline(config)
+    efficient = memory_policy.efficient_attention_available(config)
+    print(f">> {torch.cuda.get_device_name()}，高效注意力: {'是' if efficient else '否'}，批大小 {args.batch}")
+
+    sizes = []
+    for width in (int(w) for w in args.widths.split(",")):
+        sizes.append((width // 8 * 8, width * 9 // 16 // 8 * 8))
+
+    print(f"{'分辨率':<12}{'组合':<28}{'估算(GB)':>10}{'实测(GB)':>10}{'每帧(ms)':>10}")
+    for width, height in sizes:
+        for combo in memory_policy.COMBINATIONS:
+            config.attention_slicing, config.vae_slicing, config.vae_tiling = combo
+            PipelineLoader.apply_memory_options(pipe, config)
+            estimate = memory_policy.estimate_peak_bytes(width, height, args.batch, combo, efficient)
+            try:
+                run_once(pipe, config, width, height, args.batch)  # 预热
+                peak, ms = run_once(pipe, config, width, height, args.batch)
+                measured, timing = f"{peak / 1024 ** 3:.2f}", f"{ms:.0f}"
+            except torch.cuda.OutOfMemoryError:
+                measured, timing = "OOM", "-"
+                torch.cuda.empty_cache()
+            print(f"{width}x{height:<7}{memory_policy.describe(combo):<28}"
+                  f"{estimate / 1024 ** 3:>10.2f}{measured:>10}{timing:>10}")
+
+    config.memory_policy = "auto"
+    for width, height in sizes:
+        _, text = memory_policy.choose(config, width, height, args.batch)
+        print(f">> auto: {text}")
+    PipelineLoader.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+姿态检测后端基准：在 CPU 上比较各后端、各检测分辨率下的单帧耗时与吞吐 (帧/秒)，
+以及检测到的骨骼像素占比 (粗略反映是否检出人体)。controlnet_aux 的 OpenPose 默认加载在 CPU 上。
+
+依赖: controlnet_aux (OpenPose)、mediapipe (MediaPipe)、opencv；未安装的后端自动跳过
+用法: python benchmarks/bench_pose_backends.py [--video clip.mp4] [--frames 30] [--width 512]
+          [--backends openpose,mediapipe] [--resolutions 256,512]
+      不指定 --video 时使用合成帧 (只能反映耗时)
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pose_backends import POSE_BACKENDS
+
+
+def load_frames(video, frames, width):
+    if not video:
+        rng = np.random.default_rng(0)
+        height = width * 9 // 16 // 8 * 8
+        return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(frames)]
+
+    from core.video_io import probe_video_size, scaled_size, decode_frames
+
+    src_w, src_h = probe_video_size(video)
+    w, h = scaled_size(src_w, src_h, width)
+    clip = []
+    for frame in decode_frames(video, 12, w, h):
+        clip.append(frame.copy())
+        if len(clip) >= frames:
+            break
+    return clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description="姿态检测后端吞吐基准 (CPU)")
+    parser.add_argument("--video", default="", help="测试片段路径 (留空使用合成帧)")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--backends", default=",".join(POSE_BACKENDS))
+    parser.add_argument("--resolutions", default="256,512")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width)
+    print(f">> {len(frames)} 帧, {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"{'后端':<12}{'检测分辨率':>10}{'每帧(ms)':>12}{'吞吐(fps)':>12}{'骨骼像素':>10}")
+
+    for name in args.backends.split(","):
+        for resolution in (int(r) for r in args.resolutions.split(",")):
+            try:
+                backend = POSE_BACKENDS[name](resolution)
+            except ImportError as e:
+                print(f"{name:<12}{resolution:>10}  跳过: {e}")
+                break
+            backend.detect(frames[0])  # 预热 (模型加载/图构建)
+            start = time.perf_counter()
+            coverage = 0.0
+            for frame in frames:
+                coverage += (backend.detect(frame).max(axis=2) > 0).mean()
+            elapsed = time.perf_counter() - start
+            backend.close()
+            print(f"{name:<12}{resolution:>10}{elapsed / len(frames) * 1000:>12.1f}"
+                  f"{len(frames) / elapsed:>12.1f}{coverage / len(frames) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
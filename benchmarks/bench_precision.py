@@ -0,0 +1,128 @@
+"""
+CPU 推理精度基准：依次以 fp32 / bf16 / int8 加载管线并以图生图模式渲染前若干帧，报告
+  - 加载耗时 (int8 额外报告从量化缓存再次加载的耗时)
+  - 每帧耗时 (ms) 与相对 fp32 的加速
+  - 与 fp32 输出的差异：PSNR 与平均绝对误差 (0~255)
+
+强制使用 CPU (屏蔽 CUDA 设备)。依赖: torch, diffusers, ffmpeg 与本地模型
+用法: python benchmarks/bench_precision.py clip.mp4 --model model.safetensors
+          [--modes fp32,bf16,int8] [--frames 4] [--width 384] [--steps 10]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+os.environ["CUDA_VISIBLE_DEVICES"] = ""  # 必须在导入 torch 之前设置
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import GenerationConfig
+from core.pipeline_utils import PipelineLoader
+from core.precision import resolve_precision
+
+
+def load_clip(video_path, fps, width, frames):
+    from core.video_io import probe_video_size, scaled_size, decode_frames
+
+    src_w, src_h = probe_video_size(video_path)
+    w, h = scaled_size(src_w, src_h, width)
+    clip = []
+    for frame in decode_frames(video_path, fps, w, h):
+        clip.append(frame.copy())
+        if len(clip) >= frames:
+            break
+    return clip
+
+
+def load(config):
+    """冷加载管线 (释放常驻管线后重新加载)，返回 (管线, 耗时 s)"""
+    PipelineLoader.release()
+    start = time.perf_counter()
+    pipe = PipelineLoader.get_pipeline(config)
+    return pipe, time.perf_counter() - start
+
+
+def render(pipe, config, clip):
+    """返回 (输出帧列表, 每帧平均耗时 ms)；第一帧作为预热不计时"""
+    import torch
+    from PIL import Image
+
+    prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, config)
+    outputs = []
+    elapsed = 0.0
+    for i, frame in enumerate(clip):
+        start = time.perf_counter()
+        image = pipe(
+            **prompt_kwargs,
+            image=Image.fromarray(frame),
+            num_inference_steps=config.steps,
+            guidance_scale=config.cfg_scale,
+            strength=config.denoising_strength,
+            generator=torch.Generator(device="cpu").manual_seed(config.seed),
+        ).images[0]
+        if i > 0 or len(clip) == 1:
+            elapsed += time.perf_counter() - start
+        outputs.append(np.asarray(image.convert("RGB")))
+    return outputs, elapsed / max(1, len(clip) - 1) * 1000
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU 推理精度基准 (fp32 / bf16 / int8)")
+    parser.add_argument("video", help="测试片段路径")
+    parser.add_argument("--model", required=True, help=".safetensors 模型路径")
+    parser.add_argument("--modes", default="fp32,bf16,int8")
+    parser.add_argument("--frames", type=int, default=4)
+    parser.add_argument("--fps", type=int, default=12)
+    parser.add_argument("--width", type=int, default=384)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--strength", type=float, default=0.6)
+    args = parser.parse_args()
+
+    import torch
+    print(f">> torch {torch.__version__}, {torch.get_num_threads()} 线程")
+
+    clip = load_clip(args.video, args.fps, args.width, args.frames)
+    if not clip:
+        raise SystemExit("无法从测试片段中解码帧")
+    print(f">> 测试片段: {len(clip)} 帧, {clip[0].shape[1]}x{clip[0].shape[0]}, {args.steps} 步")
+
+    config = GenerationConfig(model_path=args.model, enable_pose=False, steps=args.steps,
+                              denoising_strength=args.strength)
+    modes = args.modes.split(",")
+    if "fp32" in modes:
+        modes.remove("fp32")
+    modes.insert(0, "fp32")  # fp32 作为速度与画质的基线
+
+    print(f"{'精度':<8}{'加载(s)':>10}{'缓存加载(s)':>14}{'每帧(ms)':>12}{'加速':>8}{'PSNR(dB)':>10}{'MAE':>8}")
+    baseline, baseline_ms = None, None
+    for mode in modes:
+        config.inference_precision = mode
+        actual = resolve_precision(config, "cpu")
+        if actual != mode:
+            print(f"{mode:<8}  跳过: 当前 CPU 不支持")
+            continue
+        pipe, load_s = load(config)
+        cached = "-"
+        if mode == "int8":
+            # 第一次加载会量化并写入缓存，再冷加载一次即为之后的加载耗时
+            del pipe
+            pipe, cached_s = load(config)
+            cached = f"{cached_s:.1f}"
+        outputs, ms = render(pipe, config, clip)
+        if baseline is None:
+            baseline, baseline_ms = outputs, ms
+        quality = np.mean([psnr(o, b) for o, b in zip(outputs, baseline)])
+        mae = np.mean([np.abs(o.astype(np.int16) - b.astype(np.int16)).mean() for o, b in zip(outputs, baseline)])
+        print(f"{mode:<8}{load_s:>10.1f}{cached:>14}{ms:>12.0f}{baseline_ms / ms:>8.2f}{quality:>10.2f}{mae:>8.2f}")
+    PipelineLoader.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+采样器基准：在固定测试片段上，对每个采样器 × 步数组合以图生图模式渲染前若干帧，报告
+  - 每帧耗时 (ms)
+  - PSNR：与参考结果 (默认 DPM++ 2M Karras 50 步) 的峰值信噪比，作为画质的粗略代理
+  - 闪烁：相邻输出帧的平均差异 / 相邻输入帧的平均差异 (越接近 1 越稳定)
+
+依赖: torch, diffusers, ffmpeg (需要 GPU 与本地模型)
+用法: python benchmarks/bench_schedulers.py clip.mp4 --model model.safetensors
+          [--schedulers unipc,dpmpp_2m_karras,euler] [--steps 10,20,30] [--frames 8]
+      使用 LCM 时需额外提供 --distill-lora lcm_lora.safetensors
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import GenerationConfig
+from core.schedulers import SCHEDULERS, SchedulerRegistry
+
+
+def load_clip(video_path, fps, width, frames):
+    from core.video_io import probe_video_size, scaled_size, decode_frames
+
+    src_w, src_h = probe_video_size(video_path)
+    w, h = scaled_size(src_w, src_h, width)
+    clip = []
+    for frame in decode_frames(video_path, fps, w, h):
+        clip.append(frame.copy())
+        if len(clip) >= frames:
+            break
+    return clip
+
+
+def render(config, clip):
+    """按配置渲染整段片段，返回 (输出帧列表, 每帧平均耗时 ms)"""
+    import torch
+    from PIL import Image
+    from core.pipeline_utils import PipelineLoader
+
+    pipe = PipelineLoader.get_pipeline(config)
+    prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, config)
+    outputs = []
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for frame in clip:
+        image = pipe(
+            **prompt_kwargs,
+            image=Image.fromarray(frame),
+            num_inference_steps=config.steps,
+            guidance_scale=config.cfg_scale,
+            strength=config.denoising_strength,
+            generator=torch.Generator(device="cuda").manual_seed(config.seed),
+        ).images[0]
+        outputs.append(np.asarray(image.convert("RGB")))
+    torch.cuda.synchronize()
+    return outputs, (time.perf_counter() - start) / len(clip) * 1000
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def flicker(outputs, clip):
+    def mean_step(frames):
+        return np.mean([np.abs(x.astype(np.int16) - y.astype(np.int16)).mean()
+                        for x, y in zip(frames, frames[1:])])
+
+    if len(clip) < 2:
+        return 0.0
+    return mean_step(outputs) / max(mean_step(clip), 1e-6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采样器 × 步数 基准 (图生图，固定测试片段)")
+    parser.add_argument("video", help="测试片段路径")
+    parser.add_argument("--model", required=True, help=".safetensors 模型路径")
+    parser.add_argument("--schedulers", default=",".join(n for n, s in SCHEDULERS.items() if not s["distilled"]))
+    parser.add_argument("--steps", default="", help="步数列表，留空则为每个采样器的 最少步数/推荐步数")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--fps", type=int, default=12)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--strength", type=float, default=0.6)
+    parser.add_argument("--reference", default="dpmpp_2m_karras")
+    parser.add_argument("--reference-steps", type=int, default=50)
+    parser.add_argument("--distill-lora", default="", help="少步蒸馏采样器 (LCM) 的 LoRA 权重")
+    args = parser.parse_args()
+
+    config = GenerationConfig(model_path=args.model, enable_pose=False, denoising_strength=args.strength,
+                              target_width=args.width, distill_lora_path=args.distill_lora)
+    clip = load_clip(args.video, args.fps, args.width, args.frames)
+    if not clip:
+        raise SystemExit("无法从测试片段中解码帧")
+    print(f">> 测试片段: {len(clip)} 帧, {clip[0].shape[1]}x{clip[0].shape[0]}")
+
+    base_cfg = config.cfg_scale
+    config.scheduler, config.steps = args.reference, args.reference_steps
+    reference, _ = render(config, clip)
+
+    print(f"{'采样器':<22}{'步数':>6}{'每帧(ms)':>12}{'PSNR(dB)':>10}{'闪烁':>8}")
+    for name in args.schedulers.split(","):
+        spec = SchedulerRegistry.spec(name)
+        steps = [int(s) for s in args.steps.split(",")] if args.steps else sorted({spec["min_steps"], spec["steps"]})
+        config.scheduler = name
+        config.cfg_scale = spec["cfg"] if spec["cfg"] is not None else base_cfg
+        for step in steps:
+            config.steps = step
+            try:
+                SchedulerRegistry.check(config)
+            except ValueError as e:
+                print(f"{spec['label']:<22}{step:>6}  跳过: {e}")
+                break
+            outputs, ms = render(config, clip)
+            quality = np.mean([psnr(o, r) for o, r in zip(outputs, reference)])
+            print(f"{spec['label']:<22}{step:>6}{ms:>12.0f}{quality:>10.2f}{flicker(outputs, clip):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
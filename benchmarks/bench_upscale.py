@@ -0,0 +1,145 @@
+"""
+低分辨率生成 + 放大 基准：
+  1. 放大阶段 (纯 CPU)：把输出分辨率的帧缩小到生成分辨率再放大回来，报告每个放大方式的
+     每帧耗时与相对原帧的 PSNR (放大质量的粗略代理)。未提供视频时使用合成纹理帧。
+  2. 整体对比 (提供 --model 时，需要 GPU)：以输出宽度直接生成 vs 以生成宽度生成再放大，
+     报告每帧总耗时 (生成 + 放大) 与两者输出之间的 PSNR。
+
+用法: python benchmarks/bench_upscale.py [clip.mp4] [--width 1080] [--render-width 512] [--frames 8]
+          [--learned-model ESPCN_x2.pb] [--model model.safetensors --steps 20 --strength 0.6]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import GenerationConfig
+from core.upscale import LanczosUpscaler, LearnedUpscaler
+from core.video_io import scaled_size
+
+
+def load_clip(video_path, fps, width, frames):
+    from core.video_io import probe_video_size, decode_frames
+
+    src_w, src_h = probe_video_size(video_path)
+    w, h = scaled_size(src_w, src_h, width)
+    clip = []
+    for frame in decode_frames(video_path, fps, w, h):
+        clip.append(frame.copy())
+        if len(clip) >= frames:
+            break
+    return clip
+
+
+def synthetic_clip(width, frames, seed=0):
+    """带边缘与细节的合成帧 (16:9)：低频色块 + 高频噪声"""
+    rng = np.random.default_rng(seed)
+    height = max(2, width * 9 // 16 // 2 * 2)
+    blocks = rng.integers(0, 256, (height // 16 + 1, width // 16 + 1, 3)).astype(np.float32)
+    base = np.repeat(np.repeat(blocks, 16, axis=0), 16, axis=1)[:height, :width]
+    return [np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8) for _ in range(frames)]
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def downscale(frame, size):
+    import cv2
+
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def bench_upscalers(upscalers, clip, render_size):
+    out_size = (clip[0].shape[1], clip[0].shape[0])
+    small = [downscale(f, render_size) for f in clip]
+    print(f"{'放大方式':<16}{'每帧(ms)':>10}{'帧/秒':>8}{'PSNR(dB)':>10}")
+    for upscaler in upscalers:
+        upscaler.upscale(small[0], out_size)  # 预热 (dnn 首次推理会初始化)
+        start = time.perf_counter()
+        outputs = [upscaler.upscale(f, out_size) for f in small]
+        elapsed = (time.perf_counter() - start) / len(small)
+        quality = np.mean([psnr(o, f) for o, f in zip(outputs, clip)])
+        print(f"{upscaler.label:<16}{elapsed * 1000:>10.1f}{1 / elapsed:>8.0f}{quality:>10.2f}")
+
+
+def render(config, clip):
+    """按配置以图生图方式渲染，返回 (输出帧列表, 每帧平均耗时 ms)"""
+    import torch
+    from PIL import Image
+    from core.pipeline_utils import PipelineLoader
+
+    pipe = PipelineLoader.get_pipeline(config)
+    prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, config)
+    outputs = []
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for frame in clip:
+        image = pipe(
+            **prompt_kwargs,
+            image=Image.fromarray(frame),
+            num_inference_steps=config.steps,
+            guidance_scale=config.cfg_scale,
+            strength=config.denoising_strength,
+            generator=torch.Generator(device="cuda").manual_seed(config.seed),
+        ).images[0]
+        outputs.append(np.asarray(image.convert("RGB")))
+    torch.cuda.synchronize()
+    return outputs, (time.perf_counter() - start) / len(clip) * 1000
+
+
+def bench_pipeline(args, clip, render_size, upscalers):
+    out_size = (clip[0].shape[1], clip[0].shape[0])
+    config = GenerationConfig(model_path=args.model, enable_pose=False, steps=args.steps,
+                              denoising_strength=args.strength)
+    native, native_ms = render(config, clip)
+    small, gen_ms = render(config, [downscale(f, render_size) for f in clip])
+
+    print(f"{'方式':<28}{'每帧(ms)':>10}{'加速':>8}{'PSNR(dB)':>10}")
+    print(f"{f'原生 {out_size[0]}x{out_size[1]}':<28}{native_ms:>10.0f}{1.0:>8.2f}{'-':>10}")
+    for upscaler in upscalers:
+        start = time.perf_counter()
+        outputs = [upscaler.upscale(f, out_size) for f in small]
+        total_ms = gen_ms + (time.perf_counter() - start) / len(small) * 1000
+        quality = np.mean([psnr(o, n) for o, n in zip(outputs, native)])
+        name = f"{render_size[0]}x{render_size[1]} + {upscaler.label}"
+        print(f"{name:<28}{total_ms:>10.0f}{native_ms / total_ms:>8.2f}{quality:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="低分辨率生成 + 放大 基准")
+    parser.add_argument("video", nargs="?", default="", help="测试片段路径 (留空使用合成帧)")
+    parser.add_argument("--width", type=int, default=1080, help="输出宽度")
+    parser.add_argument("--render-width", type=int, default=512, help="生成宽度")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--fps", type=int, default=12)
+    parser.add_argument("--learned-model", default="", help="ESPCN/FSRCNN .pb 权重 (OpenCV dnn_superres 格式)")
+    parser.add_argument("--model", default="", help=".safetensors 模型路径，提供时对比整体生成耗时")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--strength", type=float, default=0.6)
+    args = parser.parse_args()
+
+    clip = load_clip(args.video, args.fps, args.width, args.frames) if args.video \
+        else synthetic_clip(args.width, args.frames)
+    if not clip:
+        raise SystemExit("无法从测试片段中解码帧")
+    h, w = clip[0].shape[:2]
+    render_size = scaled_size(w, h, args.render_width)
+    print(f">> {len(clip)} 帧: 生成 {render_size[0]}x{render_size[1]} -> 输出 {w}x{h}")
+
+    upscalers = [LanczosUpscaler()]
+    if args.learned_model:
+        upscalers.append(LearnedUpscaler(args.learned_model))
+
+    bench_upscalers(upscalers, clip, render_size)
+    if args.model:
+        bench_pipeline(args, clip, render_size, upscalers)
+
+
+if __name__ == "__main__":
+    main()
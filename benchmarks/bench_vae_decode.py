@@ -0,0 +1,125 @@
+"""
+VAE 解码基准：在测试片段上以图生图模式渲染前若干帧，比较
+  - 管线内同步解码 (原路径)
+  - 独立解码阶段与下一帧去噪重叠 (core/vae_decode.py)
+报告每帧耗时与两者输出的最大差异 (应为 0 或 ±1 的舍入差异)，并单独测量完整 VAE 与近似解码器 (TAESD) 的解码耗时。
+
+依赖: torch, diffusers, ffmpeg (需要 GPU 与本地模型)
+用法: python benchmarks/bench_vae_decode.py clip.mp4 --model model.safetensors [--frames 16] [--width 768]
+          [--tiling] [--tiny-vae madebyollin/taesd]
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import GenerationConfig
+from core.pipeline_utils import PipelineLoader
+from core.vae_decode import VAEDecodeStage, TinyDecoder
+
+
+def load_clip(video_path, fps, width, frames):
+    from core.video_io import probe_video_size, scaled_size, decode_frames
+
+    src_w, src_h = probe_video_size(video_path)
+    w, h = scaled_size(src_w, src_h, width)
+    clip = []
+    for frame in decode_frames(video_path, fps, w, h):
+        clip.append(frame.copy())
+        if len(clip) >= frames:
+            break
+    return clip
+
+
+def render(pipe, config, clip, stage=None):
+    """返回 (输出帧列表, 每帧平均耗时 ms)；stage 不为 None 时使用重叠解码"""
+    import torch
+    from PIL import Image
+
+    prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, config)
+    outputs, pending = [], deque()
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for frame in clip:
+        result = pipe(
+            **prompt_kwargs,
+            image=Image.fromarray(frame),
+            num_inference_steps=config.steps,
+            guidance_scale=config.cfg_scale,
+            strength=config.denoising_strength,
+            generator=torch.Generator(device="cuda").manual_seed(config.seed),
+            output_type="latent" if stage is not None else "pil",
+        ).images
+        if stage is None:
+            outputs.append(np.asarray(result[0].convert("RGB")))
+            continue
+        pending.append(stage.submit(result))
+        while len(pending) > stage.max_pending or (pending and pending[0].done()):
+            outputs.append(pending.popleft().result())
+    outputs.extend(f.result() for f in pending)
+    torch.cuda.synchronize()
+    return outputs, (time.perf_counter() - start) / len(clip) * 1000
+
+
+def time_decoder(decode, latents, repeats=5):
+    import torch
+
+    decode(latents)  # 预热
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode(latents)
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAE 解码基准 (同步 vs 重叠，完整 VAE vs 近似解码器)")
+    parser.add_argument("video", help="测试片段路径")
+    parser.add_argument("--model", required=True, help=".safetensors 模型路径")
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--fps", type=int, default=12)
+    parser.add_argument("--width", type=int, default=768)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--strength", type=float, default=0.6)
+    parser.add_argument("--tiling", action="store_true", help="开启 VAE 分块解码")
+    parser.add_argument("--tiny-vae", default="", help="近似解码器权重 (留空使用 TAESD)")
+    args = parser.parse_args()
+
+    import torch
+
+    config = GenerationConfig(model_path=args.model, enable_pose=False, steps=args.steps,
+                              denoising_strength=args.strength, memory_policy="manual", vae_tiling=args.tiling)
+    clip = load_clip(args.video, args.fps, args.width, args.frames)
+    if not clip:
+        raise SystemExit("无法从测试片段中解码帧")
+    print(f">> 测试片段: {len(clip)} 帧, {clip[0].shape[1]}x{clip[0].shape[0]}, {args.steps} 步"
+          f"{', VAE 分块' if args.tiling else ''}")
+
+    pipe = PipelineLoader.get_pipeline(config)
+    render(pipe, config, clip[:1])  # 预热
+    sync_out, sync_ms = render(pipe, config, clip)
+    stage = VAEDecodeStage(pipe)
+    overlap_out, overlap_ms = render(pipe, config, clip, stage)
+    stage.close()
+    diff = max(int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max()) for a, b in zip(sync_out, overlap_out))
+
+    print(f"{'路径':<20}{'每帧(ms)':>10}{'加速':>8}")
+    print(f"{'管线内同步解码':<20}{sync_ms:>10.0f}{1.0:>8.2f}")
+    print(f"{'重叠解码':<20}{overlap_ms:>10.0f}{sync_ms / overlap_ms:>8.2f}")
+    print(f"两条路径输出的最大像素差: {diff}")
+
+    h, w = clip[0].shape[:2]
+    latents = torch.randn((1, 4, h // 8, w // 8), device="cuda", dtype=pipe.vae.dtype)
+    full_ms = time_decoder(VAEDecodeStage(pipe, overlap=False).decode, latents)
+    tiny_ms = time_decoder(TinyDecoder(pipe, args.tiny_vae).decode, latents)
+    print(f"单帧解码耗时: 完整 VAE {full_ms:.1f} ms, 近似解码器 {tiny_ms:.1f} ms ({full_ms / tiny_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
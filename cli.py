@@ -0,0 +1,171 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.config import GenerationConfig
+from core.schedulers import SchedulerRegistry
+from core.precision import PRECISIONS
+from core.daemon import DEFAULT_HOST, DEFAULT_PORT, is_loopback
+
+
+def loopback_host(value):
+    """serve --host：服务没有鉴权，只允许回环地址"""
+    if not is_loopback(value):
+        raise argparse.ArgumentTypeError(f"本地推理服务只能监听回环地址 (如 {DEFAULT_HOST})：{value}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Video2AI Studio 命令行")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="启动本地推理服务 (常驻模型，GUI 与命令行共享)")
+    serve.add_argument("--host", type=loopback_host, default=DEFAULT_HOST, help="监听地址 (仅限回环地址)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    run = sub.add_parser("run", help="提交任务 (优先使用本地推理服务，服务未启动时在本进程运行)")
+    run.add_argument("video", help="输入视频路径")
+    run.add_argument("--job", choices=["render", "preview", "sweep"], default="render")
+    run.add_argument("--output", default="output", help="输出目录")
+    run.add_argument("--model", default="", help=".safetensors 模型路径")
+    run.add_argument("--preset", choices=GenerationConfig.list_presets(),
+                     help="加载 configs/presets 中的命名预设 (其余参数在其基础上覆盖)")
+    run.add_argument("--prompt")
+    run.add_argument("--negative-prompt")
+    run.add_argument("--seed", type=int)
+    run.add_argument("--steps", type=int)
+    run.add_argument("--cfg", type=float)
+    run.add_argument("--scheduler", choices=SchedulerRegistry.names())
+    run.add_argument("--strength", type=float)
+    run.add_argument("--precision", choices=[name for name, _ in PRECISIONS], help="CPU 推理精度")
+    run.add_argument("--fps", type=int)
+    run.add_argument("--width", type=int, help="输出宽度")
+    run.add_argument("--render-width", type=int, help="生成宽度，低于 --width 时先生成再放大")
+    run.add_argument("--upscaler", choices=["lanczos", "learned"])
+    run.add_argument("--upscaler-model", help="learned 放大方式使用的 ESPCN/FSRCNN .pb 权重")
+    run.add_argument("--start", type=float, help="子片段起始时间 (秒)")
+    run.add_argument("--end", type=float, help="子片段结束时间 (秒)")
+    run.add_argument("--frames", help="子片段帧范围 (按目标帧率，从 1 开始)，例如 120-240")
+    run.add_argument("--no-pose", action="store_true", help="关闭骨骼提取 (Img2Img 模式)")
+    run.add_argument("--chain", action="store_true", help="链式图生图 (需配合 --no-pose)")
+    run.add_argument("--chain-strength", type=float)
+    run.add_argument("--host", default=DEFAULT_HOST)
+    run.add_argument("--port", type=int, default=DEFAULT_PORT)
+    run.add_argument("--local", action="store_true", help="不连接服务，直接在本进程运行")
+    run.add_argument("--estimate", action="store_true", help="只打印完整渲染的耗时/显存/磁盘预估，不运行")
+
+    status = sub.add_parser("status", help="查看本地推理服务状态")
+    status.add_argument("--host", default=DEFAULT_HOST)
+    status.add_argument("--port", type=int, default=DEFAULT_PORT)
+    return parser
+
+
+def config_from_args(args):
+    config = GenerationConfig()
+    if args.preset:
+        config.apply_preset(args.preset)
+    config.input_video_path = args.video
+    config.output_dir = args.output
+    config.model_path = args.model
+    if args.no_pose:
+        config.enable_pose = False
+    if args.chain:
+        config.img2img_chain = True
+    overrides = {
+        "prompt": args.prompt, "negative_prompt": args.negative_prompt, "seed": args.seed,
+        "steps": args.steps, "cfg_scale": args.cfg, "scheduler": args.scheduler,
+        "denoising_strength": args.strength, "inference_precision": args.precision,
+        "chain_strength": args.chain_strength,
+        "target_fps": args.fps, "target_width": args.width, "render_width": args.render_width,
+        "upscaler": args.upscaler, "upscaler_model_path": args.upscaler_model,
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(config, key, value)
+
+    # 子片段：--frames 按 (覆盖后的) 目标帧率换算为时间
+    if args.frames:
+        first, _, last = args.frames.partition("-")
+        config.clip_start = (int(first) - 1) / config.target_fps
+        config.clip_end = int(last) / config.target_fps if last else 0.0
+    if args.start is not None:
+        config.clip_start = args.start
+    if args.end is not None:
+        config.clip_end = args.end
+    return config
+
+
+def print_event(event):
+    kind = event.get("event")
+    if kind == "progress":
+        print(f"[{event['value']:3d}%] {event['text']}")
+    elif kind == "accepted":
+        print(f">> 任务已提交 (id {event['job_id']})")
+    elif kind == "preview":
+        print(f">> 输出: {event['path']}")
+    elif kind == "error":
+        print(f">> 失败: {event['message']}")
+    elif kind in ("done", "cancelled"):
+        print(f">> {'完成' if kind == 'done' else '已中止'}")
+
+
+def run_local(job_type, config):
+    from core.jobs import get_job_class
+
+    job = get_job_class(job_type)(
+        config,
+        on_progress=lambda v, t: print_event({"event": "progress", "value": v, "text": t}),
+        on_preview=lambda p: print_event({"event": "preview", "path": p})
+    )
+    try:
+        finished = job.execute()
+    except KeyboardInterrupt:
+        job.cancel_token.cancel()
+        return 130
+    print_event({"event": "done" if finished else "cancelled"})
+    return 0 if finished else 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "serve":
+        from core.daemon import InferenceDaemon
+        daemon = InferenceDaemon(args.host, args.port)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            daemon.shutdown()
+        return 0
+
+    from core.daemon_client import DaemonClient
+
+    if args.command == "status":
+        client = DaemonClient(args.host, args.port)
+        print(client.status() if client.is_available() else "本地推理服务未启动")
+        return 0
+
+    config = config_from_args(args)
+    if args.estimate:
+        from core.cost_model import estimate_render
+        print(estimate_render(config).summary())
+        return 0
+
+    client = DaemonClient(args.host, args.port)
+    if args.local or not client.is_available():
+        if not args.local:
+            print(">> 未检测到本地推理服务，在本进程中运行")
+        return run_local(args.job, config)
+
+    try:
+        last = client.run_job(args.job, config, print_event)
+    except KeyboardInterrupt:
+        client.cancel()
+        return 130
+    return 0 if last and last.get("event") == "done" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
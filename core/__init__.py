@@ -1,11 +1,35 @@
+import importlib
+
 from .config import GenerationConfig
 from .env_checker import EnvironmentChecker
 from .pipeline_utils import PipelineLoader
-from .worker import AIWorker
+
+# 依赖 PyQt6 的 worker 按需导入：推理进程 (spawn) 与命令行只会导入 core.config / core.jobs 等，
+# 不应因为导入 core 包而加载 Qt
+_LAZY = {
+    "AIWorker": "core.worker",
+    "PreviewWorker": "core.worker",
+    "SweepWorker": "core.worker",
+    "create_worker": "core.worker",
+    "ProcessAIWorker": "core.process_worker",
+    "InferenceProcess": "core.process_worker",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "GenerationConfig",
     "EnvironmentChecker",
     "PipelineLoader",
-    "AIWorker"
-]
\ No newline at end of file
+    "AIWorker",
+    "PreviewWorker",
+    "SweepWorker",
+    "create_worker",
+    "ProcessAIWorker",
+    "InferenceProcess"
+]
@@ -0,0 +1,83 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncFrameWriter:
+    """
+    异步图片写入池：JPEG 编码与磁盘写入在后台线程中完成 (PIL 编码期间会释放 GIL)，
+    不再占用逐帧主循环的时间。
+      submit(path, image)   提交写入；排队数量达到 max_pending 时阻塞 (背压)，避免内存无限增长
+      wait_for(path)        等待某个文件写完 (后续阶段读取前调用，保证先写后读)
+      flush()               等待全部写入完成 (阶段边界/取消时调用)，后台异常在此处抛出
+      in_flight             尚未完成的写入数
+    """
+
+    def __init__(self, workers=2, max_pending=8, quality=95):
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="frame-writer")
+        self._slots = threading.Semaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._pending = {}  # path -> Future
+        self._error = None
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, path, image):
+        """image 可以是 PIL.Image 或 HxWx3 uint8 数组；数组由调用方保证在写入完成前不被修改"""
+        self._raise_error()
+        self._slots.acquire()
+        # 同一路径的前一次写入先完成，保证最终文件内容与提交顺序一致
+        self.wait_for(path)
+        future = self._executor.submit(self._write, path, image)
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda f, p=path: self._on_done(p, f))
+        return future
+
+    def _write(self, path, image):
+        from PIL import Image
+
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        tmp_path = path + ".part"
+        image.save(tmp_path, format="JPEG", quality=self.quality)
+        # 写完后再改名，读取方不会看到写了一半的文件
+        os.replace(tmp_path, path)
+
+    def _on_done(self, path, future):
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+        if future.exception() is not None and self._error is None:
+            self._error = future.exception()
+        self._slots.release()
+
+    def wait_for(self, path):
+        with self._lock:
+            future = self._pending.get(path)
+        if future is not None:
+            future.exception()  # 等待完成；异常统一由 flush/submit 抛出
+
+    def flush(self):
+        """阻塞直到所有已提交的写入完成"""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.exception()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"后台写入图片失败: {error}") from error
+
+    def close(self):
+        """等待剩余写入完成并关闭线程池 (取消时也会等待，保证磁盘上不留半成品文件)"""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
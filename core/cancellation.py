@@ -0,0 +1,68 @@
+import time
+import inspect
+import threading
+
+
+class JobCancelled(Exception):
+    """任务被用户中止 (在检查点抛出，由 worker 捕获)"""
+
+
+class CancelToken:
+    """
+    协作式取消令牌：GUI 线程调用 cancel()，工作线程在各个检查点调用 check()。
+    检查点覆盖 拆帧/合成 (ffmpeg 轮询)、骨骼检测 (每帧) 与 扩散采样 (每个去噪步)，
+    因此停止延迟不超过一个去噪步。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.finalize = False  # True: 停止后将已生成的帧合成为部分视频
+        self.requested_at = None
+        self.acknowledged_at = None
+
+    def cancel(self, finalize=False):
+        self.finalize = finalize
+        if not self._event.is_set():
+            self.requested_at = time.perf_counter()
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """检查点：已请求取消时抛出 JobCancelled"""
+        if self._event.is_set():
+            if self.acknowledged_at is None:
+                self.acknowledged_at = time.perf_counter()
+            raise JobCancelled()
+
+    @property
+    def stop_latency(self):
+        """从点击停止到工作线程响应的耗时 (秒)，尚未响应时返回 None"""
+        if self.requested_at is None or self.acknowledged_at is None:
+            return None
+        return self.acknowledged_at - self.requested_at
+
+
+def step_callback_kwargs(pipe, token):
+    """
+    为管线调用生成逐步回调参数，使取消在每个去噪步之后生效。
+    新版 diffusers 使用 callback_on_step_end，旧版使用 callback + callback_steps。
+    """
+    params = inspect.signature(pipe.__call__).parameters
+
+    if "callback_on_step_end" in params:
+        def on_step_end(_pipe, step, timestep, callback_kwargs):
+            token.check()
+            return callback_kwargs
+
+        return {"callback_on_step_end": on_step_end}
+
+    if "callback" in params:
+        def on_step(step, timestep, latents):
+            token.check()
+
+        return {"callback": on_step, "callback_steps": 1}
+
+    return {}
@@ -1,33 +1,249 @@
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field, fields
+
+# 字段类别：
+#   output  影响生成结果 (参与内容哈希，驱动各类缓存与断点续跑)
+#   perf    只影响速度/资源占用，结果不变
+#   io      只影响路径、通信等外部交互
+OUTPUT, PERF, IO = "output", "perf", "io"
+
+# 命名预设目录：每个预设是一个 JSON 文件，只需列出要覆盖的字段
+PRESET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "presets")
+
+
+def _field(default, kind, jobs=("render", "preview", "sweep"), img2img_only=False):
+    """
+    带元数据的字段定义。
+    jobs: 该字段影响哪些任务的结果 (仅对 output 类字段有意义)
+    img2img_only: 仅在关闭骨骼 (图生图) 时影响结果
+    """
+    return field(default=default, metadata={"kind": kind, "jobs": jobs, "img2img_only": img2img_only})
+
+
+@dataclass(slots=True)
 class GenerationConfig:
     """
-    全局配置数据类
+    全局配置数据类。字段元数据标注其类别 (output/perf/io)，
+    content_hash() 只对 output 类字段做规范化哈希。
     """
 
-    def __init__(self):
-        # 输入输出
-        self.input_video_path = ""
-        # 默认输出目录
-        self.output_dir = "output"
-        # 临时文件目录名 (相对于 output_dir)，用于存放原始帧和骨骼图
-        self.temp_dir_name = "temp_frames"
-
-        # 预处理参数
-        self.target_fps = 24
-        self.target_width = 512
-        self.enable_pose = True  # 是否启用骨骼提取
-
-        # 模型路径
-        self.model_path = ""
-        self.yaml_path = "configs/v1-inference.yaml"
-
-        # 生成参数
-        self.prompt = "high quality, masterpiece, anime style, vivid colors"
-        self.negative_prompt = "low quality, bad anatomy, watermark, text, error, ugly, deformed"
-        self.seed = 12345
-        self.steps = 20
-        self.cfg_scale = 7.5
-        self.denoising_strength = 0.75  # 重绘幅度 (仅 enable_pose=False 时生效)
-
-        # 性能开关
-        self.use_xformers = True
-        self.low_vram = False
\ No newline at end of file
+    # 输入输出
+    input_video_path: str = _field("", OUTPUT)
+    # 子片段 (秒)：只处理 [clip_start, clip_end) 区间，clip_end 为 0 表示直到结尾
+    clip_start: float = _field(0.0, OUTPUT)
+    clip_end: float = _field(0.0, OUTPUT)
+    # 默认输出目录
+    output_dir: str = _field("output", IO)
+    # 临时文件目录名 (相对于 output_dir)，用于存放原始帧和骨骼图
+    temp_dir_name: str = _field("temp_frames", IO)
+
+    # 中间帧存储: memmap (分段内存映射文件) / chunked (分块压缩文件) / jpeg (每帧一个 JPEG，旧布局)
+    #             ram (内存优先，超出预算后换出到本地临时目录)
+    frame_store: str = _field("memmap", PERF)
+    frame_store_chunk: int = _field(16, PERF)  # chunked 模式每块 / memmap 模式每段的帧数 (段内帧全部用完后删除该段)
+    ram_budget_mb: int = _field(2048, PERF)  # ram 模式下所有中间帧共享的内存预算
+    spill_dir: str = _field("", IO)  # ram 模式的换出目录，留空使用系统临时目录 (通常位于本地高速磁盘)
+    writer_threads: int = _field(2, PERF)  # 后台写图片 (JPEG 编码 + 落盘) 的线程数
+    writer_queue: int = _field(8, PERF)  # 等待写入的最大帧数，超出时生成循环阻塞等待
+    result_cache: bool = _field(False, PERF)  # 缓存生成结果 (需手动开启)，输入帧与生成参数都不变时直接复用
+    result_cache_dir: str = _field("", IO)  # 留空使用用户缓存目录 (与输出目录无关)
+    result_cache_mb: int = _field(4096, PERF)  # 缓存大小上限，超出后淘汰最久未使用的帧
+    disk_preflight: bool = _field(True, IO)  # 渲染前估算所需磁盘空间，不足时拒绝开始
+    tensor_io: bool = _field(True, PERF)  # 帧以张量形式传入/传出管线，不经过 PIL (关闭后使用旧的 PIL 路径，便于对比)
+    profile_frames: bool = _field(False, PERF)  # 统计每帧 UNet 之外的耗时 (会同步 CUDA，略降吞吐)
+
+    # 预处理参数
+    target_fps: int = _field(24, OUTPUT)
+    target_width: int = _field(512, OUTPUT)
+    # 生成分辨率与输出分辨率分离：render_width 在 (0, target_width) 之间时以该宽度生成，
+    # 再经 CPU 放大阶段放大到 target_width 后编码 (0 表示直接以 target_width 生成)
+    render_width: int = _field(0, OUTPUT, jobs=("render",))
+    upscaler: str = _field("lanczos", OUTPUT, jobs=("render",))  # 放大方式: lanczos / learned (见 core/upscale.py)
+    upscaler_model_path: str = _field("", OUTPUT, jobs=("render",))  # learned 模式使用的 ESPCN/FSRCNN .pb 权重
+    enable_pose: bool = _field(True, OUTPUT)  # 是否启用骨骼提取
+    pose_backend: str = _field("openpose", OUTPUT)  # 姿态检测后端: openpose / mediapipe (见 core/pose_backends.py)
+    pose_resolution: int = _field(512, OUTPUT)  # 检测分辨率 (短边像素)，越低越快
+    # 稀疏姿态检测：每 pose_interval 帧检测一次 (1 为逐帧)，中间帧插值关键点；
+    # 与上一关键帧的平均像素差超过 pose_motion_threshold (0~255，0 关闭) 时提前检测
+    pose_interval: int = _field(1, OUTPUT)
+    pose_motion_threshold: float = _field(0.0, OUTPUT)
+    pose_smoothing: bool = _field(False, OUTPUT)  # 对关键点轨迹做 One Euro 平滑，减少骨骼抖动
+    # 拆帧时检测镜头切换：切点处强制关键帧 (稀疏姿态检测/链式图生图)，并重置跨帧特征复用
+    scene_detect: bool = _field(True, OUTPUT)
+    scene_cut_threshold: float = _field(0.35, OUTPUT)  # 相邻帧颜色直方图距离 (0~1) 超过该值判定为切点
+
+    # 模型路径
+    model_path: str = _field("", OUTPUT)
+    yaml_path: str = _field("configs/v1-inference.yaml", OUTPUT)
+
+    # 生成参数
+    prompt: str = _field("high quality, masterpiece, anime style, vivid colors", OUTPUT)
+    negative_prompt: str = _field("low quality, bad anatomy, watermark, text, error, ugly, deformed", OUTPUT)
+    seed: int = _field(12345, OUTPUT)
+    steps: int = _field(20, OUTPUT)
+    cfg_scale: float = _field(7.5, OUTPUT)
+    scheduler: str = _field("unipc", OUTPUT)  # 采样器，见 core/schedulers.py 中的 SCHEDULERS
+    distill_lora_path: str = _field("", OUTPUT)  # 少步蒸馏采样器 (LCM) 所需的本地 LoRA 权重
+    denoising_strength: float = _field(0.75, OUTPUT, img2img_only=True)  # 重绘幅度 (仅 enable_pose=False 时生效)
+    # 链式图生图 (仅完整渲染)：非关键帧从“上一帧结果 (光流对齐) 与原图的混合”开始，以 chain_strength 去噪
+    img2img_chain: bool = _field(False, OUTPUT, jobs=("render",), img2img_only=True)
+    chain_strength: float = _field(0.35, OUTPUT, jobs=("render",), img2img_only=True)
+    chain_blend: float = _field(0.6, OUTPUT, jobs=("render",), img2img_only=True)  # 上一帧结果所占权重
+    chain_keyframe_interval: int = _field(12, OUTPUT, jobs=("render",), img2img_only=True)
+    chain_optical_flow: bool = _field(True, OUTPUT, jobs=("render",), img2img_only=True)
+
+    # 快速预览 (在抽样帧上以低分辨率/低步数试渲染)
+    preview_frames: int = _field(6, OUTPUT, jobs=("preview",))  # 抽样帧数 K
+    preview_width: int = _field(256, OUTPUT, jobs=("preview",))  # 预览分辨率宽度
+    preview_steps: int = _field(8, OUTPUT, jobs=("preview",))  # 预览迭代步数
+    preview_sampling: str = _field("uniform", OUTPUT, jobs=("preview",))  # 抽帧方式: uniform (均匀) / scene (镜头切换)
+
+    # 参数扫描 (为空表示沿用上方的单值参数)
+    sweep_prompts: str = _field("", OUTPUT, jobs=("sweep",))  # 每行一个提示词
+    sweep_seeds: str = _field("", OUTPUT, jobs=("sweep",))  # 例如 "1,2,3" 或 "100-105"
+    sweep_cfg: str = _field("", OUTPUT, jobs=("sweep",))  # 例如 "5-9:2"
+    sweep_steps: str = _field("", OUTPUT, jobs=("sweep",))  # 例如 "10,20,30"
+    sweep_strength: str = _field("", OUTPUT, jobs=("sweep",))  # 例如 "0.4-0.8:0.2" (仅 Img2Img 模式)
+    sweep_frames: int = _field(3, OUTPUT, jobs=("sweep",))  # 固定抽样帧数
+    sweep_max_batch: int = _field(4, PERF)  # 单次批量调用的最大组合数 (每个组合含全部抽样帧)
+
+    # 性能开关
+    use_xformers: bool = _field(True, PERF)
+    # Token Merging 合并比例 (0 关闭)。会轻微改变画面，因此属于 output 类字段
+    token_merging_ratio: float = _field(0.0, OUTPUT)
+    # 跨帧 UNet 深层特征复用 (仅完整渲染)：相邻帧输入相似度不低于阈值时复用刷新帧同一时间步的深层特征，
+    # 只重新计算浅层块；连续复用 feature_reuse_refresh 帧后强制完整计算一次
+    feature_reuse: bool = _field(False, OUTPUT, jobs=("render",))
+    feature_reuse_threshold: float = _field(0.97, OUTPUT, jobs=("render",))
+    feature_reuse_refresh: int = _field(4, OUTPUT, jobs=("render",))
+    feature_reuse_step_interval: int = _field(1, OUTPUT, jobs=("render",))  # 帧内每 N 步完整计算一次 (1 关闭)
+    low_vram: bool = _field(False, PERF)
+    # VAE 解码 (见 core/vae_decode.py)：渲染时管线只做去噪，完整 VAE 解码放到独立阶段，与下一帧的去噪重叠
+    # (仅 CUDA 且未开启低显存模式；链式图生图需要上一帧结果，仍按顺序解码)
+    vae_decode_overlap: bool = _field(True, PERF)
+    # 显存策略 (见 core/memory_policy.py)：auto 按实测可用显存、分辨率与批大小自动选择能放下的最快组合；
+    # manual 使用下面三个开关。三者都只改变计算方式，不影响画面
+    memory_policy: str = _field("auto", PERF)
+    attention_slicing: bool = _field(False, PERF)  # 分块计算注意力，显存峰值最低但最慢 (会替代 xFormers)
+    vae_slicing: bool = _field(False, PERF)  # 批量解码时逐张解码，降低显存峰值
+    vae_tiling: bool = _field(False, PERF)  # 大分辨率帧分块解码 (块间重叠融合，差异肉眼不可见)
+    # 解码器选择 (最终输出始终使用完整 VAE)：
+    #   live_preview_decoder  渲染时界面实时预览: full (完整 VAE 的结果) / tiny (近似解码器 TAESD，去噪后立即显示) / off
+    #   preview_decoder       快速预览任务: full / tiny
+    live_preview_decoder: str = _field("full", PERF)
+    preview_decoder: str = _field("full", OUTPUT, jobs=("preview",))
+    tiny_vae_path: str = _field("", OUTPUT, jobs=("preview",))  # 近似解码器权重 (本地目录或 Hub 仓库)，留空使用 TAESD
+    # CPU 推理精度: auto / fp32 / bf16 (自动混合精度) / int8 (线性层动态量化，量化结果缓存到本地)。
+    # GPU 上始终使用 fp16；低精度会轻微改变画面，因此属于 output 类字段
+    inference_precision: str = _field("auto", OUTPUT)
+
+    # 执行方式: process (独立的受监管推理进程，默认) / thread (GUI 进程内的后台线程) / daemon (本地推理服务)
+    execution_mode: str = _field("process", PERF)
+    daemon_host: str = _field("127.0.0.1", IO)
+    daemon_port: int = _field(7861, IO)
+
+    # ---------- 字段元数据 ----------
+    @classmethod
+    def field_names(cls, kind=None, job=None):
+        """按类别/任务筛选字段名 (结果按类定义顺序，已缓存)"""
+        key = (kind, job)
+        cache = _FIELD_CACHE.setdefault(cls, {})
+        if key not in cache:
+            cache[key] = tuple(
+                f.name for f in fields(cls)
+                if (kind is None or f.metadata["kind"] == kind)
+                and (job is None or job in f.metadata["jobs"])
+            )
+        return cache[key]
+
+    @classmethod
+    def field_kind(cls, name):
+        return _FIELD_META[name]["kind"]
+
+    # ---------- 序列化 ----------
+    def to_dict(self, kind=None):
+        """导出为普通字典 (用于跨进程传递/保存预设)；kind 指定时只导出该类字段"""
+        return {name: getattr(self, name) for name in self.field_names(kind)}
+
+    def to_json(self, kind=None):
+        """稳定的 JSON 表示：键排序、固定分隔符，同一配置总是得到相同文本"""
+        return json.dumps(self.to_dict(kind), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典恢复配置，未知字段忽略，缺失字段保留默认值"""
+        config = cls()
+        config.update(data)
+        return config
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def update(self, data):
+        """按字段类型写入 (JSON 中的 7 会转换为 float 字段所需的 7.0 等)"""
+        for key, value in data.items():
+            caster = _FIELD_TYPES.get(key)
+            if caster is None:
+                continue
+            if value is not None and not isinstance(value, caster):
+                value = caster(value)
+            setattr(self, key, value)
+        return self
+
+    def copy(self):
+        return self.from_dict(self.to_dict())
+
+    # ---------- 内容哈希 ----------
+    def content_hash(self, job="render", exclude=()):
+        """
+        对影响 job 结果的字段做规范化哈希 (sha1 十六进制)。
+        图生图专属字段在骨骼模式下不参与；结果按字段值缓存，逐帧调用也几乎没有开销。
+        """
+        names = [n for n in self.field_names(OUTPUT, job) if n not in exclude]
+        if self.enable_pose:
+            names = [n for n in names if not _FIELD_META[n]["img2img_only"]]
+        values = tuple(getattr(self, n) for n in names)
+
+        key = (job, tuple(names), values)
+        cached = _HASH_CACHE.get(key)
+        if cached is None:
+            payload = json.dumps(dict(zip(names, values)), sort_keys=True, ensure_ascii=False,
+                                 separators=(",", ":"))
+            cached = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+            if len(_HASH_CACHE) > 256:
+                _HASH_CACHE.clear()
+            _HASH_CACHE[key] = cached
+        return cached
+
+    # ---------- 预设 ----------
+    @staticmethod
+    def list_presets(preset_dir=PRESET_DIR):
+        if not os.path.isdir(preset_dir):
+            return []
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(preset_dir) if f.endswith(".json"))
+
+    def apply_preset(self, name, preset_dir=PRESET_DIR):
+        """加载命名预设并覆盖其中列出的字段，其余字段保持不变"""
+        path = os.path.join(preset_dir, name + ".json")
+        if not os.path.exists(path):
+            raise ValueError(f"预设不存在: {name}")
+        with open(path, "r", encoding="utf-8") as f:
+            return self.update(json.load(f))
+
+    def save_preset(self, name, preset_dir=PRESET_DIR):
+        """将生成参数 (不含输入视频与模型路径) 保存为预设"""
+        data = self.to_dict(OUTPUT)
+        for key in ("input_video_path", "model_path", "yaml_path"):
+            data.pop(key, None)
+        os.makedirs(preset_dir, exist_ok=True)
+        with open(os.path.join(preset_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, sort_keys=True, ensure_ascii=False, indent=2)
+
+
+_FIELD_CACHE = {}
+_HASH_CACHE = {}
+_FIELD_META = {f.name: f.metadata for f in fields(GenerationConfig)}
+_FIELD_TYPES = {f.name: f.type for f in fields(GenerationConfig)}
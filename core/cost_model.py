@@ -0,0 +1,293 @@
+import os
+import json
+import math
+import shutil
+
+from core import memory_policy
+from core.preflight import DiskPreflight
+from core.upscale import render_size
+from core.video_io import probe_video_size, estimate_frame_count
+
+# 没有本机历史记录时使用的默认吞吐 (中端 GPU / 普通桌面 CPU 的量级，偏保守)：
+#   extract / upscale / finalize  秒 / 百万像素帧 (upscale 按输出分辨率)
+#   pose                          秒 / 检测帧
+#   generate                      秒 / (百万像素 × 实际去噪步数)
+DEFAULT_RATES = {
+    "extract": 0.01,
+    "pose": 0.04,
+    "generate|cuda": 0.3,
+    "generate|cpu": 12.0,
+    "upscale": 0.01,
+    "finalize": 0.002,
+}
+# 新一次运行在滑动平均中所占的比例
+HISTORY_WEIGHT = 0.3
+# SD1.5 半精度权重 (UNet + VAE + 文本编码器) 与 ControlNet 的常驻占用，实测后以历史值为准
+WEIGHTS_BYTES = int(2.2 * 1024 ** 3)
+CONTROLNET_WEIGHTS_BYTES = int(0.7 * 1024 ** 3)
+
+STAGE_LABELS = {
+    "extract": "拆帧",
+    "pose": "骨骼提取",
+    "generate": "逐帧生成",
+    "upscale": "放大",
+    "finalize": "合成视频",
+}
+
+
+def default_history_path():
+    """本机吞吐历史 (与生成结果缓存同在用户级缓存目录下)"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Video2AI", "throughput.json")
+
+
+def _mode(config):
+    return "pose" if config.enable_pose else "img2img"
+
+
+def generate_key(config, device):
+    """生成吞吐按设备、生成模式与精度设置分别记录"""
+    return f"generate|{device}|{_mode(config)}|{config.inference_precision}"
+
+
+def effective_steps(config):
+    """实际执行的去噪步数：图生图只运行 steps × 重绘幅度 步 (链式图生图按基础重绘幅度近似)"""
+    if config.enable_pose:
+        return config.steps
+    return max(1, int(config.steps * config.denoising_strength))
+
+
+def pose_detections(config, frame_count):
+    """姿态检测次数：稀疏检测时每 pose_interval 帧一次 (运动量突增时的额外检测不计)"""
+    return math.ceil(frame_count / max(1, config.pose_interval))
+
+
+def probe_device():
+    """不导入 torch 的设备推断 (本机尚无渲染记录时使用)：有 NVIDIA 驱动 (nvidia-smi) 时按 GPU 估算，否则按 CPU"""
+    return "cuda" if shutil.which("nvidia-smi") else "cpu"
+
+
+def pose_complete(config):
+    """骨骼流是否已完整缓存 (与 RenderJob 的判断一致；只查询，不创建缓存目录)"""
+    from core.pose_cache import PoseCache
+
+    try:
+        key = PoseCache.cache_key(config)
+    except OSError:
+        return False
+    return os.path.exists(os.path.join(config.output_dir, "pose_cache", key, "poses.done"))
+
+
+class ThroughputHistory:
+    """
+    本机吞吐历史 (JSON 文件)。rates 中每个键保存 [滑动平均值, 记录次数]：
+      各阶段吞吐 (键见 DEFAULT_RATES / generate_key)、weights|模式 (实测权重显存)、
+      memory_ratio|模式 (实测激活峰值 / memory_policy 估算值)
+    device 保存最近一次渲染使用的设备信息 (类型、名称、总显存、是否有高效注意力)。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.device = {}
+        self.rates = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.device = data.get("device", {})
+            self.rates = data.get("rates", {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key, default):
+        """返回 (值, 记录次数)；没有记录时返回 (default, 0)"""
+        value, count = self.rates.get(key, (default, 0))
+        return value, count
+
+    def update(self, key, value):
+        old, count = self.get(key, value)
+        value = value if count == 0 else old + HISTORY_WEIGHT * (value - old)
+        self.rates[key] = [value, count + 1]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"device": self.device, "rates": self.rates}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record_render(self, config, size, out_size, stats):
+        """
+        渲染完成后按实测耗时更新吞吐。stats 只包含本次实际执行过的阶段：
+          frames, extract (秒), pose (秒, 检测帧数), generate (秒, 实际生成帧数；不含模型加载), upscale (秒), finalize (秒),
+          device ({"type", "name", "vram_total", "efficient_attention"}，未加载模型时缺省)，
+          weights / peak / estimated_peak (字节，仅 GPU)
+        """
+        frames = stats["frames"]
+        if frames <= 0:
+            return
+        mp = size[0] * size[1] / 1e6
+        out_mp = out_size[0] * out_size[1] / 1e6
+        # 全部命中结果缓存时不会加载模型，沿用上一次的设备信息
+        device = self.device = stats.get("device", self.device)
+
+        if "extract" in stats:
+            self.update("extract", stats["extract"] / (frames * mp))
+        if "pose" in stats:
+            seconds, detections = stats["pose"]
+            if detections > 0:
+                self.update(f"pose|{config.pose_backend}", seconds / detections)
+        if "generate" in stats:
+            seconds, generated = stats["generate"]
+            if generated > 0:  # 全部命中结果缓存时没有可用的生成耗时
+                self.update(generate_key(config, device["type"]), seconds / (generated * mp * effective_steps(config)))
+        if "upscale" in stats:
+            self.update(f"upscale|{config.upscaler}", stats["upscale"] / (frames * out_mp))
+        if "finalize" in stats:
+            self.update("finalize", stats["finalize"] / (frames * out_mp))
+        if stats.get("estimated_peak"):
+            mode = _mode(config)
+            self.update(f"weights|{mode}", stats["weights"])
+            self.update(f"memory_ratio|{mode}", stats["peak"] / stats["estimated_peak"])
+        self.save()
+
+
+class CostEstimate:
+    """
+    一次完整渲染的预估结果：
+      frames / size / out_size   帧数、生成分辨率、输出分辨率
+      stages                     [(阶段, 预计秒数, 是否来自本机历史)]
+      peak_bytes / memory_total  预计显存 (CPU 推理时为内存) 峰值与设备总量 (未知时为 0)
+      memory_text                显存组合说明
+      disk                       {目录: 预计峰值占用字节数}
+    device_measured 为 False 表示本机尚无渲染记录，设备类型由 probe_device() 推断。
+    """
+
+    def __init__(self, frames, size, out_size, device, device_measured=True):
+        self.frames = frames
+        self.size = size
+        self.out_size = out_size
+        self.device = device
+        self.device_measured = device_measured
+        self.stages = []
+        self.peak_bytes = 0
+        self.memory_total = 0
+        self.memory_text = ""
+        self.disk = {}
+
+    @property
+    def total_seconds(self):
+        return sum(seconds for _, seconds, _ in self.stages)
+
+    @staticmethod
+    def format_duration(seconds):
+        seconds = int(round(seconds))
+        if seconds < 60:
+            return f"{seconds} 秒"
+        minutes, seconds = divmod(seconds, 60)
+        if minutes < 60:
+            return f"{minutes} 分 {seconds:02d} 秒"
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours} 小时 {minutes:02d} 分"
+
+    def lines(self):
+        gb = 1024 ** 3
+        size_text = f"{self.size[0]}x{self.size[1]}"
+        if self.out_size != self.size:
+            size_text += f" -> {self.out_size[0]}x{self.out_size[1]}"
+        lines = [f"帧数 {self.frames}，{size_text}，预计总耗时 {self.format_duration(self.total_seconds)}"]
+
+        stage_text = []
+        for stage, seconds, measured in self.stages:
+            stage_text.append(f"{STAGE_LABELS[stage]} {self.format_duration(seconds)}{'' if measured else '*'}")
+        lines.append(" | ".join(stage_text))
+
+        memory_name = "显存" if self.device == "cuda" else "内存"
+        memory = f"{memory_name}峰值约 {self.peak_bytes / gb:.1f} GB"
+        if self.memory_total:
+            memory += f" / {self.memory_total / gb:.1f} GB"
+            if self.peak_bytes > self.memory_total * memory_policy.SAFETY_RATIO:
+                memory += " (可能不足)"
+        if self.memory_text:
+            memory += f"，{self.memory_text}"
+        lines.append(memory)
+
+        lines.append(f"磁盘峰值约 {sum(self.disk.values()) / gb:.2f} GB")
+        if not all(measured for _, _, measured in self.stages):
+            lines.append("* 本机尚无该阶段的运行记录，使用默认吞吐估算；每次渲染完成后自动校准")
+        if not self.device_measured:
+            device_name = "GPU" if self.device == "cuda" else "CPU"
+            lines.append(f"* 本机尚无渲染记录，按推断的设备 ({device_name}) 估算")
+        return lines
+
+    def summary(self):
+        return "\n".join(self.lines())
+
+
+def estimate_render(config, history=None):
+    """
+    按探测到的视频信息、当前配置与本机吞吐历史预估完整渲染的耗时、显存与磁盘占用。
+    不导入 torch，可直接在界面线程中调用 (仅运行两次 ffprobe)。不含模型加载，也未计入生成结果缓存的命中。
+    """
+    history = history or ThroughputHistory()
+    if not config.input_video_path or not os.path.exists(config.input_video_path):
+        raise ValueError("无效的视频输入路径")
+    src_w, src_h = probe_video_size(config.input_video_path)
+    if not src_w:
+        raise ValueError("无法读取视频尺寸，请检查 ffprobe 是否可用")
+    (width, height), out_size = render_size(config, src_w, src_h)
+    frames = estimate_frame_count(config.input_video_path, config.target_fps, config.clip_start, config.clip_end)
+    if frames <= 0:
+        raise ValueError("无法获取视频时长，请检查 ffprobe 是否可用")
+
+    device_measured = "type" in history.device
+    device = history.device["type"] if device_measured else probe_device()
+    estimate = CostEstimate(frames, (width, height), out_size, device, device_measured)
+    mp = width * height / 1e6
+    out_mp = out_size[0] * out_size[1] / 1e6
+
+    def add(stage, key, default_key, amount):
+        rate, count = history.get(key, DEFAULT_RATES[default_key])
+        estimate.stages.append((stage, rate * amount, count > 0))
+
+    cached_pose = config.enable_pose and pose_complete(config)
+    if not cached_pose:
+        add("extract", "extract", "extract", frames * mp)
+        if config.enable_pose:
+            add("pose", f"pose|{config.pose_backend}", "pose", pose_detections(config, frames))
+    add("generate", generate_key(config, device), f"generate|{device}", frames * mp * effective_steps(config))
+    if out_size != (width, height):
+        add("upscale", f"upscale|{config.upscaler}", "upscale", frames * out_mp)
+    add("finalize", "finalize", "finalize", frames * out_mp)
+
+    # 峰值显存 = 常驻权重 + 激活峰值 (按显存策略选出的组合估算，并乘以本机实测的校准系数)
+    mode = _mode(config)
+    weights = WEIGHTS_BYTES + (CONTROLNET_WEIGHTS_BYTES if config.enable_pose else 0)
+    dtype_bytes = 2
+    if device != "cuda":
+        weights *= 2  # CPU 上权重为 fp32 (bf16 自动混合精度与 int8 动态量化同样保留 fp32 权重)
+        dtype_bytes = 4
+    weights = history.get(f"weights|{mode}", weights)[0]
+    ratio = history.get(f"memory_ratio|{mode}", 1.0)[0]
+    efficient = history.device.get("efficient_attention", True)
+    chain = config.img2img_chain and not config.enable_pose
+    overlapped = device == "cuda" and config.vae_decode_overlap and not config.low_vram and not chain
+    estimate.memory_total = history.device.get("vram_total", 0) if device == "cuda" else 0
+
+    if config.memory_policy == "auto" and device == "cuda" and estimate.memory_total:
+        budget = (estimate.memory_total - weights) * memory_policy.SAFETY_RATIO / ratio
+        activation, combo = memory_policy.select(budget, width, height, 1, efficient, config.enable_pose,
+                                                 overlapped, dtype_bytes)
+    else:
+        combo = memory_policy.COMBINATIONS[0]
+        if config.memory_policy != "auto":
+            combo = (config.attention_slicing, config.vae_slicing, config.vae_tiling)
+        activation = memory_policy.estimate_peak_bytes(width, height, 1, combo, efficient, config.enable_pose,
+                                                       overlapped, dtype_bytes)
+    estimate.peak_bytes = int(weights + activation * ratio)
+    if device == "cuda":
+        estimate.memory_text = memory_policy.describe(combo)
+        if config.low_vram:
+            estimate.memory_text += " (低显存模式：权重按需载入，实际峰值更低)"
+
+    estimate.disk = DiskPreflight.estimate(config, frames, width, height, cached_pose, out_size)
+    return estimate
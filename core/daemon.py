@@ -0,0 +1,201 @@
+import io
+import json
+import uuid
+import base64
+import ipaddress
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from core.cancellation import CancelToken
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7861
+
+
+def is_loopback(host):
+    """host 是否为本机回环地址 (localhost 或 127.0.0.0/8)"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.IPv4Address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def encode_frame(rgb, quality=80):
+    """将 RGB 数组编码为 base64 JPEG 字符串 (用于流式回传实时帧)"""
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.fromarray(rgb).save(buf, format="JPEG", quality=quality)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+class InferenceDaemon:
+    """
+    本地推理服务：常驻进程持有 PipelineLoader 的管线缓存，GUI 与命令行共享同一个热模型。
+    服务没有鉴权 (可提交任意输出路径的任务)，因此只允许监听回环地址，接口：
+      GET  /status  -> {"busy": bool, "pipeline_loaded": bool, "jobs": [job_id, ...]}
+      POST /jobs    -> 请求体 {"job_type", "config", "stream_frames"}，
+                       响应为逐行 JSON 事件流：首个事件为 accepted (含 job_id)，
+                       之后为 progress/preview/frame，最后为 done/cancelled/error
+      POST /cancel  -> 请求体 {"job_id", "finalize": bool}，只取消指定的任务 (运行中或排队中)
+    同一时刻只执行一个任务，其余请求排队等待。
+    pipeline_factory 只传给本服务创建的任务 (例如测试用的桩管线)，不修改全局的 PipelineLoader。
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, pipeline_factory=None):
+        if not is_loopback(host):
+            raise ValueError(f"本地推理服务没有鉴权，只能监听回环地址 (如 {DEFAULT_HOST})：{host}")
+        self.pipeline_factory = pipeline_factory
+        self._job_lock = threading.Lock()
+        self._tokens_lock = threading.Lock()
+        self._tokens = {}  # job_id -> CancelToken (运行中与排队中的任务)
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def serve_forever(self):
+        host, port = self.address
+        print(f">> 本地推理服务已启动: http://{host}:{port}")
+        self.server.serve_forever()
+
+    def start_in_background(self):
+        """在后台线程中启动服务 (便于在同一进程内做端到端测试)"""
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def status(self):
+        from core.pipeline_utils import PipelineLoader
+        with self._tokens_lock:
+            jobs = list(self._tokens)
+        return {
+            "busy": self._job_lock.locked(),
+            "pipeline_loaded": PipelineLoader._cached_pipe is not None,
+            "jobs": jobs
+        }
+
+    def cancel(self, job_id, finalize=False):
+        """取消指定任务；任务不存在 (已结束或 id 无效) 时返回 False"""
+        with self._tokens_lock:
+            token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel(finalize)
+        return True
+
+    def run_job(self, job_type, config_dict, emit, stream_frames=False):
+        """
+        执行一个任务，事件通过 emit(dict) 回传；客户端断开时自动取消。
+        任务 id 在排队前分配并通过 accepted 事件告知客户端，排队期间即可按 id 取消。返回任务 id。
+        """
+        from core.config import GenerationConfig
+        from core.jobs import get_job_class
+
+        job_id = uuid.uuid4().hex[:12]
+        token = CancelToken()
+
+        def safe_emit(event):
+            try:
+                emit(event)
+            except OSError:
+                # 客户端已断开，取消任务以释放服务
+                token.cancel()
+
+        with self._tokens_lock:
+            self._tokens[job_id] = token
+        try:
+            safe_emit({"event": "accepted", "job_id": job_id})
+            with self._job_lock:
+                if token.cancelled:
+                    safe_emit({"event": "cancelled"})
+                    return job_id
+                try:
+                    job = get_job_class(job_type)(
+                        GenerationConfig.from_dict(config_dict), token,
+                        on_progress=lambda v, t: safe_emit({"event": "progress", "value": v, "text": t}),
+                        on_preview=lambda p: safe_emit({"event": "preview", "path": p}),
+                        on_frame=(lambda rgb: safe_emit({"event": "frame", "jpeg": encode_frame(rgb)}))
+                        if stream_frames else None,
+                        pipeline_factory=self.pipeline_factory
+                    )
+                    finished = job.execute()
+                    safe_emit({"event": "done" if finished else "cancelled"})
+                except Exception as e:
+                    import traceback
+                    traceback.print_exc()
+                    safe_emit({"event": "error", "message": str(e)})
+        finally:
+            with self._tokens_lock:
+                self._tokens.pop(job_id, None)
+        return job_id
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0"
+
+            def log_message(self, fmt, *args):
+                pass  # 静默访问日志
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _send_json(self, data, code=200):
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self._send_json(daemon.status())
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                try:
+                    payload = self._read_json()
+                except ValueError:
+                    self._send_json({"error": "invalid json"}, 400)
+                    return
+
+                if self.path == "/cancel":
+                    if not payload.get("job_id"):
+                        self._send_json({"error": "missing job_id"}, 400)
+                        return
+                    self._send_json({"cancelled": daemon.cancel(payload["job_id"], bool(payload.get("finalize")))})
+                    return
+                if self.path != "/jobs":
+                    self._send_json({"error": "not found"}, 404)
+                    return
+
+                # 事件流：每行一个 JSON，任务结束后关闭连接
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.end_headers()
+
+                def emit(event):
+                    self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+                daemon.run_job(
+                    payload.get("job_type", "render"),
+                    payload.get("config", {}),
+                    emit,
+                    stream_frames=bool(payload.get("stream_frames"))
+                )
+
+        return Handler
@@ -0,0 +1,86 @@
+import os
+import json
+import base64
+import http.client
+
+from core.daemon import DEFAULT_HOST, DEFAULT_PORT
+
+
+class DaemonClient:
+    """本地推理服务的客户端 (GUI 与命令行共用)"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.job_id = None  # 最近一次通过 run_job 提交的任务 id (收到 accepted 事件后可用)
+
+    def _connect(self, timeout=None):
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout or self.timeout)
+
+    def _request_json(self, method, path, payload=None, timeout=None):
+        conn = self._connect(timeout)
+        try:
+            body = json.dumps(payload or {}).encode("utf-8") if method == "POST" else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            return json.loads(conn.getresponse().read() or b"{}")
+        finally:
+            conn.close()
+
+    def is_available(self):
+        """服务是否在线"""
+        try:
+            self.status(timeout=1)
+            return True
+        except OSError:
+            return False
+
+    def status(self, timeout=None):
+        return self._request_json("GET", "/status", timeout=timeout)
+
+    def cancel(self, job_id=None, finalize=False):
+        """取消指定任务 (默认为本客户端最近提交的任务)；任务尚未被服务接受时返回 False"""
+        job_id = job_id or self.job_id
+        if job_id is None:
+            return False
+        payload = {"job_id": job_id, "finalize": finalize}
+        return self._request_json("POST", "/cancel", payload, timeout=5).get("cancelled", False)
+
+    def run_job(self, job_type, config, on_event, stream_frames=False):
+        """
+        提交任务并逐条处理事件流，返回最后一个事件 (done/cancelled/error)。
+        accepted 事件中的任务 id 记录在 self.job_id 中，供 cancel() 使用。
+        路径统一转为绝对路径，避免服务与客户端工作目录不同。
+        """
+        config_dict = config.to_dict()
+        for key in ("input_video_path", "output_dir", "model_path"):
+            if config_dict.get(key):
+                config_dict[key] = os.path.abspath(config_dict[key])
+
+        self.job_id = None
+        conn = self._connect()
+        try:
+            conn.request("POST", "/jobs", body=json.dumps({
+                "job_type": job_type,
+                "config": config_dict,
+                "stream_frames": stream_frames
+            }).encode("utf-8"), headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+
+            last = None
+            for line in response:
+                line = line.strip()
+                if not line:
+                    continue
+                last = json.loads(line)
+                if last.get("event") == "accepted":
+                    self.job_id = last["job_id"]
+                on_event(last)
+            return last
+        finally:
+            conn.close()
+
+    @staticmethod
+    def decode_frame(event):
+        """frame 事件中的 JPEG 字节"""
+        return base64.b64decode(event["jpeg"])
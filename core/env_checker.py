@@ -40,6 +40,15 @@ class EnvironmentChecker:
         except (ImportError, OSError):
             return False
 
+    @staticmethod
+    def check_tomesd():
+        """检测 tomesd (Token Merging) 库是否安装"""
+        try:
+            import tomesd
+            return True
+        except (ImportError, OSError):
+            return False
+
     @staticmethod
     def get_cuda_info():
         """获取显卡名称和显存大小"""
@@ -0,0 +1,270 @@
+import time
+import contextlib
+
+
+class UNetFeatureCache:
+    """
+    跨帧/跨步的 UNet 深层特征复用 (DeepCache 思路)。
+
+    完整前向时缓存“进入最后 branch 个上采样块之前”的特征 (即全部深层块的输出)，按时间步保存；
+    复用时只计算 conv_in、前 branch 个下采样块与最后 branch 个上采样块，深层下采样块、中间块
+    与其余上采样块全部跳过。
+      - 跨帧：相邻帧输入足够相似 (begin_frame(reuse=True)) 时，同一时间步直接使用上一刷新帧的深层特征
+      - 跨步：step_interval > 1 时，每 step_interval 步完整计算一次，其余步复用上一步的深层特征
+    安装方式是替换 unet.forward (启用了 CPU Offload 时替换 accelerate 包装的 _old_forward)，uninstall() 还原。
+    仅支持 SD1.x/2.x 结构的 UNet2DConditionModel。
+    """
+
+    def __init__(self, unet, branch=1, step_interval=1, sync=False):
+        self.unet = unet
+        self.branch = max(1, min(branch, len(unet.up_blocks) - 1))
+        self.step_interval = max(1, step_interval)
+        self.sync = sync  # 计时前同步 CUDA (仅用于精确统计)
+
+        self._features = {}  # 时间步 -> 深层特征 (来自最近一次刷新帧)
+        self._last_feature = None  # 上一步的深层特征 (跨步复用)
+        self._frame_reuse = False
+        self._step = 0
+        self._attr = None
+        self._original = None
+        self._instance_forward = False
+        self._autocast_dtype = None
+
+        # 统计
+        self.full_calls = 0
+        self.reused_calls = 0
+        self.full_time = 0.0
+        self.reused_time = 0.0
+        self.reused_frames = 0
+        self.frames = 0
+
+    # ---------- 安装/卸载 ----------
+    def install(self):
+        # accelerate 的 CPU Offload 钩子会把原 forward 保存在 _old_forward 中并由包装函数调用
+        self._attr = "_old_forward" if hasattr(self.unet, "_hf_hook") else "forward"
+        self._original = getattr(self.unet, self._attr)
+        # 已被其他包装替换的实例属性 (如 CPU bf16 自动混合精度)，卸载时需要恢复而不是删除
+        self._instance_forward = self._attr == "forward" and "forward" in vars(self.unet)
+        self._autocast_dtype = getattr(self._original, "autocast_dtype", None)
+        setattr(self.unet, self._attr, self._forward)
+        return self
+
+    def uninstall(self):
+        if self._attr is None:
+            return
+        if self._attr == "forward" and not self._instance_forward:
+            # 删除实例属性，恢复类上定义的 forward
+            try:
+                del self.unet.forward
+            except AttributeError:
+                pass
+        else:
+            setattr(self.unet, self._attr, self._original)
+        self._attr = None
+        self._features.clear()
+        self._last_feature = None
+
+    # ---------- 逐帧控制 ----------
+    def begin_frame(self, reuse):
+        """每帧开始时调用；reuse=True 表示本帧与上一刷新帧足够相似，可复用其深层特征"""
+        self._frame_reuse = reuse and bool(self._features)
+        self._step = 0
+        self._last_feature = None
+        self.frames += 1
+        if self._frame_reuse:
+            self.reused_frames += 1
+
+    # ---------- 前向 ----------
+    def _forward(self, sample, timestep, encoder_hidden_states, *args, **kwargs):
+        import torch
+
+        if self.sync and torch.cuda.is_available():
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+
+        key = float(timestep.flatten()[0]) if torch.is_tensor(timestep) else float(timestep)
+        cached = None
+        if self._frame_reuse:
+            cached = self._features.get(key)
+        elif self._step % self.step_interval != 0:
+            cached = self._last_feature
+        if cached is not None and cached.shape[0] != sample.shape[0]:
+            cached = None  # 批大小变化 (如切换 CFG)
+
+        # 精简前向不经过被替换的 forward，需自行沿用其自动混合精度
+        autocast = (torch.autocast("cpu", dtype=self._autocast_dtype) if self._autocast_dtype is not None
+                    else contextlib.nullcontext())
+        with autocast:
+            if cached is None:
+                result, feature = self._run(sample, timestep, encoder_hidden_states, None, **kwargs)
+                self._last_feature = feature
+                if not self._frame_reuse:
+                    self._features[key] = feature
+            else:
+                result, _ = self._run(sample, timestep, encoder_hidden_states, cached, **kwargs)
+        self._step += 1
+
+        if self.sync and torch.cuda.is_available():
+            torch.cuda.synchronize()
+        elapsed = time.perf_counter() - start
+        if cached is None:
+            self.full_calls += 1
+            self.full_time += elapsed
+        else:
+            self.reused_calls += 1
+            self.reused_time += elapsed
+        return result
+
+    def _run(self, sample, timestep, encoder_hidden_states, cached_feature,
+             cross_attention_kwargs=None, down_block_additional_residuals=None,
+             mid_block_additional_residual=None, return_dict=True, **_):
+        """UNet2DConditionModel.forward 的精简版，cached_feature 不为 None 时跳过深层块"""
+        import torch
+        try:
+            from diffusers.models.unets.unet_2d_condition import UNet2DConditionOutput
+        except ImportError:  # diffusers < 0.25
+            from diffusers.models.unet_2d_condition import UNet2DConditionOutput
+
+        unet = self.unet
+        n_up = len(unet.up_blocks)
+        shallow_up = n_up - self.branch  # 从该下标开始的上采样块为浅层块
+
+        # 输入尺寸不是上采样倍数的整数倍时需要显式传入 upsample_size
+        overall_up_factor = 2 ** unet.num_upsamplers
+        forward_upsample_size = any(s % overall_up_factor != 0 for s in sample.shape[-2:])
+
+        # 1. 时间嵌入
+        timesteps = timestep
+        if not torch.is_tensor(timesteps):
+            timesteps = torch.tensor([timesteps], dtype=torch.float32, device=sample.device)
+        elif timesteps.ndim == 0:
+            timesteps = timesteps[None].to(sample.device)
+        timesteps = timesteps.expand(sample.shape[0])
+        emb = unet.time_embedding(unet.time_proj(timesteps).to(dtype=sample.dtype))
+
+        def has_cross(block):
+            return getattr(block, "has_cross_attention", False)
+
+        # 2. 下采样 (复用时只计算浅层块)
+        sample = unet.conv_in(sample)
+        down_res = (sample,)
+        down_blocks = unet.down_blocks if cached_feature is None else unet.down_blocks[:self.branch]
+        for block in down_blocks:
+            if has_cross(block):
+                sample, res = block(hidden_states=sample, temb=emb, encoder_hidden_states=encoder_hidden_states,
+                                    cross_attention_kwargs=cross_attention_kwargs)
+            else:
+                sample, res = block(hidden_states=sample, temb=emb)
+            down_res += res
+
+        if cached_feature is not None:
+            # 浅层上采样块只消费最前面的残差
+            n_needed = sum(len(b.resnets) for b in unet.up_blocks[shallow_up:])
+            down_res = down_res[:n_needed]
+
+        if down_block_additional_residuals is not None:
+            # ControlNet 残差与完整残差列表一一对应，复用时只取浅层部分
+            down_res = tuple(r + a for r, a in zip(down_res, down_block_additional_residuals))
+
+        # 3. 中间块与深层上采样块
+        feature = cached_feature
+        if cached_feature is None:
+            if unet.mid_block is not None:
+                sample = unet.mid_block(sample, emb, encoder_hidden_states=encoder_hidden_states,
+                                        cross_attention_kwargs=cross_attention_kwargs)
+            if mid_block_additional_residual is not None:
+                sample = sample + mid_block_additional_residual
+            for i, block in enumerate(unet.up_blocks[:shallow_up]):
+                sample, down_res = self._up(block, sample, emb, down_res, encoder_hidden_states,
+                                            cross_attention_kwargs, forward_upsample_size, False)
+            feature = sample
+        else:
+            sample = cached_feature
+
+        # 4. 浅层上采样块
+        for i, block in enumerate(unet.up_blocks[shallow_up:]):
+            is_final = shallow_up + i == n_up - 1
+            sample, down_res = self._up(block, sample, emb, down_res, encoder_hidden_states,
+                                        cross_attention_kwargs, forward_upsample_size, is_final)
+
+        # 5. 输出
+        if unet.conv_norm_out is not None:
+            sample = unet.conv_act(unet.conv_norm_out(sample))
+        sample = unet.conv_out(sample)
+
+        if not return_dict:
+            return (sample,), feature
+        return UNet2DConditionOutput(sample=sample), feature
+
+    @staticmethod
+    def _up(block, sample, emb, down_res, encoder_hidden_states, cross_attention_kwargs,
+            forward_upsample_size, is_final):
+        n = len(block.resnets)
+        res, down_res = down_res[-n:], down_res[:-n]
+        upsample_size = down_res[-1].shape[2:] if (not is_final and forward_upsample_size) else None
+        if getattr(block, "has_cross_attention", False):
+            sample = block(hidden_states=sample, temb=emb, res_hidden_states_tuple=res,
+                           encoder_hidden_states=encoder_hidden_states,
+                           cross_attention_kwargs=cross_attention_kwargs, upsample_size=upsample_size)
+        else:
+            sample = block(hidden_states=sample, temb=emb, res_hidden_states_tuple=res,
+                           upsample_size=upsample_size)
+        return sample, down_res
+
+    # ---------- 统计 ----------
+    @property
+    def reuse_rate(self):
+        total = self.full_calls + self.reused_calls
+        return self.reused_calls / total if total else 0.0
+
+    @property
+    def time_saved(self):
+        """按“复用调用若完整计算需要的平均耗时”估算节省的时间 (秒)"""
+        if not self.full_calls or not self.reused_calls:
+            return 0.0
+        avg_full = self.full_time / self.full_calls
+        avg_reused = self.reused_time / self.reused_calls
+        return max(0.0, (avg_full - avg_reused) * self.reused_calls)
+
+    def summary(self):
+        return (f"UNet 调用复用率 {self.reuse_rate * 100:.0f}% ({self.reused_calls}/"
+                f"{self.full_calls + self.reused_calls})，复用帧 {self.reused_frames}/{self.frames}，"
+                f"估计节省 {self.time_saved:.1f} s")
+
+
+class FrameReuseGate:
+    """
+    跨帧特征复用的判定：把本帧的解码源视频帧与最近一次完整计算 (刷新帧) 的源视频帧比较。
+    不能用管线输入比较：骨骼模式的输入是几乎全黑的骨骼图，画面主体/背景变化后相似度仍接近 1；
+    链式图生图的输入是混合了上一帧结果的起点图。
+    """
+
+    def __init__(self, threshold, refresh):
+        self.threshold = threshold
+        self.refresh = refresh
+        self._ref_frame = None
+        self._reused_run = 0  # 刷新帧之后已连续复用的帧数
+
+    def decide(self, source_frame, cut=False):
+        """返回本帧是否复用刷新帧的特征；镜头切换时不复用上一镜头的特征"""
+        if cut:
+            self._ref_frame = None
+        reuse = (self._ref_frame is not None
+                 and self._reused_run < self.refresh
+                 and frame_similarity(source_frame, self._ref_frame) >= self.threshold)
+        if reuse:
+            self._reused_run += 1
+        else:
+            self._ref_frame = source_frame.copy()  # 源帧可能随后被回收，保留副本
+            self._reused_run = 0
+        return reuse
+
+
+def frame_similarity(a, b, stride=8):
+    """两帧的粗略相似度 (0~1)：降采样后的平均绝对差"""
+    import numpy as np
+
+    if a is None or b is None or a.shape != b.shape:
+        return 0.0
+    diff = np.abs(a[::stride, ::stride].astype(np.int16) - b[::stride, ::stride].astype(np.int16))
+    return 1.0 - float(diff.mean()) / 255.0
@@ -0,0 +1,574 @@
+import os
+import glob
+import json
+import zlib
+import shutil
+import struct
+import tempfile
+import itertools
+from collections import deque
+
+import numpy as np
+
+from core.async_writer import AsyncFrameWriter
+
+# 头文件：魔数 + 版本 + 高/宽/通道 + 已写入帧数 + 每段帧数；帧数据按段存放在 path.0000、path.0001 ... 中
+MAGIC = b"V2AFRM02"
+HEADER_FORMAT = "<8sIIIIQQ"
+
+
+class BaseFrameStore:
+    """
+    帧存储统一接口 (拆帧/骨骼/生成各阶段均通过该接口读写)：
+      append(frame) -> index      写入一帧 (HxWxC uint8)
+      store[i]                    读取第 i 帧 (从 0 开始)
+      len(store)                  已写入帧数
+      shape                       单帧形状，尚未写入时为 None
+      release(i)                  声明第 i 帧已被所有消费者使用，存储可立即回收其空间
+      discard()                   关闭并删除整个存储
+    """
+
+    def append(self, frame):
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def shape(self):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def release(self, index):
+        """默认不做任何事 (定长文件无法回收单帧空间，只能在整个数据流用完后 discard)"""
+        pass
+
+    def discard(self):
+        self.close()
+
+    def _check_index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"帧索引越界: {index} (共 {len(self)} 帧)")
+        return index
+
+
+class MemmapFrameStore(BaseFrameStore):
+    """
+    内存映射的分段帧文件：一个数据流一个头文件，帧数据每 segment_frames 帧一段，每段是一个单独映射的定长文件。
+    O(1) 随机访问，读取返回指向映射区的 NumPy 视图 (零拷贝)；写满一段后新建下一段，无需扩容或重新映射。
+    某一段的帧全部 release 后立即删除该段文件，被逐帧消费的数据流 (拆帧流) 因此可以边用边回收磁盘空间。
+    """
+
+    def __init__(self, path, segment_frames=16, mode="w"):
+        self.path = path
+        self.segment_frames = max(1, segment_frames)
+        self._count = 0
+        self._shape = None
+        self._segments = []  # 每段的映射，已删除的段为 None
+        self._released = {}  # 段号 -> 该段已释放的帧数
+        self._unlinked = []  # 仍被视图占用、暂时无法删除的段文件 (Windows)，稍后重试
+
+        if mode == "r":
+            self._open_existing()
+        else:
+            for p in self._files():
+                os.remove(p)
+
+    def _segment_path(self, segment):
+        return f"{self.path}.{segment:04d}"
+
+    def _files(self):
+        """头文件与全部段文件"""
+        files = glob.glob(glob.escape(self.path) + ".[0-9][0-9][0-9][0-9]")
+        return files + [self.path] if os.path.exists(self.path) else files
+
+    # ---------- 文件头 ----------
+    def _write_header(self):
+        h, w, c = self._shape
+        with open(self.path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, 2, h, w, c, self._count, self.segment_frames))
+
+    def _open_existing(self):
+        with open(self.path, "rb") as f:
+            magic, _, h, w, c, count, segment_frames = struct.unpack(
+                HEADER_FORMAT, f.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC:
+            raise ValueError(f"不是有效的帧存储文件: {self.path}")
+        self._shape = (h, w, c)
+        self._count = count
+        self.segment_frames = segment_frames
+        for segment in range(-(-count // segment_frames)):
+            path = self._segment_path(segment)
+            self._segments.append(self._map(path) if os.path.exists(path) else None)
+
+    def _map(self, path):
+        return np.memmap(path, dtype=np.uint8, mode="r+", shape=(self.segment_frames,) + self._shape)
+
+    def _new_segment(self):
+        path = self._segment_path(len(self._segments))
+        with open(path, "wb") as f:
+            f.truncate(self.segment_frames * int(np.prod(self._shape)))
+        self._segments.append(self._map(path))
+
+    def _locate(self, index):
+        segment, offset = divmod(self._check_index(index), self.segment_frames)
+        data = self._segments[segment]
+        if data is None:
+            raise KeyError(f"帧 {index} 已被释放")
+        return data, offset
+
+    # ---------- 接口 ----------
+    def append(self, frame):
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+
+        if self._shape is None:
+            self._shape = frame.shape
+        elif frame.shape != self._shape:
+            raise ValueError(f"帧尺寸不一致: {frame.shape} != {self._shape}")
+
+        segment, offset = divmod(self._count, self.segment_frames)
+        if segment == len(self._segments):
+            self._new_segment()
+        self._segments[segment][offset] = frame
+        self._count += 1
+        return self._count - 1
+
+    def __getitem__(self, index):
+        data, offset = self._locate(index)
+        return data[offset]
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def shape(self):
+        return self._shape
+
+    def __setitem__(self, index, frame):
+        """覆盖已写入的一帧 (用于回收槽位)"""
+        data, offset = self._locate(index)
+        data[offset] = frame
+
+    def release(self, index):
+        """一段中的帧全部释放 (且该段已写满) 后删除段文件；同一帧不应重复释放"""
+        segment = index // self.segment_frames
+        released = self._released.get(segment, 0) + 1
+        self._released[segment] = released
+        if released >= self.segment_frames and self._segments[segment] is not None:
+            self._segments[segment] = None
+            self._unlinked.append(self._segment_path(segment))
+        self._remove_unlinked()
+
+    def _remove_unlinked(self):
+        pending = []
+        for path in self._unlinked:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                pending.append(path)  # Windows 上仍有视图引用该映射时无法删除
+        self._unlinked = pending
+
+    def flush(self):
+        if self._shape is None:
+            return
+        for data in self._segments:
+            if data is not None:
+                data.flush()
+        self._write_header()
+
+    def close(self):
+        self.flush()
+        self._segments = [None] * len(self._segments)
+        self._remove_unlinked()
+
+    def discard(self):
+        self._segments = []
+        self._unlinked.extend(self._files())
+        self._remove_unlinked()
+
+
+class ChunkedFrameStore(BaseFrameStore):
+    """
+    分块压缩帧文件：每 chunk_frames 帧用 zlib 压缩为一块，块索引写入同名 .idx 文件。
+    体积显著小于定长文件，代价是读取时需要解压整块 (保留最近一块的缓存，顺序读取几乎无额外开销)。
+    """
+
+    def __init__(self, path, chunk_frames=16, level=1, mode="w"):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.chunk_frames = chunk_frames
+        self.level = level
+        self._shape = None
+        self._chunks = []  # [(offset, length, n_frames)]
+        self._pending = []
+        self._cached_chunk = (None, None)
+
+        if mode == "r":
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self._shape = tuple(meta["shape"])
+            self.chunk_frames = meta["chunk_frames"]
+            self._chunks = [tuple(c) for c in meta["chunks"]]
+        else:
+            for p in (self.path, self.index_path):
+                if os.path.exists(p):
+                    os.remove(p)
+            open(self.path, "wb").close()
+
+    def append(self, frame):
+        frame = np.asarray(frame, dtype=np.uint8)
+        if self._shape is None:
+            self._shape = frame.shape
+        elif frame.shape != self._shape:
+            raise ValueError(f"帧尺寸不一致: {frame.shape} != {self._shape}")
+
+        self._pending.append(frame.copy())
+        if len(self._pending) >= self.chunk_frames:
+            self._flush_chunk()
+        return len(self) - 1
+
+    def _flush_chunk(self):
+        if not self._pending:
+            return
+        payload = zlib.compress(np.stack(self._pending).tobytes(), self.level)
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+        self._chunks.append((offset, len(payload), len(self._pending)))
+        self._pending = []
+
+    def _load_chunk(self, chunk_idx):
+        if self._cached_chunk[0] != chunk_idx:
+            offset, length, n = self._chunks[chunk_idx]
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                raw = zlib.decompress(f.read(length))
+            self._cached_chunk = (chunk_idx, np.frombuffer(raw, dtype=np.uint8).reshape((n,) + self._shape))
+        return self._cached_chunk[1]
+
+    def __getitem__(self, index):
+        index = self._check_index(index)
+        chunk_idx, offset = divmod(index, self.chunk_frames)
+        if chunk_idx >= len(self._chunks):
+            return self._pending[offset]
+        return self._load_chunk(chunk_idx)[offset]
+
+    def __len__(self):
+        return sum(n for _, _, n in self._chunks) + len(self._pending)
+
+    @property
+    def shape(self):
+        return self._shape
+
+    def flush(self):
+        self._flush_chunk()
+        if self._shape is None:
+            return
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"shape": list(self._shape), "chunk_frames": self.chunk_frames,
+                       "chunks": self._chunks}, f)
+
+    def close(self):
+        self.flush()
+
+    def discard(self):
+        self._pending = []
+        self._cached_chunk = (None, None)
+        for p in (self.path, self.index_path):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+class JpegFrameDir(BaseFrameStore):
+    """
+    传统布局：目录中每帧一个 frame_%04d.jpg (编号从 1 开始)，便于人工查看。
+    写入通过 AsyncFrameWriter 在后台线程中完成；读取某帧前会先等待该帧写完。
+    """
+
+    def __init__(self, directory, quality=95, mode="w", workers=2, max_pending=8):
+        self.directory = directory
+        self.quality = quality
+        self._shape = None
+        self._writer = None
+        if mode == "w":
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
+            self._writer = AsyncFrameWriter(workers, max_pending, quality)
+        os.makedirs(directory, exist_ok=True)
+        self._count = len(glob.glob(os.path.join(directory, "frame_*.jpg")))
+
+    def frame_path(self, index):
+        return os.path.join(self.directory, f"frame_{index + 1:04d}.jpg")
+
+    @property
+    def in_flight(self):
+        return self._writer.in_flight if self._writer is not None else 0
+
+    def append(self, frame):
+        # 复制一份：调用方可能复用同一块缓冲区 (见 TensorFrameIO)
+        frame = np.array(frame, dtype=np.uint8, copy=True)
+        self._shape = self._shape or frame.shape
+        self._writer.submit(self.frame_path(self._count), frame)
+        self._count += 1
+        return self._count - 1
+
+    def __getitem__(self, index):
+        from PIL import Image
+
+        path = self.frame_path(self._check_index(index))
+        if self._writer is not None:
+            self._writer.wait_for(path)
+        frame = np.asarray(Image.open(path).convert("RGB"))
+        self._shape = self._shape or frame.shape
+        return frame
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def shape(self):
+        if self._shape is None and self._count:
+            self[0]
+        return self._shape
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self):
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+
+    def release(self, index):
+        path = self.frame_path(index)
+        if self._writer is not None:
+            self._writer.wait_for(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
+
+
+class MemoryBudget:
+    """
+    多个 RamFrameStore 共享的内存预算。
+    按写入顺序记录所有驻留内存的帧，超出预算时全局最早写入的帧先被换出到磁盘。
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit_bytes = max(0, int(limit_bytes))
+        self.used_bytes = 0
+        self.peak_bytes = 0
+        self._order = deque()  # [(store, index)]
+
+    def reserve(self, store, index, nbytes):
+        """为新帧腾出空间；返回 False 表示预算无法容纳该帧 (应直接写入磁盘)"""
+        if nbytes > self.limit_bytes:
+            return False
+        while self.used_bytes + nbytes > self.limit_bytes and self._order:
+            victim, victim_index = self._order.popleft()
+            victim._evict(victim_index)  # 已被 release 的帧会被跳过
+        self.used_bytes += nbytes
+        self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+        self._order.append((store, index))
+        return True
+
+    def release(self, nbytes):
+        self.used_bytes -= nbytes
+
+    def forget(self, store):
+        """移除某个存储的全部记录 (存储关闭时调用)"""
+        self._order = deque(item for item in self._order if item[0] is not store)
+
+
+class RamFrameStore(BaseFrameStore):
+    """
+    内存帧存储：帧保存在内存中，超出共享预算时最早写入的帧换出到本地高速临时目录
+    (spill_dir，默认系统临时目录) 的内存映射文件中；已 release 的帧直接丢弃，不会被换出。
+    """
+
+    _serial = itertools.count()
+
+    def __init__(self, name, budget, spill_dir="", segment_frames=16):
+        self.name = name
+        self.budget = budget
+        self.spill_dir = os.path.join(spill_dir or tempfile.gettempdir(), "video2ai_spill")
+        self.segment_frames = segment_frames
+        self._frames = {}  # index -> ndarray (仍在内存中的帧)
+        self._slots = {}  # index -> 换出文件中的下标
+        self._free_slots = []  # 已释放帧留下的槽位，换出时优先复用
+        self._spill_file = None
+        self.spill_count = 0
+        self._count = 0
+        self._shape = None
+        self.hits = 0
+        self.misses = 0
+
+    def append(self, frame):
+        frame = np.array(frame, dtype=np.uint8, copy=True)
+        if self._shape is None:
+            self._shape = frame.shape
+        elif frame.shape != self._shape:
+            raise ValueError(f"帧尺寸不一致: {frame.shape} != {self._shape}")
+
+        index = self._count
+        self._count += 1
+        if self.budget.reserve(self, index, frame.nbytes):
+            self._frames[index] = frame
+        else:
+            self._write_spill(index, frame)
+        return index
+
+    def _spill_store(self):
+        if self._spill_file is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f"{os.getpid()}_{next(self._serial)}_{self.name}.v2af")
+            self._spill_file = MemmapFrameStore(path, self.segment_frames)
+        return self._spill_file
+
+    def _write_spill(self, index, frame):
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._spill_file[slot] = frame
+        else:
+            slot = self._spill_store().append(frame)
+        self._slots[index] = slot
+        self.spill_count += 1
+
+    def _evict(self, index):
+        # 由 MemoryBudget 调用，将内存中的帧换出到磁盘
+        frame = self._frames.pop(index, None)
+        if frame is None:
+            return
+        self._write_spill(index, frame)
+        self.budget.release(frame.nbytes)
+
+    def release(self, index):
+        frame = self._frames.pop(index, None)
+        if frame is not None:
+            self.budget.release(frame.nbytes)
+        slot = self._slots.pop(index, None)
+        if slot is not None:
+            self._free_slots.append(slot)
+
+    def __getitem__(self, index):
+        index = self._check_index(index)
+        frame = self._frames.get(index)
+        if frame is not None:
+            self.hits += 1
+            return frame
+        if index not in self._slots:
+            raise KeyError(f"帧 {index} 已被释放")
+        self.misses += 1
+        return self._spill_file[self._slots[index]]
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def shape(self):
+        return self._shape
+
+    def stats(self):
+        return {"frames": self._count, "in_memory": len(self._frames), "spilled": self.spill_count,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.budget.forget(self)
+        for frame in self._frames.values():
+            self.budget.release(frame.nbytes)
+        self._frames = {}
+        self._slots = {}
+        self._free_slots = []
+        if self._spill_file is not None:
+            self._spill_file.discard()
+            self._spill_file = None
+
+
+def describe_stats(stores, budget=None):
+    """汇总各内存帧存储的命中/换出统计，返回一行可读文本"""
+    parts = []
+    for name, store in stores.items():
+        if isinstance(store, RamFrameStore):
+            st = store.stats()
+            total = st["hits"] + st["misses"]
+            rate = st["hits"] / total * 100 if total else 100.0
+            parts.append(f"{name}: 命中 {rate:.0f}% 换出 {st['spilled']}/{st['frames']}")
+    if budget is not None and parts:
+        parts.append(f"内存峰值 {budget.peak_bytes / 1024 / 1024:.0f}/{budget.limit_bytes / 1024 / 1024:.0f} MB")
+    return " | ".join(parts)
+
+
+# 存储类型 -> (类, 路径后缀)；ram 为非持久化存储，没有落盘路径
+FRAME_STORE_KINDS = {
+    "memmap": (MemmapFrameStore, ".v2af"),
+    "chunked": (ChunkedFrameStore, ".v2afz"),
+    "jpeg": (JpegFrameDir, ""),
+    "ram": (RamFrameStore, None),
+}
+
+
+def store_path(kind, base_path):
+    return base_path + FRAME_STORE_KINDS[kind][1]
+
+
+def create_frame_store(kind, base_path, config=None, budget=None):
+    """
+    按类型新建 (覆盖) 一个帧存储，base_path 不含后缀。
+    ram 类型的多个存储应共享同一个 MemoryBudget；未提供时按 config.ram_budget_mb 单独创建。
+    memmap 的每段帧数、chunked 的每块帧数与 ram 换出文件的每段帧数均取 config.frame_store_chunk。
+    """
+    if kind not in FRAME_STORE_KINDS:
+        raise ValueError(f"未知的帧存储类型: {kind}")
+    chunk = config.frame_store_chunk if config is not None else 16
+    if kind == "ram":
+        if budget is None:
+            budget = MemoryBudget((config.ram_budget_mb if config is not None else 2048) * 1024 * 1024)
+        spill_dir = config.spill_dir if config is not None else ""
+        return RamFrameStore(os.path.basename(base_path), budget, spill_dir, chunk)
+
+    path = store_path(kind, base_path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if kind == "memmap":
+        return MemmapFrameStore(path, chunk)
+    if kind == "chunked":
+        return ChunkedFrameStore(path, chunk_frames=chunk)
+    if config is not None:
+        return JpegFrameDir(path, workers=config.writer_threads, max_pending=config.writer_queue)
+    return JpegFrameDir(path)
+
+
+def open_frame_store(kind, base_path):
+    """打开已存在的帧存储，不存在、损坏或为非持久化类型时返回 None"""
+    if FRAME_STORE_KINDS[kind][1] is None:
+        return None
+    path = store_path(kind, base_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        return FRAME_STORE_KINDS[kind][0](path, mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
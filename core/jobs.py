@@ -0,0 +1,637 @@
+import os
+import time
+import shutil
+import collections
+from concurrent.futures import Future
+
+from core import memory_policy
+from core.cancellation import CancelToken, JobCancelled, step_callback_kwargs
+from core.video_io import (
+    probe_video_size, estimate_frame_count, decode_frames, FrameEncoder
+)
+
+
+# 注意：本模块不依赖 Qt，既可在 GUI 的 QThread 中运行，也可在独立推理进程中运行
+# torch, PIL 与姿态检测后端仍在 run() 中延迟导入
+
+class BaseJob:
+    """
+    任务基类：通过回调汇报进度，通过 CancelToken 响应取消。
+    on_progress(value, text) / on_preview(image_path) / on_frame(rgb_ndarray)
+    pipeline_factory(config) 可替换默认的模型加载 (见 PipelineLoader.get_pipeline)，只作用于本任务
+    """
+
+    def __init__(self, config, cancel_token=None, on_progress=None, on_preview=None, on_frame=None,
+                 pipeline_factory=None):
+        self.config = config
+        self.pipeline_factory = pipeline_factory
+        self.cancel_token = cancel_token or CancelToken()
+        self._on_progress = on_progress
+        self._on_preview = on_preview
+        self._on_frame = on_frame
+
+    def progress(self, value, text):
+        if self._on_progress:
+            self._on_progress(value, text)
+
+    def preview(self, image_path):
+        if self._on_preview:
+            self._on_preview(image_path)
+
+    def frame(self, image):
+        """推送实时预览帧 (HxWx3 uint8 ndarray 或 PIL.Image)；没有监听者时不做任何转换"""
+        if self._on_frame:
+            import numpy as np
+            if not isinstance(image, np.ndarray):
+                image = np.asarray(image.convert("RGB"))
+            self._on_frame(image)
+
+    def execute(self):
+        """运行任务。返回 True 表示正常完成，False 表示被中止；其他异常向上抛出"""
+        try:
+            self.run()
+            return True
+        except JobCancelled:
+            self.on_cancelled()
+            return False
+        finally:
+            self.cleanup()
+
+    def run(self):
+        raise NotImplementedError
+
+    def on_cancelled(self):
+        latency = self.cancel_token.stop_latency
+        latency_text = f"，停止耗时 {latency * 1000:.0f} ms" if latency is not None else ""
+        print(f">> 任务已中止{latency_text}")
+        self.progress(0, f"任务已中止{latency_text}")
+
+    def cleanup(self):
+        pass
+
+
+class RenderJob(BaseJob):
+    """
+    完整渲染任务：拆帧 -> 骨骼检测 (可选) -> 逐帧生成 -> 合成视频
+    中间帧在所有消费者用完后立即回收：拆帧流逐帧释放 (memmap 按段删除，jpeg 逐帧删除，ram 释放内存/换出槽位；
+    chunked 在整个数据流用完后才删除)，生成帧直接流式写入编码器。
+    拆帧先于生成全部完成，因此临时目录的峰值占用为完整的拆帧流：memmap/ram 换出为未压缩的 宽×高×3×帧数，
+    chunked 与 jpeg 约为其 0.6 / 0.15 (见 core/preflight.py)；骨骼模式下骨骼流另外持久化在输出目录中
+    (ram 模式除外：骨骼流与拆帧流共享内存预算，超出部分换出，不写输出盘)。
+    骨骼模式开启跨帧特征复用时，拆帧流保留到生成阶段逐帧回收，用于按源视频帧判定相似度。
+    """
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.temp_dir = None
+        self.streams = {}
+        self.budget = None
+        self.encoder = None
+        self.feature_cache = None
+        self.vae_stage = None
+        self.produced = 0  # 已生成的帧数 (用于停止后合成部分视频)
+
+    def run(self):
+        # === 延迟导入区 ===
+        import numpy as np
+        import torch
+        from PIL import Image
+        from core.pipeline_utils import PipelineLoader
+        from core.precision import inference_device
+        from core.pose_cache import PoseCache
+        from core.pose_backends import create_pose_backend, draw_openpose, to_pixels
+        from core.pose_tracking import SparsePoseTracker, KeypointSmoother
+        from core.preflight import DiskPreflight
+        from core.tensor_io import TensorFrameIO, StageProfiler
+        from core.result_cache import FrameResultCache, config_hash
+        from core.feature_cache import UNetFeatureCache, FrameReuseGate
+        from core.temporal import Img2ImgChain
+        from core.vae_decode import VAEDecodeStage, TinyDecoder
+        from core.scene_cuts import SceneCutDetector, save_shots, load_shots
+        from core.upscale import render_size, create_upscaler
+        from core.frame_store import create_frame_store, open_frame_store, describe_stats, MemoryBudget
+        # =================
+
+        base_dir = self.config.output_dir
+        fps = self.config.target_fps
+        kind = self.config.frame_store
+
+        if not self.config.input_video_path or not os.path.exists(self.config.input_video_path):
+            raise ValueError("无效的视频输入路径")
+
+        # 确保主输出目录存在
+        os.makedirs(base_dir, exist_ok=True)
+
+        # 临时目录 (用于存放中间帧)
+        self.temp_dir = os.path.join(base_dir, self.config.temp_dir_name)
+
+        # 清理并创建必要的目录
+        if os.path.exists(self.temp_dir):
+            self.progress(1, "清理旧临时文件...")
+            shutil.rmtree(self.temp_dir)  # 每次运行前清理旧的临时目录
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+        # 预估帧数，用于磁盘预检
+        src_w, src_h = probe_video_size(self.config.input_video_path)
+        if not src_w:
+            raise ValueError("无法读取视频尺寸，请检查 ffprobe 是否可用")
+        # 拆帧/骨骼/生成均按生成分辨率进行，编码前再放大到输出分辨率
+        (width, height), out_size = render_size(self.config, src_w, src_h)
+        upscaler = create_upscaler(self.config) if out_size != (width, height) else None
+        # 子片段：只拆帧/生成/编码 [clip_start, clip_end) 区间
+        clip_start, clip_end = self.config.clip_start, self.config.clip_end
+        estimated = estimate_frame_count(self.config.input_video_path, fps, clip_start, clip_end)
+        if estimated <= 0 and (clip_start > 0 or clip_end > 0):
+            raise ValueError("所选片段范围超出视频时长")
+
+        # 完整的骨骼流持久化在 PoseCache 中，参数不变时直接复用，无需再拆帧；
+        # ram 模式不写输出盘，骨骼流与拆帧流共享内存预算，不做持久化
+        pose = None
+        persist_pose = kind != "ram"
+        # 跨帧特征复用按源视频帧判定相似度：骨骼模式下拆帧流需保留到生成阶段
+        keep_raw = self.config.enable_pose and self.config.feature_reuse
+        if self.config.enable_pose:
+            pose_cache = PoseCache(self.config)
+            pose_base = os.path.join(pose_cache.cache_dir, "poses")
+            if persist_pose:
+                pose = self._open_complete_pose(open_frame_store, kind, pose_base)
+
+        if self.config.disk_preflight:
+            for path, needed, free in DiskPreflight.check(self.config, estimated, width, height, pose is not None,
+                                                         out_size):
+                print(f">> 磁盘预检: {os.path.abspath(path)} 需要 {needed / 1024 ** 3:.2f} GB / 可用 {free / 1024 ** 3:.2f} GB")
+
+        # 各阶段实测耗时，渲染完成后写入本机吞吐历史 (见 core/cost_model.py)
+        stats = {}
+
+        # ram 模式下各数据流共享同一份内存预算
+        self.budget = MemoryBudget(self.config.ram_budget_mb * 1024 * 1024) if kind == "ram" else None
+
+        # === 1. 视频拆帧 (rawvideo 管道直接写入帧存储) ===
+        raw = None
+        if pose is None or keep_raw:
+            clip_text = ""
+            if clip_start > 0 or clip_end > 0:
+                clip_text = f", 片段 {clip_start:.2f}s - " + (f"{clip_end:.2f}s" if clip_end > clip_start else "结尾")
+            self.progress(5, f"拆帧中 ({fps}fps, {width}x{height}{clip_text})...")
+            raw = self.streams["raw"] = create_frame_store(
+                kind, os.path.join(self.temp_dir, "frames_raw"), self.config, self.budget)
+            # 拆帧的同时检测镜头切换 (降采样直方图，开销可忽略)
+            scene = SceneCutDetector(self.config.scene_cut_threshold) if self.config.scene_detect else None
+            extract_start = time.perf_counter()
+            for frame in decode_frames(self.config.input_video_path, fps, width, height, self.cancel_token,
+                                       clip_start, clip_end):
+                raw.append(frame)
+                if scene is not None:
+                    scene.push(frame)
+            raw.flush()
+            stats["extract"] = time.perf_counter() - extract_start
+            total_frames = len(raw)
+            if total_frames == 0:
+                raise ValueError("未能从视频中解码出任何帧")
+            shots = scene.shots if scene is not None else None
+            if pose is not None and len(pose) != total_frames:
+                pose.close()  # 与拆帧结果不一致的缓存骨骼流，重新检测
+                pose = None
+        else:
+            total_frames = len(pose)
+            shots = load_shots(self._shots_path(pose_base)) if self.config.scene_detect else None
+
+        # 镜头列表：供关键帧放置、时间缓存重置使用；同时导出到输出目录，便于按镜头拆分为独立片段并行处理
+        cuts = set()
+        if shots:
+            cuts = {start for start, _ in shots[1:]}
+            save_shots(os.path.join(base_dir, "shots.json"), shots)
+            if self.config.enable_pose and persist_pose:
+                save_shots(self._shots_path(pose_base), shots)
+            print(f">> 镜头切换检测: {len(shots)} 个镜头")
+
+        # === 2. 姿态估计 (可选) ===
+        if self.config.enable_pose:
+            if pose is not None:
+                self.progress(40, "复用已缓存的骨骼图" if keep_raw else "复用已缓存的骨骼图 (跳过拆帧)")
+            else:
+                self.progress(15, f"姿态检测中 ({self.config.pose_backend})...")
+                if os.path.exists(pose_base + ".done"):
+                    os.remove(pose_base + ".done")
+                pose = create_frame_store(kind, pose_base, self.config, self.budget)
+                detector = None
+                # 稀疏检测/平滑：按关键点工作，每 pose_interval 帧 (或运动量突增时) 检测一次，中间帧插值
+                sparse = self.config.pose_interval > 1 or self.config.pose_smoothing
+                tracker = None
+                detector_calls = 0
+                pose_start = time.perf_counter()
+
+                for idx in range(total_frames):
+                    self.cancel_token.check()
+                    f_name = f"frame_{idx + 1:04d}.jpg"
+                    if not sparse and pose_cache.has(f_name):
+                        # 预览阶段已检测过 (抽样帧与渲染使用相同的滤镜链与尺寸；旧版缓存的尺寸可能不同)
+                        cached = Image.open(pose_cache.path_for(f_name)).convert("RGB")
+                        if cached.size != (width, height):
+                            cached = cached.resize((width, height))
+                        pose.append(np.asarray(cached))
+                        if not keep_raw:
+                            raw.release(idx)
+                        continue
+                    if detector is None:
+                        detector = create_pose_backend(self.config)
+                        if sparse and detector.supports_keypoints:
+                            smoother = KeypointSmoother(fps) if self.config.pose_smoothing else None
+                            tracker = SparsePoseTracker(detector, self.config.pose_interval,
+                                                        self.config.pose_motion_threshold, smoother)
+                        elif sparse:
+                            print(">> 警告: 当前姿态检测后端不支持输出关键点，回退为逐帧检测")
+
+                    if tracker is not None:
+                        for points in tracker.push(raw[idx], cut=idx in cuts):
+                            pose.append(draw_openpose(to_pixels(points, width, height), height, width))
+                    else:
+                        pose.append(detector.detect(raw[idx]))
+                        detector_calls += 1
+                    if not keep_raw:
+                        raw.release(idx)  # 不做特征复用时拆帧只有这一个消费者
+
+                    prog = 20 + int((idx / total_frames) * 20)
+                    self.progress(prog, f"提取骨骼: {idx + 1}/{total_frames}")
+
+                if tracker is not None:
+                    for points in tracker.finish():
+                        pose.append(draw_openpose(to_pixels(points, width, height), height, width))
+                pose.flush()
+                if persist_pose:
+                    self._mark_pose_complete(pose_base, total_frames)
+
+                pose_elapsed = time.perf_counter() - pose_start
+                # 按实际检测次数校准 (含运动触发的额外检测，不含预览缓存命中的帧)
+                if tracker is not None:
+                    detector_calls = tracker.detector_calls
+                stats["pose"] = (pose_elapsed, detector_calls)
+                calls = tracker.summary() if tracker is not None else f"检测 {detector_calls}/{total_frames} 帧"
+                print(f">> 姿态检测 ({self.config.pose_backend}): {calls}，耗时 {pose_elapsed:.1f} s "
+                      f"({pose_elapsed / total_frames * 1000:.0f} ms/帧)")
+                self.progress(40, f"骨骼提取完成，耗时 {pose_elapsed:.1f} s")
+                if detector is not None:
+                    detector.close()
+                del detector, tracker
+                torch.cuda.empty_cache()
+
+            # 骨骼模式下生成阶段不再需要原始帧 (特征复用的相似度判定除外)
+            if not keep_raw:
+                self._discard_stream("raw")
+                raw = None
+            self.streams["pose"] = pose
+        else:
+            self.progress(20, "跳过骨骼提取 (Img2Img 模式)")
+
+        # === 3. 风格化生成 ===
+        # 生成结果缓存：输入帧与相关参数都未变的帧直接复用，全部命中时连模型都不必加载
+        cache = None
+        if self.config.result_cache:
+            cache = FrameResultCache(self.config.result_cache_dir or None,
+                                     self.config.result_cache_mb * 1024 * 1024)
+            digest = config_hash(self.config)
+
+        # 张量直通：帧以 NumPy/torch 形式从拆帧一路传到编码，不经过 PIL (旧版 diffusers 回退到 PIL)
+        source = pose if self.config.enable_pose else raw
+        pipe = None
+        tensor_io = None
+        profiler = StageProfiler(self.config.profile_frames)
+        # 跨帧特征复用：按源视频帧与最近一次完整计算的帧 (刷新帧) 比较
+        reuse_gate = None
+
+        # 生成帧直接流式编码；jpeg 布局额外保留旧的 frames_out 目录便于查看
+        self.encoder = FrameEncoder(os.path.join(base_dir, "final_output.mp4"), fps)
+        out = None
+        if kind == "jpeg":
+            out = self.streams["out"] = create_frame_store(kind, os.path.join(base_dir, "frames_out"))
+
+        # 两种模式只有输入参数不同
+        if self.config.enable_pose:
+            mode_kwargs = {}  # A: 使用骨骼控制网
+        else:
+            mode_kwargs = {"strength": self.config.denoising_strength}  # B: 图生图，重绘幅度
+
+        # 链式图生图：非关键帧的起点与重绘幅度逐帧变化 (结果缓存以实际起点图像为键，保持正确)
+        chain = None
+        if not self.config.enable_pose and self.config.img2img_chain:
+            chain = Img2ImgChain(self.config.steps, self.config.denoising_strength,
+                                 self.config.chain_strength, self.config.chain_blend,
+                                 self.config.chain_keyframe_interval, self.config.chain_optical_flow)
+
+        # 独立 VAE 解码阶段：管线输出潜变量，完整解码与下一帧的去噪重叠 (链式图生图需要上一帧结果，按顺序解码)；
+        # 实时预览可改用近似解码器，去噪结束后立即显示。两者都在加载模型后创建
+        overlap = (self.config.vae_decode_overlap and chain is None and not self.config.low_vram)
+        tiny = None
+        # 按帧顺序等待输出的帧：(帧号, 结果缓存键 (命中缓存时为 None), 结果帧或解码中的 Future)
+        decoding = collections.deque()
+
+        def emit(idx, key, rgb):
+            """按帧顺序输出一帧：写入结果缓存 -> 放大 -> 编码"""
+            if isinstance(rgb, Future):
+                with profiler.section("vae_wait"):
+                    rgb = rgb.result()
+            if key is not None:
+                cache.put(key, rgb)
+
+            # 放大阶段：结果缓存与时间链都使用放大前的帧
+            if upscaler is not None:
+                start = time.perf_counter()
+                with profiler.section("upscale"):
+                    rgb = upscaler.upscale(rgb, out_size)
+                stats["upscale"] += time.perf_counter() - start
+
+            with profiler.section("encode"):
+                self.encoder.write(rgb)
+                if out is not None:
+                    out.append(rgb)  # 仅 jpeg 布局 (调试/查看用) 才会用到 PIL
+            self.produced += 1
+            if self.config.live_preview_decoder == "full":
+                self.frame(rgb)
+
+            prog = 50 + int((idx / total_frames) * 45)
+            pending = f" (待写入 {out.in_flight} 帧)" if out is not None and out.in_flight else ""
+            cached = f" (缓存命中 {cache.hits})" if cache is not None and cache.hits else ""
+            self.progress(prog, f"帧生成: {idx + 1}/{total_frames}{cached}{pending}")
+
+        if upscaler is not None:
+            stats["upscale"] = 0.0
+            print(f">> 生成分辨率 {width}x{height}，放大 ({upscaler.label}) 到 {out_size[0]}x{out_size[1]} 后编码")
+        self.progress(50, "生成中...")
+        generate_start = time.perf_counter()
+        for idx in range(total_frames):
+            self.cancel_token.check()
+
+            frame_in = source[idx]
+            raw_frame = None
+            if chain is not None:
+                raw_frame = frame_in
+                frame_in, strength = chain.prepare(raw_frame, cut=idx in cuts)
+                mode_kwargs = {"strength": strength}
+            rgb = None
+            key = None
+            if cache is not None:
+                key = FrameResultCache.key(frame_in, digest)
+                rgb = cache.get(key)
+                if rgb is not None:
+                    key = None  # 命中缓存，无需再写入
+
+            if rgb is None:
+                if pipe is None:
+                    self.progress(50, "加载生成模型...")
+                    load_start = time.perf_counter()
+                    device = inference_device()
+                    overlap = overlap and device == "cuda"
+                    pipe = PipelineLoader.get_pipeline(self.config, (width, height), overlapped_decode=overlap,
+                                                       factory=self.pipeline_factory)
+                    prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, self.config)
+                    # 每个去噪步结束后检查取消，停止延迟不超过一个去噪步
+                    step_kwargs = step_callback_kwargs(pipe, self.cancel_token)
+                    if self.config.tensor_io and TensorFrameIO.supports_tensor_output(pipe):
+                        tensor_io = TensorFrameIO(*source.shape[:2], device=device)
+                    profiler.attach_unet(pipe)
+                    if self.config.feature_reuse:
+                        self.feature_cache = UNetFeatureCache(
+                            pipe.unet, step_interval=self.config.feature_reuse_step_interval,
+                            sync=self.config.profile_frames).install()
+                        reuse_gate = FrameReuseGate(self.config.feature_reuse_threshold,
+                                                    self.config.feature_reuse_refresh)
+                    if self.config.live_preview_decoder == "tiny":
+                        tiny = TinyDecoder(pipe, self.config.tiny_vae_path)
+                    if overlap or tiny is not None:
+                        self.vae_stage = VAEDecodeStage(pipe, overlap=overlap)
+                    stats["device"] = self._device_info(torch, device)
+                    stats["load"] = time.perf_counter() - load_start  # 模型加载不计入生成吞吐
+                    if device == "cuda" and not self.config.low_vram:
+                        # 常驻权重之外的激活峰值，用于校准显存估算
+                        stats["weights"] = torch.cuda.memory_allocated()
+                        torch.cuda.reset_peak_memory_stats()
+
+                if self.feature_cache is not None:
+                    # 骨骼模式比较拆帧流，链式图生图比较原始帧 (而非混合后的起点图)
+                    if self.config.enable_pose:
+                        source_frame = raw[idx]
+                    else:
+                        source_frame = raw_frame if raw_frame is not None else frame_in
+                    self.feature_cache.begin_frame(reuse_gate.decide(source_frame, cut=idx in cuts))
+                    del source_frame
+
+                generator = torch.Generator(device=device).manual_seed(self.config.seed)
+
+                with profiler.section("to_input"):
+                    if tensor_io is not None:
+                        image_in = tensor_io.to_input(frame_in)
+                    else:
+                        image_in = Image.fromarray(frame_in)
+
+                if self.vae_stage is not None:
+                    output_type = "latent"
+                else:
+                    output_type = "pt" if tensor_io is not None else "pil"
+                with profiler.section("pipeline"):
+                    images = pipe(
+                        **prompt_kwargs,
+                        image=image_in,  # ControlNet 输入骨骼 / Img2Img 输入原图
+                        num_inference_steps=self.config.steps,
+                        generator=generator,
+                        guidance_scale=self.config.cfg_scale,
+                        output_type=output_type,
+                        **mode_kwargs,
+                        **step_kwargs
+                    ).images
+                del image_in
+
+                if self.vae_stage is not None:
+                    if tiny is not None:
+                        with profiler.section("tiny_decode"):
+                            self.frame(tiny.decode(images))
+                    if overlap:
+                        rgb = self.vae_stage.submit(images)
+                    else:
+                        with profiler.section("vae_decode"):
+                            rgb = self.vae_stage.decode(images)
+                else:
+                    with profiler.section("to_numpy"):
+                        if tensor_io is not None:
+                            rgb = tensor_io.to_numpy(images)
+                        else:
+                            rgb = np.asarray(images[0].convert("RGB"))
+                del images
+                profiler.frames += 1
+
+            if chain is not None:
+                chain.update(raw_frame, rgb)  # 链式模式下按顺序解码，rgb 已是结果帧
+            decoding.append((idx, key, rgb))
+            del frame_in, raw_frame, rgb
+            if raw is not None:
+                raw.release(idx)
+
+            # 按顺序输出已完成的帧；排队帧数超过解码阶段的容量时等待最早的一帧
+            while decoding and (len(decoding) > VAEDecodeStage.max_pending
+                                or not isinstance(decoding[0][2], Future) or decoding[0][2].done()):
+                emit(*decoding.popleft())
+
+            # --- 内存优化：释放 VRAM ---
+            torch.cuda.empty_cache()
+
+        while decoding:
+            emit(*decoding.popleft())
+        generated = total_frames - (cache.hits if cache is not None else 0)
+        generate_elapsed = time.perf_counter() - generate_start - stats.get("load", 0.0) - stats.get("upscale", 0.0)
+        stats["generate"] = (generate_elapsed, generated)
+        if "weights" in stats and PipelineLoader.memory_combo is not None:
+            stats["peak"] = torch.cuda.max_memory_allocated() - stats["weights"]
+            stats["estimated_peak"] = memory_policy.estimate_peak_bytes(
+                width, height, 1, PipelineLoader.memory_combo, stats["device"]["efficient_attention"],
+                self.config.enable_pose, overlap)
+
+        if out is not None:
+            out.flush()  # 阶段边界：等待 frames_out 全部写完
+        profiler.detach()
+        if profiler.enabled:
+            print(f">> {'张量直通' if tensor_io is not None else 'PIL'} 路径 {profiler.summary()}")
+        if cache is not None:
+            print(f">> 生成结果缓存: {cache.summary()}")
+        if chain is not None:
+            print(f">> 链式图生图: {chain.summary()}")
+        if self.feature_cache is not None:
+            print(f">> 特征复用: {self.feature_cache.summary()}")
+            self.feature_cache.uninstall()
+            self.feature_cache = None
+        if self.vae_stage is not None:
+            print(f">> VAE 解码: {self.vae_stage.summary()}")
+            self.vae_stage.close()
+            self.vae_stage = None
+
+        # 管线保持常驻 (由 PipelineLoader 缓存)，下一次预览/渲染无需重新加载
+        del pipe
+        torch.cuda.empty_cache()
+
+        store_stats = describe_stats(self.streams, self.budget)
+        if store_stats:
+            print(f">> 中间帧存储: {store_stats}")
+        self._discard_stream("raw")
+
+        # === 4. 视频合成 (等待编码器写完剩余数据) ===
+        self.progress(95, "合成视频...")
+        finalize_start = time.perf_counter()
+        self.encoder.close()
+        self.encoder = None
+        stats["finalize"] = time.perf_counter() - finalize_start
+
+        stats["frames"] = total_frames
+        self._record_throughput(stats, (width, height), out_size)
+        self.progress(100, "完成！")
+
+    def _device_info(self, torch, device):
+        if device != "cuda":
+            return {"type": device, "name": "CPU", "vram_total": 0, "efficient_attention": True}
+        return {
+            "type": device,
+            "name": torch.cuda.get_device_name(),
+            "vram_total": torch.cuda.get_device_properties(0).total_memory,
+            "efficient_attention": memory_policy.efficient_attention_available(self.config),
+        }
+
+    def _record_throughput(self, stats, size, out_size):
+        """更新本机吞吐历史；写入失败不影响渲染结果"""
+        from core.cost_model import ThroughputHistory
+
+        try:
+            ThroughputHistory().record_render(self.config, size, out_size, stats)
+        except OSError as e:
+            print(f">> 警告: 无法更新吞吐历史: {e}")
+
+    @staticmethod
+    def _open_complete_pose(open_frame_store, kind, pose_base):
+        """仅当骨骼流已完整写入 (存在完成标记且帧数一致) 时返回，否则返回 None"""
+        try:
+            with open(pose_base + ".done", "r", encoding="utf-8") as f:
+                expected = int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+        pose = open_frame_store(kind, pose_base)
+        if pose is None or len(pose) != expected:
+            return None
+        return pose
+
+    def _shots_path(self, pose_base):
+        """与骨骼流一同缓存的镜头列表 (按切点阈值区分)"""
+        return f"{pose_base}.shots-{self.config.scene_cut_threshold:g}.json"
+
+    @staticmethod
+    def _mark_pose_complete(pose_base, total_frames):
+        with open(pose_base + ".done", "w", encoding="utf-8") as f:
+            f.write(str(total_frames))
+
+    def _discard_stream(self, name):
+        store = self.streams.pop(name, None)
+        if store is not None:
+            store.discard()
+
+    def on_cancelled(self):
+        # 停止并合成：结束编码器的输入，已写入的帧即构成部分视频
+        if not (self.cancel_token.finalize and self.produced > 0 and self.encoder is not None):
+            super().on_cancelled()
+            return
+
+        latency = self.cancel_token.stop_latency
+        latency_text = f"停止耗时 {latency * 1000:.0f} ms" if latency is not None else ""
+        print(f">> 任务已中止，{latency_text}")
+        self.progress(95, f"已中止，合成已生成的 {self.produced} 帧...")
+        try:
+            self.encoder.close()
+        except Exception as e:
+            raise RuntimeError(f"部分视频合成失败: {e}") from e
+        finally:
+            self.encoder = None
+        self.progress(100, f"已中止并合成部分视频 ({self.produced} 帧)，{latency_text}")
+
+    def cleanup(self):
+        # 常驻管线的 UNet 恢复原始 forward，不影响之后的预览/扫描
+        if self.feature_cache is not None:
+            self.feature_cache.uninstall()
+            self.feature_cache = None
+        if self.vae_stage is not None:
+            self.vae_stage.close()
+            self.vae_stage = None
+
+        # 未正常结束的编码器：终止并删除不完整的视频
+        if self.encoder is not None:
+            self.encoder.abort()
+            self.encoder = None
+
+        for name, stream in self.streams.items():
+            try:
+                # 临时数据流直接删除；骨骼流与 jpeg 的 frames_out 需要保留
+                if name == "raw":
+                    stream.discard()
+                else:
+                    stream.close()
+            except Exception as e:
+                print(f"关闭帧存储失败: {e}")
+        self.streams = {}
+
+        # === 5. 清理临时文件 (每次清理) ===
+        if self.temp_dir and os.path.exists(self.temp_dir):
+            if not self.cancel_token.cancelled:
+                self.progress(100, "清理临时文件...")
+            try:
+                shutil.rmtree(self.temp_dir)
+            except Exception as e:
+                print(f"清理临时目录失败: {e}")
+
+
+def get_job_class(job_type):
+    """按名称获取任务类 (供独立推理进程/本地服务按名称创建任务)"""
+    from core.preview import PreviewJob
+    from core.sweep import SweepJob
+
+    job_classes = {
+        "render": RenderJob,
+        "preview": PreviewJob,
+        "sweep": SweepJob,
+    }
+    if job_type not in job_classes:
+        raise ValueError(f"未知的任务类型: {job_type}")
+    return job_classes[job_type]
@@ -0,0 +1,111 @@
+# 显存组合按速度从快到慢排列：(注意力切片, VAE 切片, VAE 分块)
+COMBINATIONS = [
+    (False, False, False),
+    (False, True, False),
+    (False, False, True),
+    (False, True, True),
+    (True, True, True),
+]
+# 只使用可用显存的 85%，给碎片与 cuDNN 工作区留余量
+SAFETY_RATIO = 0.85
+
+# 激活占用的经验系数 (SD1.5 fp16 实测量级)：相对“最高分辨率层单个特征图”的倍数
+UNET_CHANNELS = 320
+UNET_ACTIVATION_FACTOR = 40
+CONTROLNET_FACTOR = 1.3  # ControlNet 与 UNet 同时前向，残差一直保留到 UNet 使用
+VAE_CHANNELS = 128
+VAE_ACTIVATION_FACTOR = 10
+ATTENTION_HEADS = 8
+SLICED_ROWS = 4  # enable_attention_slicing("auto")：每次计算 head_dim // 2 = 4 行 (批 × 头)
+VAE_TILE = 512  # diffusers 默认的 VAE 分块大小 (像素)
+
+
+def describe(combo):
+    attention, vae_slicing, vae_tiling = combo
+    names = [name for name, on in (("注意力切片", attention), ("VAE 切片", vae_slicing), ("VAE 分块", vae_tiling)) if on]
+    return " + ".join(names) if names else "不切片/不分块"
+
+
+def estimate_peak_bytes(width, height, batch_size, combo, efficient_attention, controlnet=False,
+                        overlapped_decode=False, dtype_bytes=2):
+    """
+    估算一次生成的激活峰值 (不含已加载的权重)：
+      UNet：CFG 使批大小翻倍；普通注意力生成 批 × 头 × tokens² 的分数矩阵，SDPA/xFormers 不生成，
+            切片后每次只计算 SLICED_ROWS 行 (切片会替换注意力处理器，高效注意力随之失效)
+      VAE 解码：全分辨率的卷积激活 + 中间块的单头自注意力；切片时逐张解码，分块时按 VAE_TILE 分块
+    去噪与解码按顺序进行时取两者较大值；解码与下一帧去噪重叠 (RenderJob) 时两者同时存在。
+    """
+    attention, vae_slicing, vae_tiling = combo
+    tokens = (width // 8) * (height // 8)
+    unet_batch = 2 * batch_size
+
+    unet = unet_batch * tokens * UNET_CHANNELS * dtype_bytes * UNET_ACTIVATION_FACTOR
+    if controlnet:
+        unet *= CONTROLNET_FACTOR
+    # 注意力分数与 softmax 结果各一份
+    if attention:
+        unet += SLICED_ROWS * tokens ** 2 * dtype_bytes * 2
+    elif not efficient_attention:
+        unet += unet_batch * ATTENTION_HEADS * tokens ** 2 * dtype_bytes * 2
+
+    decode_batch = 1 if vae_slicing else batch_size
+    pixels = width * height
+    vae_tokens = tokens
+    if vae_tiling:
+        pixels = min(pixels, VAE_TILE ** 2)
+        vae_tokens = min(tokens, (VAE_TILE // 8) ** 2)
+    vae = decode_batch * pixels * VAE_CHANNELS * dtype_bytes * VAE_ACTIVATION_FACTOR
+    if attention or not efficient_attention:
+        vae += decode_batch * vae_tokens ** 2 * dtype_bytes * 2
+
+    return unet + vae if overlapped_decode else max(unet, vae)
+
+
+def efficient_attention_available(config):
+    """torch 2 的 SDPA 或已启用的 xFormers：注意力不生成完整的分数矩阵"""
+    import torch
+    if hasattr(torch.nn.functional, "scaled_dot_product_attention"):
+        return True
+    from diffusers.utils import is_xformers_available
+    return config.use_xformers and is_xformers_available()
+
+
+def available_bytes():
+    """实测可用显存：设备空闲显存 + PyTorch 缓存分配器中已保留但未使用的部分"""
+    import torch
+    free, _ = torch.cuda.mem_get_info()
+    return free + torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+
+
+def select(budget, width, height, batch_size, efficient_attention, controlnet=False, overlapped_decode=False,
+           dtype_bytes=2):
+    """
+    返回 (预计峰值, 组合)：能放进 budget 字节的组合中最快的一个；全都放不下时返回估算峰值最低的组合。
+    有高效注意力时注意力切片反而更占显存 (会替换其处理器)，因此不能直接取最后一个组合
+    """
+    peaks = [(estimate_peak_bytes(width, height, batch_size, combo, efficient_attention, controlnet,
+                                  overlapped_decode, dtype_bytes), combo) for combo in COMBINATIONS]
+    for peak, combo in peaks:
+        if peak <= budget:
+            return peak, combo
+    return min(peaks, key=lambda item: item[0])
+
+
+def choose(config, width, height, batch_size=1, overlapped_decode=False):
+    """
+    auto 策略：返回 (组合, 说明文字)。按实测可用显存调用 select，全都放不下时在说明中提示。
+    CPU 推理内存充足，不切片/不分块。
+    """
+    from core.precision import inference_device
+
+    if inference_device() != "cuda":
+        return COMBINATIONS[0], "CPU 推理，不切片/不分块"
+
+    budget = available_bytes() * SAFETY_RATIO
+    efficient = efficient_attention_available(config)
+    peak, combo = select(budget, width, height, batch_size, efficient, config.enable_pose, overlapped_decode)
+    text = (f"{width}x{height} x{batch_size}，可用显存 {budget / 1024 ** 3:.2f} GB，"
+            f"预计峰值 {peak / 1024 ** 3:.2f} GB -> {describe(combo)}")
+    if peak > budget:
+        text += " (仍可能显存不足，建议降低分辨率或开启低显存模式)"
+    return combo, text
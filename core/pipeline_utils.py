@@ -1,6 +1,12 @@
 import os
 import sys
 from omegaconf import OmegaConf  # 保持不变
+from core import memory_policy
+from core.schedulers import SchedulerRegistry
+from core.precision import (
+    inference_device, resolve_precision, enable_autocast, quantize_pipeline,
+    quantized_cache_path, load_quantized, save_quantized
+)
 
 
 class PipelineLoader:
@@ -8,6 +14,209 @@ class PipelineLoader:
     根据配置动态加载 ControlNet 管线或 Img2Img 管线
     """
 
+    # 常驻 (warm) 管线缓存：同一组加载参数只加载一次，预览与完整渲染共用
+    _cached_key = None
+    _cached_pipe = None
+    # 提示词向量缓存：{(prompt, negative_prompt): (prompt_embeds, negative_prompt_embeds)}
+    _embeds_cache = {}
+    # 常驻管线当前应用的 Token Merging 比例 (0 表示未应用)
+    _tome_ratio = 0.0
+    # 常驻管线当前使用的采样器名称，以及加载时模型自带调度器的原始配置 (切换采样器时都以它为基础)
+    _scheduler_name = None
+    _base_scheduler_config = None
+    # 常驻管线当前是否启用了注意力切片
+    _attention_slicing = False
+    # 最近一次应用的显存组合 (注意力切片, VAE 切片, VAE 分块)，渲染结束后用于校准显存估算
+    memory_combo = None
+
+    @staticmethod
+    def _pipeline_key(config):
+        """
+        只有影响模型加载的字段才参与缓存键 (蒸馏权重会融合进 UNet，也属于加载参数)。
+        推理精度只在 CPU 上影响加载 (GPU 上始终为 fp16)，GPU 上切换精度不应重新加载模型
+        """
+        precision = config.inference_precision if inference_device() == "cpu" else ""
+        return (
+            config.model_path,
+            config.enable_pose,
+            config.use_xformers,
+            config.low_vram,
+            precision,
+            PipelineLoader._distill_weights(config),
+        )
+
+    @staticmethod
+    def _distill_weights(config):
+        """当前采样器需要的本地蒸馏权重路径 (非蒸馏采样器返回空字符串)"""
+        if SchedulerRegistry.spec(config.scheduler)["distilled"]:
+            return config.distill_lora_path
+        return ""
+
+    @classmethod
+    def get_pipeline(cls, config, size=None, batch_size=1, overlapped_decode=False, factory=None):
+        """
+        获取常驻管线，加载参数变化时释放旧管线后重新加载。
+        size=(宽, 高)、batch_size 与 overlapped_decode 描述本次生成的负载，供 auto 显存策略使用；
+        factory(config) 为本次任务使用的管线工厂 (默认 load_pipeline，测试或本地服务可传入桩管线)，
+        也是缓存键的一部分，不同工厂加载的管线不会互相复用
+        """
+        warning = SchedulerRegistry.check(config)
+        if warning:
+            print(f">> 警告: {warning}")
+
+        key = cls._pipeline_key(config) + (factory,)
+        if cls._cached_pipe is not None and cls._cached_key == key:
+            print(">> 复用已加载的常驻管线")
+        else:
+            cls.release()
+            cls._cached_pipe = (factory or cls.load_pipeline)(config)
+            cls._cached_key = key
+            scheduler = getattr(cls._cached_pipe, "scheduler", None)
+            cls._base_scheduler_config = getattr(scheduler, "config", None)
+
+        # 采样器只是替换调度器对象，切换时无需重新加载模型
+        cls.apply_scheduler(cls._cached_pipe, config.scheduler)
+        # Token Merging 只是给 UNet 打补丁，比例变化时无需重新加载模型
+        cls.apply_token_merging(cls._cached_pipe, config.token_merging_ratio)
+        cls.apply_memory_options(cls._cached_pipe, config, size, batch_size, overlapped_decode)
+        return cls._cached_pipe
+
+    @classmethod
+    def apply_scheduler(cls, pipe, name):
+        if name == cls._scheduler_name or cls._base_scheduler_config is None:
+            return
+        SchedulerRegistry.apply(pipe, name, cls._base_scheduler_config)
+        cls._scheduler_name = name
+
+    @classmethod
+    def apply_token_merging(cls, pipe, ratio):
+        """
+        对 UNet 的 Transformer 块应用 Token Merging (tomesd)：合并相似的 token 以减少注意力计算量。
+        ratio 为合并比例 (0 关闭)，未安装 tomesd 时忽略。
+        """
+        if ratio == cls._tome_ratio:
+            return
+        try:
+            import tomesd
+        except ImportError:
+            if ratio > 0:
+                print(">> 警告: 配置启用了 Token Merging，但未检测到 tomesd 库。已自动忽略。")
+            return
+
+        tomesd.remove_patch(pipe)
+        if ratio > 0:
+            tomesd.apply_patch(pipe, ratio=ratio)
+            print(f">> Token Merging 已启用 (比例 {ratio:.2f})")
+        cls._tome_ratio = ratio
+
+    @classmethod
+    def apply_memory_options(cls, pipe, config, size=None, batch_size=1, overlapped_decode=False):
+        """
+        注意力切片 / VAE 切片 / VAE 分块。memory_policy="auto" 时按实测可用显存、分辨率 size=(宽, 高)
+        与批大小选择能放下的最快组合 (见 core/memory_policy.py)，否则使用配置中的三个开关。
+        都只是切换计算方式，无需重新加载模型；VAE 的两个开关对管线内解码与独立解码阶段都生效。
+        """
+        vae = getattr(pipe, "vae", None)
+        if vae is None or not hasattr(vae, "enable_tiling"):
+            return
+        if config.memory_policy == "auto":
+            width, height = size or (config.target_width, config.target_width)
+            combo, text = memory_policy.choose(config, width, height, batch_size, overlapped_decode)
+            print(f">> 显存策略 (auto): {text}")
+        else:
+            combo = (config.attention_slicing, config.vae_slicing, config.vae_tiling)
+        attention, vae_slicing, vae_tiling = cls.memory_combo = combo
+
+        if attention != cls._attention_slicing:
+            if attention:
+                pipe.enable_attention_slicing()
+            else:
+                # 关闭切片会恢复默认注意力处理器，xFormers 需要重新启用
+                pipe.disable_attention_slicing()
+                cls._enable_xformers(pipe, config, quiet=True)
+            cls._attention_slicing = attention
+        if vae_slicing:
+            vae.enable_slicing()
+        else:
+            vae.disable_slicing()
+        if vae_tiling:
+            vae.enable_tiling()
+        else:
+            vae.disable_tiling()
+
+    @staticmethod
+    def _enable_xformers(pipe, config, quiet=False):
+        from diffusers.utils import is_xformers_available
+
+        if not config.use_xformers or inference_device() != "cuda":
+            return
+        if is_xformers_available():
+            try:
+                pipe.enable_xformers_memory_efficient_attention()
+                if not quiet:
+                    print(">> xFormers 优化已启用")
+            except Exception as e:
+                print(f">> xFormers 启用失败: {e}")
+        elif not quiet:
+            print(">> 警告: 配置启用了 xFormers，但未检测到该库。已自动回退到标准模式。")
+
+    @classmethod
+    def release(cls):
+        """卸载常驻管线并清空提示词向量缓存"""
+        if cls._cached_pipe is None:
+            return
+        cls._cached_pipe = None
+        cls._cached_key = None
+        cls._tome_ratio = 0.0
+        cls._scheduler_name = None
+        cls._base_scheduler_config = None
+        cls._attention_slicing = False
+        cls.memory_combo = None
+        cls._embeds_cache.clear()
+        try:
+            import torch
+            torch.cuda.empty_cache()
+        except (ImportError, OSError):
+            pass
+
+    @classmethod
+    def encode_prompt(cls, pipe, prompt, negative_prompt):
+        """编码提示词并缓存，返回 (prompt_embeds, negative_prompt_embeds)"""
+        key = (prompt, negative_prompt)
+        if key not in cls._embeds_cache:
+            import torch
+            with torch.no_grad():
+                prompt_embeds, negative_embeds = pipe.encode_prompt(
+                    prompt,
+                    pipe._execution_device,
+                    1,
+                    True,
+                    negative_prompt=negative_prompt
+                )
+            cls._embeds_cache[key] = (prompt_embeds, negative_embeds)
+        return cls._embeds_cache[key]
+
+    @classmethod
+    def prompt_kwargs(cls, pipe, config, prompt=None, batch_size=1):
+        """
+        返回调用管线时的提示词参数。
+        优先使用缓存的 prompt_embeds，避免每帧重复运行 CLIP 文本编码器；
+        旧版 diffusers 没有 encode_prompt 时回退为直接传入文本。
+        batch_size > 1 时按批次复制向量，用于一次调用生成多张图。
+        """
+        prompt = config.prompt if prompt is None else prompt
+        if not hasattr(pipe, "encode_prompt"):
+            return {
+                "prompt": [prompt] * batch_size if batch_size > 1 else prompt,
+                "negative_prompt": [config.negative_prompt] * batch_size if batch_size > 1 else config.negative_prompt
+            }
+
+        prompt_embeds, negative_embeds = cls.encode_prompt(pipe, prompt, config.negative_prompt)
+        if batch_size > 1:
+            prompt_embeds = prompt_embeds.repeat(batch_size, 1, 1)
+            negative_embeds = negative_embeds.repeat(batch_size, 1, 1)
+        return {"prompt_embeds": prompt_embeds, "negative_prompt_embeds": negative_embeds}
+
     @staticmethod
     def load_pipeline(config):
         # 延迟导入 AI 库，防止启动时的 DLL 错误
@@ -15,10 +224,24 @@ class PipelineLoader:
         from diffusers import (
             StableDiffusionControlNetPipeline,
             StableDiffusionImg2ImgPipeline,
-            ControlNetModel,
-            UniPCMultistepScheduler
+            ControlNetModel
         )
-        from diffusers.utils import is_xformers_available
+
+        # GPU 上使用 fp16；CPU 上按推理精度设置 (bf16 自动混合精度 / int8 动态量化时权重均为 fp32)
+        device = inference_device()
+        precision = resolve_precision(config, device)
+        dtype = torch.float16 if precision == "fp16" else torch.float32
+        pipe_cls = StableDiffusionControlNetPipeline if config.enable_pose else StableDiffusionImg2ImgPipeline
+        distill_path = PipelineLoader._distill_weights(config)
+
+        # int8：量化后的组件缓存在本地，之后的加载直接读取，跳过单文件转换与量化
+        quantized_path = None
+        if precision == "int8":
+            quantized_path = quantized_cache_path(config, distill_path)
+            pipe = load_quantized(quantized_path, pipe_cls)
+            if pipe is not None:
+                print(f">> 已从缓存加载 int8 量化模型: {quantized_path}")
+                return pipe
 
         # === 路径修复: 确保 config_yaml 路径在打包和未打包环境下都正确 ===
 
@@ -63,7 +286,7 @@ class PipelineLoader:
             print("正在加载 ControlNet OpenPose 管道...")
             controlnet = ControlNetModel.from_pretrained(
                 "lllyasviel/sd-controlnet-openpose",
-                torch_dtype=torch.float16
+                torch_dtype=dtype
             )
 
             if config.model_path and config.model_path.endswith(".safetensors"):
@@ -71,7 +294,7 @@ class PipelineLoader:
                 pipe = StableDiffusionControlNetPipeline.from_single_file(
                     config.model_path,
                     controlnet=controlnet,
-                    torch_dtype=torch.float16,
+                    torch_dtype=dtype,
                     use_safetensors=True,
                     load_safety_checker=False
                 )
@@ -79,7 +302,7 @@ class PipelineLoader:
                 pipe = StableDiffusionControlNetPipeline.from_pretrained(
                     "runwayml/stable-diffusion-v1-5",
                     controlnet=controlnet,
-                    torch_dtype=torch.float16
+                    torch_dtype=dtype
                 )
 
         # === 分支 B: 禁用骨骼 (纯 Img2Img) ===
@@ -89,37 +312,41 @@ class PipelineLoader:
                 # 完全移除 config 参数
                 pipe = StableDiffusionImg2ImgPipeline.from_single_file(
                     config.model_path,
-                    torch_dtype=torch.float16,
+                    torch_dtype=dtype,
                     use_safetensors=True,
                     load_safety_checker=False
                 )
             else:
                 pipe = StableDiffusionImg2ImgPipeline.from_pretrained(
                     "runwayml/stable-diffusion-v1-5",
-                    torch_dtype=torch.float16
+                    torch_dtype=dtype
                 )
 
-        # 通用配置
-        pipe.scheduler = UniPCMultistepScheduler.from_config(pipe.scheduler.config)
+        # 通用配置：采样器由 get_pipeline 按配置切换 (见 core/schedulers.py)
+        # 少步蒸馏采样器 (如 LCM) 需要先融合本地蒸馏 LoRA 权重
+        if distill_path:
+            pipe.load_lora_weights(os.path.dirname(distill_path), weight_name=os.path.basename(distill_path))
+            pipe.fuse_lora()
+            print(f">> 已融合蒸馏权重: {os.path.basename(distill_path)}")
 
         # === 优化 xFormers 加载逻辑 ===
-        if config.use_xformers:
-            if is_xformers_available():
-                try:
-                    pipe.enable_xformers_memory_efficient_attention()
-                    print(">> xFormers 优化已启用")
-                except Exception as e:
-                    print(f">> xFormers 启用失败: {e}")
-            else:
-                print(">> 警告: 配置启用了 xFormers，但未检测到该库。已自动回退到标准模式。")
+        PipelineLoader._enable_xformers(pipe, config)
 
-        if config.low_vram:
+        if device == "cpu":
+            pipe.to("cpu")
+            if precision == "bf16":
+                enable_autocast(pipe, torch.bfloat16)
+                print(">> CPU 推理: bf16 自动混合精度已启用")
+            elif precision == "int8":
+                quantize_pipeline(pipe)
+                save_quantized(quantized_path, pipe)
+                print(f">> CPU 推理: 线性层已动态量化为 int8，已缓存到 {quantized_path}")
+            else:
+                print(">> CPU 推理: fp32")
+        elif config.low_vram:
             pipe.enable_model_cpu_offload()
             print(">> Low VRAM 模式已启用 (CPU Offload)")
         else:
             pipe.to("cuda")
 
         return pipe
-
-
-
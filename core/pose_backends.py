@@ -0,0 +1,207 @@
+import math
+
+import numpy as np
+
+# ControlNet OpenPose 骨骼图格式 (与 controlnet_aux 的 draw_bodypose 一致)
+# 18 个关键点 (COCO 顺序): 0 鼻 1 颈 2 右肩 3 右肘 4 右腕 5 左肩 6 左肘 7 左腕 8 右髋 9 右膝 10 右踝
+#                          11 左髋 12 左膝 13 左踝 14 右眼 15 左眼 16 右耳 17 左耳
+OPENPOSE_LIMBS = [(1, 2), (1, 5), (2, 3), (3, 4), (5, 6), (6, 7), (1, 8), (8, 9), (9, 10),
+                  (1, 11), (11, 12), (12, 13), (1, 0), (0, 14), (14, 16), (0, 15), (15, 17)]
+OPENPOSE_COLORS = [(255, 0, 0), (255, 85, 0), (255, 170, 0), (255, 255, 0), (170, 255, 0), (85, 255, 0),
+                   (0, 255, 0), (0, 255, 85), (0, 255, 170), (0, 255, 255), (0, 170, 255), (0, 85, 255),
+                   (0, 0, 255), (85, 0, 255), (170, 0, 255), (255, 0, 255), (255, 0, 170), (255, 0, 85)]
+
+# OpenPose 18 点下标 -> 对应的 MediaPipe Pose 33 点下标 (颈部 1 由双肩中点合成)
+OPENPOSE_FROM_MEDIAPIPE = {0: 0, 2: 12, 3: 14, 4: 16, 5: 11, 6: 13, 7: 15, 8: 24, 9: 26, 10: 28,
+                           11: 23, 12: 25, 13: 27, 14: 5, 15: 2, 16: 8, 17: 7}
+
+
+def draw_openpose(keypoints, height, width, stickwidth=4):
+    """
+    按 ControlNet OpenPose 的配色与线型绘制骨骼图。
+    keypoints: 长度 18 的列表，元素为像素坐标 (x, y) 或 None (未检测到)
+    """
+    import cv2
+
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    for i, (a, b) in enumerate(OPENPOSE_LIMBS):
+        pa, pb = keypoints[a], keypoints[b]
+        if pa is None or pb is None:
+            continue
+        mx, my = (pa[0] + pb[0]) / 2, (pa[1] + pb[1]) / 2
+        length = math.hypot(pa[0] - pb[0], pa[1] - pb[1])
+        angle = math.degrees(math.atan2(pa[1] - pb[1], pa[0] - pb[0]))
+        polygon = cv2.ellipse2Poly((int(mx), int(my)), (int(length / 2), stickwidth), int(angle), 0, 360, 1)
+        cv2.fillConvexPoly(canvas, polygon, [int(c * 0.6) for c in OPENPOSE_COLORS[i]])
+    for i, point in enumerate(keypoints):
+        if point is not None:
+            cv2.circle(canvas, (int(point[0]), int(point[1])), 4, OPENPOSE_COLORS[i], thickness=-1)
+    return canvas
+
+
+def to_pixels(keypoints, width, height):
+    """归一化关键点 -> 像素坐标 (None 表示未检测到人体，全部按缺失处理)"""
+    if keypoints is None:
+        return [None] * 18
+    return [None if p is None else (p[0] * width, p[1] * height) for p in keypoints]
+
+
+def _fit(image, height, width):
+    """检测器输出尺寸与帧不一致时缩放回帧尺寸，保证骨骼流各帧同尺寸"""
+    import cv2
+
+    if image.shape[:2] != (height, width):
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_NEAREST)
+    return image
+
+
+class BasePoseBackend:
+    """
+    姿态检测后端接口：detect(frame) 输入 HxWx3 uint8 (RGB) 帧，
+    返回同尺寸的 ControlNet OpenPose 格式骨骼图 (HxWx3 uint8)。
+    resolution 为检测分辨率 (短边像素)，越低越快；video=True 表示输入是连续帧，可利用帧间跟踪。
+    """
+
+    label = ""
+
+    def __init__(self, resolution=512, video=True):
+        self.resolution = resolution
+        self.video = video
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+    def keypoints(self, frame):
+        """
+        返回 18 个关键点的归一化坐标 [(x, y) 或 None, ...]，未检测到人体时返回 None。
+        稀疏检测/平滑 (core/pose_tracking.py) 依赖此方法；不支持的后端抛出 NotImplementedError
+        """
+        raise NotImplementedError
+
+    @property
+    def supports_keypoints(self):
+        return type(self).keypoints is not BasePoseBackend.keypoints
+
+    def close(self):
+        pass
+
+
+class OpenposeBackend(BasePoseBackend):
+    """controlnet_aux 的 OpenPose (首次使用需从 Hub 下载权重，CPU 上较慢)"""
+
+    label = "OpenPose"
+
+    def __init__(self, resolution=512, video=True):
+        super().__init__(resolution, video)
+        from controlnet_aux import OpenposeDetector
+
+        self.detector = OpenposeDetector.from_pretrained("lllyasviel/ControlNet")
+        self._kwargs = None  # 检测器支持的 ndarray 输出参数 (首次调用时探测)
+
+    def detect(self, frame):
+        """
+        直接以 ndarray 输入/输出调用检测器，避免 PIL 往返。
+        新版 controlnet_aux 使用 output_type="np"，旧版使用 return_pil=False；都不支持时回退到 PIL。
+        """
+        from PIL import Image
+
+        h, w = frame.shape[:2]
+        size = {"detect_resolution": self.resolution, "image_resolution": min(h, w)}
+        if self._kwargs is None:
+            for kwargs in ({"output_type": "np"}, {"return_pil": False}):
+                try:
+                    result = self.detector(frame, **size, **kwargs)
+                except TypeError:
+                    continue
+                self._kwargs = kwargs
+                return _fit(np.asarray(result), h, w)
+            self._kwargs = False
+        if self._kwargs is False:
+            result = self.detector(Image.fromarray(frame), **size).convert("RGB")
+            return _fit(np.asarray(result), h, w)
+        return _fit(np.asarray(self.detector(frame, **size, **self._kwargs)), h, w)
+
+    def keypoints(self, frame):
+        """只取第一个人的身体关键点 (需要提供 detect_poses 的新版 controlnet_aux)"""
+        import cv2
+
+        if not hasattr(self.detector, "detect_poses"):
+            raise NotImplementedError("当前 controlnet_aux 版本不支持输出关键点")
+        h, w = frame.shape[:2]
+        scale = self.resolution / min(h, w)
+        small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        poses = self.detector.detect_poses(small)
+        if not poses:
+            return None
+        return [None if kp is None else (kp.x, kp.y) for kp in poses[0].body.keypoints]
+
+    @property
+    def supports_keypoints(self):
+        return hasattr(self.detector, "detect_poses")
+
+    def close(self):
+        self.detector = None
+
+
+class MediaPipeBackend(BasePoseBackend):
+    """
+    MediaPipe Pose (BlazePose)：轻量、纯 CPU 即可实时，无需下载 Hub 权重。
+    只检测单人；连续帧按视频模式运行 (帧间跟踪)，检测结果映射为 OpenPose 18 点后绘制。
+    """
+
+    label = "MediaPipe"
+    min_visibility = 0.5
+
+    def __init__(self, resolution=512, video=True, model_complexity=1):
+        super().__init__(resolution, video)
+        import mediapipe as mp
+
+        self.pose = mp.solutions.pose.Pose(static_image_mode=not video, model_complexity=model_complexity,
+                                           enable_segmentation=False)
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        return draw_openpose(to_pixels(self.keypoints(frame), w, h), h, w)
+
+    def keypoints(self, frame):
+        import cv2
+
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.resolution / min(h, w))
+        small = frame if scale == 1.0 else cv2.resize(frame, (int(w * scale), int(h * scale)),
+                                                       interpolation=cv2.INTER_AREA)
+        result = self.pose.process(np.ascontiguousarray(small))
+        if result.pose_landmarks is None:
+            return None
+        keypoints = [None] * 18
+        landmarks = result.pose_landmarks.landmark
+        for op_idx, mp_idx in OPENPOSE_FROM_MEDIAPIPE.items():
+            lm = landmarks[mp_idx]
+            if lm.visibility >= self.min_visibility and 0 <= lm.x <= 1 and 0 <= lm.y <= 1:
+                keypoints[op_idx] = (lm.x, lm.y)
+        left, right = landmarks[11], landmarks[12]
+        if min(left.visibility, right.visibility) >= self.min_visibility:
+            keypoints[1] = ((left.x + right.x) / 2, (left.y + right.y) / 2)
+        return keypoints
+
+    def close(self):
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+POSE_BACKENDS = {
+    "openpose": OpenposeBackend,
+    "mediapipe": MediaPipeBackend,
+}
+
+
+def create_pose_backend(config, video=True):
+    """按配置创建姿态检测后端；依赖缺失时给出安装提示。抽样帧 (不连续) 传入 video=False"""
+    backend_cls = POSE_BACKENDS.get(config.pose_backend)
+    if backend_cls is None:
+        raise ValueError(f"未知的姿态检测后端: {config.pose_backend}")
+    try:
+        return backend_cls(config.pose_resolution, video)
+    except ImportError as e:
+        raise ValueError(f"{backend_cls.label} 后端不可用，请检查依赖是否已安装: {e}") from e
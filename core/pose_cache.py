@@ -0,0 +1,37 @@
+import os
+import hashlib
+
+
+class PoseCache:
+    """
+    骨骼图缓存：按 (视频文件, 帧率, 宽度) 划分目录，帧文件名与拆帧编号一致。
+    预览任务与完整渲染共用同一份缓存，已检测过的帧不会重复做姿态检测。
+    """
+
+    def __init__(self, config):
+        self.cache_dir = os.path.join(config.output_dir, "pose_cache", self.cache_key(config))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(config):
+        """视频内容 (路径 + 大小 + 修改时间)、拆帧参数与姿态检测后端共同决定缓存键"""
+        path = os.path.abspath(config.input_video_path)
+        stat = os.stat(path)
+        raw = (f"{path}|{stat.st_size}|{int(stat.st_mtime)}|{config.target_fps}|{config.target_width}"
+               f"|{config.pose_backend}|{config.pose_resolution}")
+        if 0 < config.render_width < config.target_width:
+            raw += f"|r{config.render_width}"  # 骨骼图按生成分辨率提取
+        if config.clip_start > 0 or config.clip_end > 0:
+            raw += f"|{config.clip_start:.3f}|{config.clip_end:.3f}"  # 子片段，帧编号相对于片段起点
+        if config.pose_interval > 1 or config.pose_smoothing:
+            # 稀疏检测/平滑的骨骼流与逐帧检测不同，单独缓存
+            raw += f"|{config.pose_interval}|{config.pose_motion_threshold}|{config.pose_smoothing}"
+            if config.scene_detect:
+                raw += f"|{config.scene_cut_threshold}"  # 切点处强制关键帧
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def path_for(self, frame_name):
+        return os.path.join(self.cache_dir, frame_name)
+
+    def has(self, frame_name):
+        return os.path.exists(self.path_for(frame_name))
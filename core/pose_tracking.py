@@ -0,0 +1,172 @@
+import math
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One Euro 滤波器 (Casiez 2012)：静止时截止频率低 (去抖)，运动快时自动提高截止频率 (不拖影)。
+    对单个标量滤波；x 为归一化坐标，dt 为帧间隔 (秒)。
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=1.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = None
+        self._dx = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self._x = None
+        self._dx = 0.0
+
+    def __call__(self, x, dt):
+        if self._x is None:
+            self._x = x
+            return x
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx = a_d * (x - self._x) / dt + (1 - a_d) * self._dx
+        a = self._alpha(self.min_cutoff + self.beta * abs(self._dx), dt)
+        self._x = a * x + (1 - a) * self._x
+        return self._x
+
+
+class KeypointSmoother:
+    """对 18 个关键点的 x/y 轨迹分别做 One Euro 滤波；关键点丢失时重置该点的滤波状态"""
+
+    def __init__(self, fps, min_cutoff=1.0, beta=1.0):
+        self.dt = 1.0 / max(1, fps)
+        self._filters = [(OneEuroFilter(min_cutoff, beta), OneEuroFilter(min_cutoff, beta)) for _ in range(18)]
+
+    def reset(self):
+        for fx, fy in self._filters:
+            fx.reset()
+            fy.reset()
+
+    def __call__(self, keypoints):
+        if keypoints is None:
+            self.reset()
+            return None
+        smoothed = []
+        for point, (fx, fy) in zip(keypoints, self._filters):
+            if point is None:
+                fx.reset()
+                fy.reset()
+                smoothed.append(None)
+            else:
+                smoothed.append((fx(point[0], self.dt), fy(point[1], self.dt)))
+        return smoothed
+
+
+def interpolate_keypoints(start, end, t):
+    """两组关键点之间线性插值 (t∈[0,1])；某点只在一侧存在时取较近一侧的值，避免凭空出现肢体"""
+    if start is None or end is None:
+        return start if t < 0.5 else end
+    result = []
+    for a, b in zip(start, end):
+        if a is None or b is None:
+            result.append(a if t < 0.5 else b)
+        else:
+            result.append((a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t))
+    return result
+
+
+class SparsePoseTracker:
+    """
+    稀疏姿态检测：每 interval 帧运行一次检测器 (关键帧)，画面运动量 (与上一关键帧的平均绝对差，
+    0~255) 超过 motion_threshold 时提前检测；中间帧对相邻关键帧的关键点做线性插值。
+    可选 One Euro 平滑后再交给调用方绘制骨骼图。
+
+    按帧顺序调用 push(frame)，返回已确定关键点的帧 (按顺序)；全部帧推送后调用 finish() 取出剩余帧。
+    push(frame, cut=True) 表示该帧是新镜头的起点：不跨镜头插值，平滑状态也随之重置。
+    每个返回值为归一化关键点列表或 None (该帧无人)。
+    """
+
+    def __init__(self, backend, interval=4, motion_threshold=0.0, smoother=None, thumb_stride=8):
+        self.backend = backend
+        self.interval = max(1, interval)
+        self.motion_threshold = motion_threshold
+        self.smoother = smoother
+        self.thumb_stride = thumb_stride
+
+        self._key_points = None  # 上一关键帧的关键点
+        self._key_thumb = None  # 上一关键帧的灰度缩略图 (运动量参考)
+        self._pending = 0  # 上一关键帧之后尚未确定关键点的帧数
+        self._last_frame = None  # 最后推送的帧 (finish 时作为收尾关键帧检测)
+        self._started = False
+
+        self.frames = 0
+        self.detector_calls = 0
+        self.motion_keyframes = 0
+
+    def _thumb(self, frame):
+        return frame[::self.thumb_stride, ::self.thumb_stride].mean(axis=2, dtype=np.float32)
+
+    def _motion(self, frame):
+        return float(np.abs(self._thumb(frame) - self._key_thumb).mean())
+
+    def _detect(self, frame):
+        self.detector_calls += 1
+        return self.backend.keypoints(frame)
+
+    def _emit(self, points):
+        return points if self.smoother is None else self.smoother(points)
+
+    def _close_segment(self, frame):
+        """以 frame 为新关键帧，插值并返回 [中间帧..., 关键帧] 的关键点"""
+        points = self._detect(frame)
+        n = self._pending + 1
+        out = [self._emit(interpolate_keypoints(self._key_points, points, i / n)) for i in range(1, n)]
+        out.append(self._emit(points))
+        self._key_points = points
+        self._key_thumb = self._thumb(frame)
+        self._pending = 0
+        return out
+
+    def push(self, frame, cut=False):
+        out = []
+        if cut and self._started:
+            # 先用切点前的最后一帧收尾上一个镜头，再从切点重新开始
+            out = self.finish()
+            self._started = False
+            if self.smoother is not None:
+                self.smoother.reset()
+        return out + self._push(frame)
+
+    def _push(self, frame):
+        self.frames += 1
+        if not self._started:
+            self._started = True
+            self._key_points = self._detect(frame)
+            self._key_thumb = self._thumb(frame)
+            return [self._emit(self._key_points)]
+
+        if self._pending + 1 >= self.interval:
+            self._last_frame = None
+            return self._close_segment(frame)
+        if self.motion_threshold > 0 and self._motion(frame) > self.motion_threshold:
+            self.motion_keyframes += 1
+            self._last_frame = None
+            return self._close_segment(frame)
+
+        self._pending += 1
+        self._last_frame = frame.copy()  # 源帧可能随后被回收
+        return []
+
+    def finish(self):
+        """视频结束：以最后一帧作为收尾关键帧，返回剩余帧的关键点"""
+        if not self._pending:
+            return []
+        frame, self._last_frame = self._last_frame, None
+        self._pending -= 1  # 最后一帧本身作为关键帧
+        return self._close_segment(frame)
+
+    def summary(self):
+        ratio = self.frames / self.detector_calls if self.detector_calls else 0.0
+        return (f"检测 {self.detector_calls}/{self.frames} 帧 (减少 {ratio:.1f}x)，"
+                f"运动触发 {self.motion_keyframes} 次")
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import functools
+
+# 推理精度选项 (仅 CPU 推理时生效；GPU 上始终使用 fp16)
+PRECISIONS = [
+    ("auto", "自动 (CPU 支持时使用 bf16)"),
+    ("fp32", "fp32 (基线)"),
+    ("bf16", "bf16 自动混合精度"),
+    ("int8", "int8 动态量化"),
+]
+
+# 需要包装为自动混合精度的组件及其入口方法 (VAE 由管线直接调用 encode/decode)
+AUTOCAST_ENTRIES = {
+    "unet": ("forward",),
+    "controlnet": ("forward",),
+    "text_encoder": ("forward",),
+    "vae": ("encode", "decode"),
+}
+
+
+def default_cache_dir():
+    """量化模型缓存目录 (与生成结果缓存同在用户级缓存目录下)"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Video2AI", "quantized")
+
+
+def inference_device():
+    """有可用 CUDA 设备时在 GPU 上推理，否则在 CPU 上推理"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def cpu_supports_bf16():
+    """CPU 是否有原生 bf16 指令 (AVX512-BF16 / AMX)；没有时 bf16 只能模拟，反而比 fp32 更慢"""
+    import torch
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        pass
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def resolve_precision(config, device):
+    """返回实际使用的精度：fp16 (GPU) / fp32 / bf16 / int8 (CPU)"""
+    mode = config.inference_precision
+    if device != "cpu":
+        if mode in ("bf16", "int8"):
+            print(f">> 提示: 推理精度 {mode} 仅用于 CPU 推理，GPU 上使用 fp16")
+        return "fp16"
+    if mode == "auto":
+        return "bf16" if cpu_supports_bf16() else "fp32"
+    if mode == "bf16" and not cpu_supports_bf16():
+        print(">> 警告: 当前 CPU 不支持原生 bf16，已回退到 fp32")
+        return "fp32"
+    return mode
+
+
+def enable_autocast(pipe, dtype):
+    """
+    给各组件的入口方法套上 torch.autocast("cpu")：权重保持 fp32，矩阵乘/卷积在 bf16 下计算。
+    包装的是实例属性，管线对象本身不变，预览/渲染/参数扫描的调用方式无需修改。
+    """
+    import torch
+
+    def wrap(method):
+        @functools.wraps(method)
+        def autocast_method(*args, **kwargs):
+            with torch.autocast("cpu", dtype=dtype):
+                return method(*args, **kwargs)
+        autocast_method.autocast_dtype = dtype  # 供替换 forward 的补丁 (如跨帧特征复用) 沿用
+        return autocast_method
+
+    for name, entries in AUTOCAST_ENTRIES.items():
+        module = getattr(pipe, name, None)
+        if module is None:
+            continue
+        for entry in entries:
+            setattr(module, entry, wrap(getattr(module, entry)))
+
+
+def quantize_pipeline(pipe):
+    """对各组件的 nn.Linear 层做动态 int8 量化 (权重 int8，激活在运行时按批量化)，原地替换"""
+    import torch
+
+    for name in AUTOCAST_ENTRIES:
+        module = getattr(pipe, name, None)
+        if module is not None:
+            torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _file_signature(path):
+    if not path or not os.path.exists(path):
+        return path or ""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+
+def quantized_cache_path(config, distill_path, cache_dir=None):
+    """模型文件、融合的蒸馏权重、管线类型与 torch 版本共同决定缓存键"""
+    import torch
+
+    raw = (f"{_file_signature(config.model_path)}|{_file_signature(distill_path)}|{config.enable_pose}"
+           f"|{torch.__version__}|int8")
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir or default_cache_dir(), f"{key}.pt")
+
+
+def load_quantized(path, pipe_cls):
+    """
+    从缓存加载量化后的管线组件并直接组装管线，跳过单文件转换与量化；不存在或损坏时返回 None。
+    缓存文件是本机生成的 pickle (量化模块无法只用 state_dict 重建)，只从用户缓存目录读取。
+    """
+    import torch
+
+    if not os.path.exists(path):
+        return None
+    try:
+        components = torch.load(path, map_location="cpu", weights_only=False)
+        return pipe_cls(**components, requires_safety_checker=False)
+    except Exception as e:
+        print(f">> 量化模型缓存无法读取，将重新量化: {e}")
+        return None
+
+
+def save_quantized(path, pipe):
+    import torch
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".part"
+    torch.save(dict(pipe.components), tmp_path)
+    os.replace(tmp_path, path)
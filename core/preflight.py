@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+
+# 各存储类型每帧占用相对 RGB 原始大小的估计比例 (jpeg/chunked 为经验值，偏保守)
+STORE_SIZE_RATIO = {
+    "memmap": 1.0,
+    "ram": 1.0,
+    "chunked": 0.6,
+    "jpeg": 0.15,
+}
+# 生成结果缓存 (压缩 .npz) 每帧相对 RGB 原始大小的估计比例 (生成帧纹理较多，压缩率有限，偏保守)
+RESULT_CACHE_RATIO = 0.8
+# libx264 默认 CRF 下每像素约 0.1 bit
+H264_BITS_PER_PIXEL = 0.1
+# 额外保留 10% + 64MB 的余量
+SAFETY_RATIO = 1.1
+SAFETY_BYTES = 64 * 1024 * 1024
+
+
+def _existing_ancestor(path):
+    """返回 path 自身或其最近的已存在上级目录 (用于查询所在磁盘)"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def _format_gb(n_bytes):
+    return f"{n_bytes / 1024 ** 3:.2f} GB"
+
+
+class DiskPreflight:
+    """
+    渲染前的磁盘空间预检：按探测到的帧数与分辨率估算各数据流的峰值占用，
+    按所在磁盘汇总后与剩余空间比较。估算已考虑逐帧回收 (见 RenderJob)：
+      - 骨骼模式：拆帧流与骨骼流同时存在，拆帧流在骨骼提取过程中逐段回收 (按未回收的完整大小计入)；
+        开启跨帧特征复用时拆帧流保留到生成阶段，骨骼流已缓存也仍需拆帧
+      - 图生图模式：只有拆帧流
+      - 生成帧直接流式编码，只计入最终视频 (jpeg 模式额外保留 frames_out)
+      - 开启生成结果缓存时，缓存目录最多增长 min(本次全部生成帧, 缓存上限)
+    中间帧按生成分辨率 (width, height) 计算；先生成后放大时，最终视频按 output_size 计算。
+    """
+
+    @staticmethod
+    def estimate(config, frame_count, width, height, pose_cached=False, output_size=None):
+        """返回 {目录: 预计峰值占用字节数}"""
+        out_w, out_h = output_size or (width, height)
+        kind = config.frame_store
+        frame_bytes = width * height * 3
+        stream_bytes = int(frame_count * frame_bytes * STORE_SIZE_RATIO.get(kind, 1.0))
+        temp_dir = os.path.join(config.output_dir, config.temp_dir_name)
+        needs = {}
+
+        def add(path, n_bytes):
+            needs[path] = needs.get(path, 0) + n_bytes
+
+        # 拆帧流 (骨骼已完整缓存且不做特征复用时不再拆帧)
+        raw_needed = not (config.enable_pose and pose_cached and not config.feature_reuse)
+        intermediate = stream_bytes if raw_needed else 0
+
+        # 骨骼流持久化在输出目录的 pose_cache 中 (ram 模式不持久化，见下)
+        pose_needed = config.enable_pose and not pose_cached
+        if pose_needed and kind != "ram":
+            add(config.output_dir, stream_bytes)
+
+        if kind == "ram":
+            # 超出内存预算的部分换出到 spill_dir；骨骼模式下骨骼流与拆帧流共享预算，
+            # 各自的换出文件只在自身范围内复用已释放的槽位，按两份换出量保守估计
+            budget = config.ram_budget_mb * 1024 * 1024
+            spilled = max(0, intermediate - budget)
+            if pose_needed:
+                spilled *= 2
+            add(config.spill_dir or tempfile.gettempdir(), spilled)
+        else:
+            add(temp_dir, intermediate)
+
+        # 最终视频 (+ jpeg 模式下保留的 frames_out)
+        video_bytes = int(out_w * out_h * H264_BITS_PER_PIXEL / 8 * frame_count)
+        add(config.output_dir, video_bytes)
+        if kind == "jpeg":
+            add(config.output_dir, int(frame_count * out_w * out_h * 3 * STORE_SIZE_RATIO["jpeg"]))
+
+        # 生成结果缓存保存放大前的生成帧；已有条目会被 LRU 淘汰，新增占用不超过缓存上限
+        if config.result_cache:
+            from core.result_cache import default_cache_dir
+
+            cache_bytes = int(frame_count * frame_bytes * RESULT_CACHE_RATIO)
+            add(config.result_cache_dir or default_cache_dir(), min(cache_bytes, config.result_cache_mb * 1024 * 1024))
+        return needs
+
+    @staticmethod
+    def check(config, frame_count, width, height, pose_cached=False, output_size=None):
+        """空间不足时抛出 ValueError；返回 [(目录, 需要字节数, 可用字节数)] 便于记录日志"""
+        # 同一磁盘上的需求合并计算
+        by_device = {}
+        for path, n_bytes in DiskPreflight.estimate(config, frame_count, width, height, pose_cached,
+                                                             output_size).items():
+            if n_bytes <= 0:
+                continue
+            anchor = _existing_ancestor(path)
+            device = os.stat(anchor).st_dev
+            entry = by_device.setdefault(device, [path, anchor, 0])
+            entry[2] += n_bytes
+
+        report = []
+        for path, anchor, n_bytes in by_device.values():
+            needed = int(n_bytes * SAFETY_RATIO) + SAFETY_BYTES
+            free = shutil.disk_usage(anchor).free
+            report.append((path, needed, free))
+            if needed > free:
+                raise ValueError(
+                    f"磁盘空间不足：{os.path.abspath(path)} 预计需要 {_format_gb(needed)}，"
+                    f"当前可用 {_format_gb(free)}。请缩短视频、降低分辨率/帧率或更换输出目录。")
+        return report
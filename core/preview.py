@@ -0,0 +1,209 @@
+import os
+
+from core.cancellation import step_callback_kwargs
+from core.jobs import BaseJob
+from core.video_io import estimate_frame_count, probe_video_size, decode_frames
+
+
+def sample_uniform(total_frames, k):
+    """在 [1, total_frames] 中均匀取 k 个帧编号 (取每段的中点)"""
+    if total_frames <= 0 or k <= 0:
+        return []
+    k = min(k, total_frames)
+    return sorted({int((i + 0.5) * total_frames / k) + 1 for i in range(k)})
+
+
+def sample_frames(config, k, scene=False, cancel_token=None, report=None):
+    """
+    单次解码抽取 k 个代表帧，返回 [(帧号 (从 1 开始), HxWx3 uint8 数组)]。
+    与完整渲染使用相同的滤镜链 (fps 滤镜 + 生成分辨率) 与子片段范围，帧号和尺寸都与渲染时一致，
+    因此抽样帧的骨骼图可以直接写入共享的 PoseCache。
+    scene=True 时用 SceneCutDetector (与渲染时相同的阈值) 优先取每个镜头的起始帧，镜头不足 k 个时均匀补齐；
+    均匀抽样时解码到最后一个抽样帧即停止。
+    """
+    from core.scene_cuts import SceneCutDetector
+    from core.upscale import render_size
+
+    report = report or (lambda v, t: None)
+    path = config.input_video_path
+    total_frames = estimate_frame_count(path, config.target_fps, config.clip_start, config.clip_end)
+    src_w, src_h = probe_video_size(path)
+    if total_frames <= 0 or not src_w:
+        raise ValueError("无法获取视频时长或尺寸，请检查 ffprobe 是否可用")
+    (width, height), _ = render_size(config, src_w, src_h)
+
+    uniform = sample_uniform(total_frames, k)
+    detector = SceneCutDetector(config.scene_cut_threshold) if scene else None
+    kept = {}
+    decoded = 0
+    for frame in decode_frames(path, config.target_fps, width, height, cancel_token,
+                               config.clip_start, config.clip_end):
+        decoded += 1
+        shot_start = False
+        if detector is not None:
+            detector.push(frame)
+            # 首帧总是镜头起点 (cuts[0] == 0)
+            shot_start = detector.cuts[-1] == decoded - 1 and len(detector.cuts) <= k
+        if decoded in uniform or shot_start:
+            kept[decoded] = frame
+        if decoded % 50 == 0:
+            report(min(decoded / total_frames, 1.0), f"抽帧: {decoded}/{total_frames}")
+        if detector is None and decoded >= uniform[-1]:
+            break
+
+    indices = set()
+    if detector is not None:
+        indices.update(c + 1 for c in detector.cuts[:k])
+    for idx in uniform:
+        if len(indices) >= k:
+            break
+        if idx in kept:
+            indices.add(idx)
+    if not indices:
+        raise ValueError("未能从视频中解码出任何帧")
+    return [(idx, kept[idx]) for idx in sorted(indices)]
+
+
+def prepare_sample_inputs(config, samples, cancel_token, report=None):
+    """
+    启用骨骼时为抽样帧生成骨骼图 (写入共享 PoseCache，文件名与完整渲染的帧编号一致)。
+    samples 为 sample_frames 的返回值；返回管线输入图 (PIL.Image) 列表。
+    report(ratio, text) 用于汇报 0~1 的阶段进度。
+    """
+    from PIL import Image
+    from core.pose_cache import PoseCache
+
+    report = report or (lambda v, t: None)
+    if not config.enable_pose:
+        return [Image.fromarray(frame) for _, frame in samples]
+
+    pose_cache = PoseCache(config)
+    frame_names = [f"frame_{idx:04d}.jpg" for idx, _ in samples]
+    missing = [(f_name, frame) for f_name, (_, frame) in zip(frame_names, samples) if not pose_cache.has(f_name)]
+    if missing:
+        from core.async_writer import AsyncFrameWriter
+        from core.pose_backends import create_pose_backend
+
+        detector = create_pose_backend(config, video=False)
+        # 骨骼图在后台写入缓存，检测下一帧时不必等待 JPEG 编码与落盘
+        writer = AsyncFrameWriter(config.writer_threads, config.writer_queue)
+        try:
+            for i, (f_name, frame) in enumerate(missing):
+                cancel_token.check()
+                writer.submit(pose_cache.path_for(f_name), detector.detect(frame))
+                report((i + 1) / len(missing), f"姿态检测抽样帧: {i + 1}/{len(missing)}")
+        finally:
+            writer.close()  # 阶段结束 (含中止) 时等待全部写完
+            detector.close()
+        del detector
+
+    return [Image.open(pose_cache.path_for(f)).convert("RGB") for f in frame_names]
+
+
+def resize_to_width(img, width):
+    """等比缩放到指定宽度，宽高均对齐到 8 的倍数 (UNet 要求)"""
+    from PIL import Image
+
+    width = max(64, width) // 8 * 8
+    height = max(64, round(img.height * width / img.width)) // 8 * 8
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def make_grid(images, cols=3, padding=4):
+    """将若干张 PIL 图拼接为网格图"""
+    from PIL import Image
+
+    cols = max(1, min(cols, len(images)))
+    rows = (len(images) + cols - 1) // cols
+    cell_w = max(img.width for img in images)
+    cell_h = max(img.height for img in images)
+
+    grid = Image.new(
+        "RGB",
+        (cols * cell_w + (cols + 1) * padding, rows * cell_h + (rows + 1) * padding),
+        (32, 32, 32)
+    )
+    for i, img in enumerate(images):
+        r, c = divmod(i, cols)
+        grid.paste(img, (padding + c * (cell_w + padding), padding + r * (cell_h + padding)))
+    return grid
+
+
+class PreviewJob(BaseJob):
+    """
+    快速预览任务：抽取 K 个代表帧，以低分辨率、低步数在常驻管线上试渲染，输出网格图。
+    骨骼图写入 PoseCache，提示词向量由 PipelineLoader 缓存，完整渲染时直接复用。
+    """
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.work_dir = os.path.join(self.config.output_dir, "preview")
+
+    def run(self):
+        # === 延迟导入区 ===
+        import torch
+        from PIL import Image
+        from core.pipeline_utils import PipelineLoader
+        from core.precision import inference_device
+        from core.vae_decode import TinyDecoder
+        # =================
+
+        if not self.config.input_video_path or not os.path.exists(self.config.input_video_path):
+            raise ValueError("无效的视频输入路径")
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        # 预览宽度不超过目标宽度
+        preview_width = min(self.config.preview_width, self.config.target_width)
+
+        # === 1. 抽样代表帧 ===
+        self.progress(5, "分析视频并抽样代表帧...")
+        samples = sample_frames(self.config, self.config.preview_frames, self.config.preview_sampling == "scene",
+                                self.cancel_token, lambda v, t: self.progress(5 + int(v * 20), t))
+        sources = prepare_sample_inputs(self.config, samples, self.cancel_token,
+                                        lambda v, t: self.progress(25 + int(v * 15), t))
+        del samples
+
+        # === 2. 低步数试渲染 ===
+        self.progress(40, "加载生成模型...")
+        # 逐张生成，显存策略按预览分辨率的单张负载选择
+        pipe = PipelineLoader.get_pipeline(self.config, resize_to_width(sources[0], preview_width).size,
+                                           factory=self.pipeline_factory)
+        prompt_kwargs = PipelineLoader.prompt_kwargs(pipe, self.config)
+        step_kwargs = step_callback_kwargs(pipe, self.cancel_token)
+        # 近似解码器：预览只看风格与构图，跳过完整 VAE 解码
+        tiny = None
+        if self.config.preview_decoder == "tiny":
+            tiny = TinyDecoder(pipe, self.config.tiny_vae_path)
+
+        results = []
+        for i, src in enumerate(sources):
+            self.cancel_token.check()
+
+            generator = torch.Generator(device=inference_device()).manual_seed(self.config.seed)
+            src = resize_to_width(src, preview_width)
+
+            kwargs = dict(
+                image=src,
+                num_inference_steps=self.config.preview_steps,
+                generator=generator,
+                guidance_scale=self.config.cfg_scale,
+                **prompt_kwargs,
+                **step_kwargs
+            )
+            if not self.config.enable_pose:
+                kwargs["strength"] = self.config.denoising_strength
+            if tiny is not None:
+                latents = pipe(**kwargs, output_type="latent").images
+                results.append(Image.fromarray(tiny.decode(latents)))
+            else:
+                results.append(pipe(**kwargs).images[0])
+
+            prog = 50 + int(((i + 1) / len(sources)) * 45)
+            self.progress(prog, f"预览渲染: {i + 1}/{len(sources)}")
+
+        # === 3. 拼接网格 ===
+        grid_path = os.path.join(self.work_dir, "preview_grid.jpg")
+        make_grid(results).save(grid_path)
+        self.preview(grid_path)
+
+        self.progress(100, "预览完成")
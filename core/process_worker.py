@@ -0,0 +1,278 @@
+import uuid
+import struct
+import threading
+import queue
+import traceback
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+# 实时预览帧共享内存大小 (足以容纳 2048x2048 RGB，更大的帧会被降采样)
+FRAME_SHM_BYTES = 2048 * 2048 * 3
+# 共享内存帧头：序号 + 高 + 宽，与像素数据在同一把锁内写入/读取，读取方以帧头为准
+FRAME_HEADER_FORMAT = "<QII"
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER_FORMAT)
+
+
+def write_shared_frame(buf, seq, rgb):
+    """写入一帧 (调用方持有 frame_lock)：先写像素再写帧头"""
+    h, w, _ = rgb.shape
+    buf[FRAME_HEADER_SIZE:FRAME_HEADER_SIZE + rgb.nbytes] = rgb.tobytes()
+    buf[:FRAME_HEADER_SIZE] = struct.pack(FRAME_HEADER_FORMAT, seq, h, w)
+
+
+def read_shared_frame(buf):
+    """读取最新的一帧 (调用方持有 frame_lock)，返回 (序号, 高, 宽, 像素字节)；尚未写入任何帧时序号为 0"""
+    seq, h, w = struct.unpack(FRAME_HEADER_FORMAT, bytes(buf[:FRAME_HEADER_SIZE]))
+    return seq, h, w, bytes(buf[FRAME_HEADER_SIZE:FRAME_HEADER_SIZE + h * w * 3])
+
+
+def _worker_main(cmd_conn, evt_conn, shm_name, frame_lock):
+    """
+    推理进程入口 (spawn 启动，不创建任何 Qt 对象)。
+    监听线程接收 ("job", 任务 id, 类型, 配置) / ("cancel", 任务 id, finalize) / ("shutdown",) 命令，
+    主线程依次执行任务并通过 evt_conn 回传事件：
+    ("progress", v, text) / ("preview", path) / ("frame", seq) / ("done",) / ("cancelled",) / ("error", msg)
+    """
+    from core.config import GenerationConfig
+    from core.cancellation import CancelToken
+    from core.jobs import get_job_class
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    jobs = queue.Queue()
+    # 任务 id -> CancelToken (排队中与运行中的任务)；取消只作用于指定的任务，不会误取消排在后面的任务
+    tokens = {}
+    current = {"frame_seq": 0}
+
+    def listen():
+        while True:
+            try:
+                msg = cmd_conn.recv()
+            except (EOFError, OSError):
+                jobs.put(None)
+                return
+            if msg[0] == "cancel":
+                token = tokens.get(msg[1])
+                if token is not None:
+                    token.cancel(msg[2])
+            elif msg[0] == "shutdown":
+                jobs.put(None)
+                return
+            else:
+                # 在监听线程中创建令牌，保证任务开始前到达的取消命令也不会丢失
+                tokens[msg[1]] = CancelToken()
+                jobs.put(msg[1:])
+
+    threading.Thread(target=listen, daemon=True).start()
+
+    def on_frame(rgb):
+        # 超出共享内存容量时按整数步长降采样
+        step = 1
+        while rgb[::step, ::step].nbytes > FRAME_SHM_BYTES:
+            step += 1
+        current["frame_seq"] += 1
+        # 帧头与像素在同一把锁内写入：GUI 收到事件时共享内存中可能已是更新的一帧，
+        # 但读到的尺寸与像素总是属于同一帧，不会出现错位或撕裂
+        with frame_lock:
+            write_shared_frame(shm.buf, current["frame_seq"], rgb[::step, ::step])
+        evt_conn.send(("frame", current["frame_seq"]))
+
+    while True:
+        item = jobs.get()
+        if item is None:
+            break
+        job_id, job_type, config_dict = item
+        token = tokens[job_id]
+        try:
+            # 任务构造 (配置解析、任务类型查找) 也在 try 中：任何失败都以 error 事件回传，推理进程继续服务
+            job = get_job_class(job_type)(
+                GenerationConfig.from_dict(config_dict), token,
+                on_progress=lambda v, t: evt_conn.send(("progress", v, t)),
+                on_preview=lambda p: evt_conn.send(("preview", p)),
+                on_frame=on_frame
+            )
+            evt_conn.send(("done",) if job.execute() else ("cancelled",))
+        except Exception as e:
+            traceback.print_exc()
+            evt_conn.send(("error", str(e) or type(e).__name__))
+        finally:
+            tokens.pop(job_id, None)
+
+    shm.close()
+
+
+class InferenceProcess:
+    """
+    受监管的常驻推理进程 (单例)。
+    模型在该进程中保持常驻；进程崩溃不影响 GUI，可随时重启而无需重启应用。
+    """
+    _instance = None
+
+    def __init__(self):
+        self._ctx = mp.get_context("spawn")
+        self.process = None
+        self.shm = None
+        self.frame_lock = None
+        self.cmd_conn = None
+        self.evt_conn = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = InferenceProcess()
+        return cls._instance
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def ensure_started(self):
+        if not self.is_alive():
+            self.start()
+
+    def start(self):
+        self._release()
+        self.shm = shared_memory.SharedMemory(create=True, size=FRAME_HEADER_SIZE + FRAME_SHM_BYTES)
+        self.shm.buf[:FRAME_HEADER_SIZE] = struct.pack(FRAME_HEADER_FORMAT, 0, 0, 0)
+        self.frame_lock = self._ctx.Lock()
+        cmd_recv, self.cmd_conn = self._ctx.Pipe(duplex=False)
+        self.evt_conn, evt_send = self._ctx.Pipe(duplex=False)
+
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(cmd_recv, evt_send, self.shm.name, self.frame_lock),
+            name="Video2AI-Inference",
+            daemon=True
+        )
+        self.process.start()
+        # 关闭父进程持有的子进程端，子进程退出时 recv 才能收到 EOF
+        cmd_recv.close()
+        evt_send.close()
+        print(f">> 推理进程已启动 (PID {self.process.pid})")
+
+    def shutdown(self, timeout=5):
+        """通知推理进程退出，超时则强制终止"""
+        if self.is_alive():
+            try:
+                self.cmd_conn.send(("shutdown",))
+            except (OSError, ValueError):
+                pass
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self._release()
+
+    def restart(self):
+        print(">> 重启推理进程...")
+        self.shutdown(timeout=2)
+        self.start()
+
+    def submit(self, job_type, config):
+        """提交任务，返回任务 id (用于 cancel)"""
+        job_id = uuid.uuid4().hex[:12]
+        self.cmd_conn.send(("job", job_id, job_type, config.to_dict()))
+        return job_id
+
+    def cancel(self, job_id, finalize=False):
+        """取消指定任务 (排队中或运行中)；已结束的任务忽略"""
+        if self.is_alive():
+            self.cmd_conn.send(("cancel", job_id, finalize))
+
+    def poll(self, timeout):
+        """等待一条事件，超时返回 None；子进程已退出时抛出 EOFError"""
+        if self.evt_conn.poll(timeout):
+            return self.evt_conn.recv()
+        return None
+
+    def read_frame(self):
+        """读取共享内存中最新的一帧，返回 (序号, 高, 宽, 像素字节)"""
+        with self.frame_lock:
+            return read_shared_frame(self.shm.buf)
+
+    def _release(self):
+        for conn in (self.cmd_conn, self.evt_conn):
+            if conn is not None:
+                conn.close()
+        self.cmd_conn = self.evt_conn = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        self.process = None
+
+
+class ProcessAIWorker(QThread):
+    """
+    与 AIWorker 接口一致的代理：任务在 InferenceProcess 中执行，
+    本线程只负责转发事件，GUI 进程内不再运行任何 PIL/NumPy/管线代码。
+    """
+    progress_signal = pyqtSignal(int, str)
+    preview_signal = pyqtSignal(str)
+    frame_signal = pyqtSignal(QImage)
+    finished_signal = pyqtSignal()
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, config, job_type="render"):
+        super().__init__()
+        self.config = config
+        self.job_type = job_type
+        self.job_id = None
+
+    def run(self):
+        proc = InferenceProcess.instance()
+        shown = 0  # 已显示的最新预览帧序号
+        try:
+            proc.ensure_started()
+            self.job_id = proc.submit(self.job_type, self.config)
+
+            while True:
+                msg = proc.poll(0.1)
+                if msg is None:
+                    if not proc.is_alive():
+                        raise EOFError()
+                    continue
+
+                kind = msg[0]
+                if kind == "progress":
+                    self.progress_signal.emit(msg[1], msg[2])
+                elif kind == "preview":
+                    self.preview_signal.emit(msg[1])
+                elif kind == "frame":
+                    # 事件只作为通知；共享内存中的帧可能比事件更新，已显示过的帧不再重复发送
+                    seq, h, w, data = proc.read_frame()
+                    if seq > shown and h and w:
+                        shown = seq
+                        image = QImage(data, w, h, 3 * w, QImage.Format.Format_RGB888)
+                        self.frame_signal.emit(image.copy())
+                elif kind == "done":
+                    self.finished_signal.emit()
+                    return
+                elif kind == "cancelled":
+                    return
+                elif kind == "error":
+                    self.error_signal.emit(msg[1])
+                    return
+
+        except (EOFError, OSError):
+            exitcode = proc.process.exitcode if proc.process is not None else None
+            self._recover(proc, f"推理进程异常退出 (退出码 {exitcode})")
+        except Exception as e:
+            # 其他异常 (如事件无法反序列化、任务提交失败) 同样要通知界面，否则界面会一直停在运行状态；
+            # 推理进程状态未知，重启以免残留的任务事件影响下一次提交
+            traceback.print_exc()
+            self._recover(proc, f"推理进程通信失败: {e}")
+
+    def _recover(self, proc, message):
+        """重启推理进程并发出错误信号；重启本身失败时也必须通知界面"""
+        try:
+            proc.restart()
+            message += "，已自动重启，请重试"
+        except Exception as e:
+            traceback.print_exc()
+            message += f"，自动重启失败: {e}"
+        self.error_signal.emit(message)
+
+    def stop(self, finalize=False):
+        if self.job_id is not None:
+            InferenceProcess.instance().cancel(self.job_id, finalize)
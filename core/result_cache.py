@@ -0,0 +1,135 @@
+import os
+import time
+import zlib
+import hashlib
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+# 输入帧本身已由内容哈希覆盖，拆帧相关字段不再参与配置哈希；
+# 缓存的是放大前的生成帧，放大阶段的字段同样不参与
+FRAME_INPUT_FIELDS = ("input_video_path", "target_fps", "target_width", "render_width", "clip_start", "clip_end",
+                      "upscaler", "upscaler_model_path")
+
+
+def default_cache_dir():
+    """用户级缓存目录 (与输出目录无关，修改输出目录后缓存仍然有效)"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Video2AI", "result_cache")
+
+
+def config_hash(config):
+    """
+    影响单帧结果的配置哈希：GenerationConfig.content_hash() (output 类字段，骨骼模式下不含重绘幅度)
+    再加上模型文件的大小与修改时间 (同名模型文件被替换时缓存失效)
+    """
+    digest = config.content_hash("render", exclude=FRAME_INPUT_FIELDS)
+    if config.model_path and os.path.exists(config.model_path):
+        stat = os.stat(config.model_path)
+        digest += f"|{stat.st_size}|{int(stat.st_mtime)}"
+    return hashlib.sha1(digest.encode("utf-8")).hexdigest()
+
+
+class FrameResultCache:
+    """
+    生成帧的持久化缓存：键 = 管线输入帧 (图生图为原始帧，骨骼模式为骨骼图) 的内容哈希 + 配置哈希。
+    每个条目是一个压缩的 .npz 文件；按最近使用时间做 LRU 淘汰，总大小不超过 max_bytes。
+    条目按使用顺序保存在 OrderedDict 中 (启动时按文件 mtime 排序一次)，命中/写入只需移动到末尾，淘汰从头部取出。
+    每帧写入后立即落盘，渲染中途崩溃后重新运行可直接复用已完成的帧。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=4 * 1024 ** 3):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        # 启动时扫描一次目录，按最近使用时间从旧到新排列：{key: size}
+        found = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".npy"):
+                try:
+                    os.remove(path)  # 旧版未压缩的条目，直接清理
+                except OSError:
+                    pass
+            elif name.endswith(".npz"):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name[:-4], stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+        self.total_bytes = sum(self._entries.values())
+
+    @staticmethod
+    def key(frame, config_digest):
+        h = hashlib.blake2b(digest_size=20)
+        h.update(str(frame.shape).encode("ascii"))
+        h.update(np.ascontiguousarray(frame).data)
+        h.update(config_digest.encode("ascii"))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key):
+        """命中返回 HxWx3 uint8 数组，否则返回 None"""
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                frame = data["frame"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile, zlib.error):
+            # 文件被外部删除或损坏
+            self._drop(key)
+            self.misses += 1
+            return None
+        now = time.time()
+        os.utime(path, (now, now))  # 下次启动时按 mtime 恢复 LRU 顺序
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def put(self, key, frame):
+        path = self._path(key)
+        tmp_path = path + ".part"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, frame=np.ascontiguousarray(frame))
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        self.total_bytes += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        self.stores += 1
+        self._evict()
+
+    def _drop(self, key):
+        self.total_bytes -= self._entries.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))  # 最久未使用的条目
+            self.evictions += 1
+
+    def clear(self):
+        for key in list(self._entries):
+            self._drop(key)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        return (f"命中 {self.hits}/{self.hits + self.misses} ({self.hit_rate * 100:.0f}%)，"
+                f"新增 {self.stores}，淘汰 {self.evictions}，"
+                f"占用 {self.total_bytes / 1024 ** 2:.0f}/{self.max_bytes / 1024 ** 2:.0f} MB")
@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+
+
+class SceneCutDetector:
+    """
+    镜头切换检测 (拆帧时逐帧调用，纯 NumPy 向量化)。
+    每帧按 stride 降采样后，每个通道量化为 bins 级，统计联合颜色直方图；
+    与上一帧直方图的归一化 L1 距离 (0~1) 超过 threshold，且距上一个切点至少 min_shot 帧时判定为切点。
+    直方图对镜头内的运动/平移不敏感，对换镜头敏感；单帧开销约为几十微秒，远高于实时。
+    """
+
+    def __init__(self, threshold=0.35, min_shot=6, stride=8, bins=8):
+        self.threshold = threshold
+        self.min_shot = min_shot
+        self.stride = stride
+        self.bins = bins
+        self._shift = 8 - int(np.log2(bins))
+        self._prev = None
+        self.frames = 0
+        self.cuts = [0]  # 每个镜头的起始帧 (首帧总是镜头起点)
+        self.scores = []
+
+    def histogram(self, frame):
+        small = frame[::self.stride, ::self.stride] >> self._shift
+        b = self.bins
+        codes = (small[..., 0].astype(np.int32) * b + small[..., 1]) * b + small[..., 2]
+        hist = np.bincount(codes.ravel(), minlength=b ** 3).astype(np.float32)
+        return hist / hist.sum()
+
+    def push(self, frame):
+        """推送一帧，该帧是新镜头的起点时返回 True"""
+        hist = self.histogram(frame)
+        idx = self.frames
+        self.frames += 1
+        if self._prev is None:
+            self._prev = hist
+            self.scores.append(0.0)
+            return False
+        score = 0.5 * float(np.abs(hist - self._prev).sum())
+        self._prev = hist
+        self.scores.append(score)
+        if score >= self.threshold and idx - self.cuts[-1] >= self.min_shot:
+            self.cuts.append(idx)
+            return True
+        return False
+
+    @property
+    def shots(self):
+        return shots_from_cuts(self.cuts, self.frames)
+
+
+def shots_from_cuts(cuts, total_frames):
+    """切点列表 -> 镜头列表 [(起始帧, 结束帧 (不含)), ...]"""
+    bounds = sorted(set(c for c in cuts if 0 <= c < total_frames) | {0}) + [total_frames]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def save_shots(path, shots):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"shots": shots}, f)
+
+
+def load_shots(path):
+    """读取镜头列表，文件不存在或损坏时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [tuple(s) for s in json.load(f)["shots"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
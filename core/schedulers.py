@@ -0,0 +1,105 @@
+import os
+import importlib.util
+
+# 采样器注册表：名称 -> 规格
+#   cls        diffusers 调度器类名
+#   kwargs     from_config 时覆盖的参数
+#   min_steps  建议的最少步数 (低于该值画面明显劣化)
+#   steps      选择该采样器时推荐的默认步数
+#   cfg        推荐的 CFG (None 表示沿用当前值)
+#   distilled  少步蒸馏采样器，需要本地蒸馏权重 (GenerationConfig.distill_lora_path)
+#   requires   额外依赖的模块名 (未安装时不在选项中出现)
+SCHEDULERS = {
+    "unipc": {
+        "label": "UniPC", "cls": "UniPCMultistepScheduler", "kwargs": {},
+        "min_steps": 10, "steps": 20, "cfg": None, "distilled": False,
+    },
+    "dpmpp_2m": {
+        "label": "DPM++ 2M", "cls": "DPMSolverMultistepScheduler",
+        "kwargs": {"algorithm_type": "dpmsolver++", "solver_order": 2},
+        "min_steps": 15, "steps": 20, "cfg": None, "distilled": False,
+    },
+    "dpmpp_2m_karras": {
+        "label": "DPM++ 2M Karras", "cls": "DPMSolverMultistepScheduler",
+        "kwargs": {"algorithm_type": "dpmsolver++", "solver_order": 2, "use_karras_sigmas": True},
+        "min_steps": 12, "steps": 20, "cfg": None, "distilled": False,
+    },
+    "dpmpp_sde_karras": {
+        "label": "DPM++ SDE Karras", "cls": "DPMSolverMultistepScheduler",
+        "kwargs": {"algorithm_type": "sde-dpmsolver++", "use_karras_sigmas": True},
+        "min_steps": 15, "steps": 25, "cfg": None, "distilled": False, "requires": "torchsde",
+    },
+    "euler": {
+        "label": "Euler", "cls": "EulerDiscreteScheduler", "kwargs": {},
+        "min_steps": 20, "steps": 30, "cfg": None, "distilled": False,
+    },
+    "euler_a": {
+        "label": "Euler Ancestral", "cls": "EulerAncestralDiscreteScheduler", "kwargs": {},
+        "min_steps": 20, "steps": 30, "cfg": None, "distilled": False,
+    },
+    "lcm": {
+        "label": "LCM (少步蒸馏)", "cls": "LCMScheduler", "kwargs": {},
+        "min_steps": 2, "steps": 4, "cfg": 1.5, "distilled": True,
+    },
+}
+
+DEFAULT_SCHEDULER = "unipc"
+
+
+class SchedulerRegistry:
+    """按名称创建/切换调度器，并给出与步数相关的建议"""
+
+    @staticmethod
+    def available(name):
+        """采样器的额外依赖是否已安装"""
+        module = SCHEDULERS[name].get("requires")
+        return module is None or importlib.util.find_spec(module) is not None
+
+    @classmethod
+    def names(cls):
+        return [name for name in SCHEDULERS if cls.available(name)]
+
+    @staticmethod
+    def spec(name):
+        if name not in SCHEDULERS:
+            raise ValueError(f"未知的采样器: {name}")
+        return SCHEDULERS[name]
+
+    @classmethod
+    def options(cls):
+        """[(名称, 显示文本), ...]，供下拉框使用"""
+        return [(name, SCHEDULERS[name]["label"] + (" *" if SCHEDULERS[name]["distilled"] else ""))
+                for name in cls.names()]
+
+    @classmethod
+    def check(cls, config):
+        """
+        校验采样器与配置是否匹配：蒸馏采样器必须提供本地权重 (抛出 ValueError)；
+        步数低于建议最小值时返回警告文本，否则返回 None
+        """
+        spec = cls.spec(config.scheduler)
+        if not cls.available(config.scheduler):
+            raise ValueError(f"{spec['label']} 需要安装 {spec['requires']}，请更换采样器或先安装该库")
+        if spec["distilled"] and not (config.distill_lora_path and os.path.exists(config.distill_lora_path)):
+            raise ValueError(f"{spec['label']} 需要本地蒸馏权重，请先在步骤 2 中选择 LoRA 文件")
+        if config.steps < spec["min_steps"]:
+            return f"{spec['label']} 建议至少 {spec['min_steps']} 步 (当前 {config.steps} 步)，画面可能劣化"
+        return None
+
+    @classmethod
+    def create(cls, name, base_config):
+        """
+        以模型自带调度器的配置 (beta 表等) 为基础创建指定调度器。
+        base_config 必须是加载时的原始配置：从当前调度器的配置创建会把上一个采样器的
+        use_karras_sigmas / algorithm_type 等参数带到之后的选择中
+        """
+        import diffusers
+
+        spec = cls.spec(name)
+        scheduler_cls = getattr(diffusers, spec["cls"])
+        return scheduler_cls.from_config(base_config, **spec["kwargs"])
+
+    @classmethod
+    def apply(cls, pipe, name, base_config):
+        pipe.scheduler = cls.create(name, base_config)
+        print(f">> 采样器: {cls.spec(name)['label']}")
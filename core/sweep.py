@@ -0,0 +1,204 @@
+import os
+import csv
+import time
+import itertools
+
+from core.cancellation import step_callback_kwargs
+from core.jobs import BaseJob
+from core.preview import sample_frames, prepare_sample_inputs, resize_to_width
+
+
+def parse_values(text, cast, default):
+    """
+    解析扫描取值，支持以下写法 (可混用，逗号分隔)：
+      "1,2,3"        -> 列表
+      "10-30:5"      -> 区间 (含端点)，步长 5
+      "5-8"          -> 区间，步长 1
+    为空时返回 [default]。
+    """
+    text = (text or "").strip()
+    if not text:
+        return [default]
+
+    values = []
+    for part in text.replace("，", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        # 区间写法 (注意负号不会出现在这些参数中)
+        if "-" in part[1:]:
+            span, _, step = part.partition(":")
+            start, end = span.split("-", 1)
+            start, end = cast(start), cast(end)
+            step = cast(step) if step else cast(1)
+            if step <= 0:
+                raise ValueError(f"扫描步长必须大于 0: {part}")
+            v = start
+            while v <= end + 1e-9:
+                values.append(cast(round(v, 6)))
+                v += step
+        else:
+            values.append(cast(part))
+
+    # 去重并保持顺序
+    return list(dict.fromkeys(values)) or [default]
+
+
+def build_combinations(config):
+    """根据配置生成参数组合 (笛卡尔积)"""
+    prompts = [p.strip() for p in config.sweep_prompts.splitlines() if p.strip()] or [config.prompt]
+    seeds = parse_values(config.sweep_seeds, int, config.seed)
+    cfgs = parse_values(config.sweep_cfg, float, config.cfg_scale)
+    steps = parse_values(config.sweep_steps, int, config.steps)
+    strengths = parse_values(config.sweep_strength, float, config.denoising_strength)
+    if config.enable_pose:
+        # ControlNet 模式下重绘幅度不生效，避免产生重复组合
+        strengths = [config.denoising_strength]
+
+    return [
+        {"prompt_idx": p_idx, "prompt": prompt, "seed": seed, "cfg_scale": cfg,
+         "steps": step, "denoising_strength": strength}
+        for (p_idx, prompt), cfg, step, strength, seed
+        in itertools.product(enumerate(prompts), cfgs, steps, strengths, seeds)
+    ]
+
+
+def make_contact_sheet(rows, labels, padding=4, label_height=22):
+    """
+    拼接对比图：每行一个参数组合，每列一帧，行首标注参数。
+    rows: [[PIL.Image, ...], ...]
+    """
+    from PIL import Image, ImageDraw
+
+    cols = max(len(r) for r in rows)
+    cell_w = max(img.width for r in rows for img in r)
+    cell_h = max(img.height for r in rows for img in r)
+    row_h = cell_h + label_height
+
+    sheet = Image.new(
+        "RGB",
+        (cols * cell_w + (cols + 1) * padding, len(rows) * row_h + (len(rows) + 1) * padding),
+        (32, 32, 32)
+    )
+    draw = ImageDraw.Draw(sheet)
+    for r, (images, label) in enumerate(zip(rows, labels)):
+        y = padding + r * (row_h + padding)
+        draw.text((padding, y + 4), label, fill=(230, 230, 230))
+        for c, img in enumerate(images):
+            sheet.paste(img, (padding + c * (cell_w + padding), y + label_height))
+    return sheet
+
+
+class SweepJob(BaseJob):
+    """
+    参数扫描任务：在固定的少量抽样帧上遍历 种子/提示词/CFG/步数/重绘幅度 的组合。
+    同一 (提示词, CFG, 步数, 重绘幅度) 下的所有种子与帧合并为批次调用，
+    共享常驻管线与提示词向量；输出对比图 contact_sheet.jpg 与耗时表 sweep_latency.csv。
+    """
+
+    def __init__(self, config, *args, **kwargs):
+        super().__init__(config, *args, **kwargs)
+        self.work_dir = os.path.join(self.config.output_dir, "sweep")
+
+    def run(self):
+        # === 延迟导入区 ===
+        import torch
+        from core.pipeline_utils import PipelineLoader
+        from core.precision import inference_device
+        # =================
+
+        if not self.config.input_video_path or not os.path.exists(self.config.input_video_path):
+            raise ValueError("无效的视频输入路径")
+
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        combos = build_combinations(self.config)
+        self.progress(2, f"参数组合: {len(combos)} 组")
+
+        # === 1. 抽样帧 (固定帧集) ===
+        samples = sample_frames(self.config, self.config.sweep_frames, False, self.cancel_token,
+                                lambda v, t: self.progress(2 + int(v * 10), t))
+        sources = prepare_sample_inputs(self.config, samples, self.cancel_token,
+                                        lambda v, t: self.progress(12 + int(v * 8), t))
+        del samples
+        width = min(self.config.preview_width, self.config.target_width)
+        sources = [resize_to_width(src, width) for src in sources]
+
+        # === 2. 批量生成 ===
+        self.progress(20, "加载生成模型...")
+        # 显存策略按最大的一次批量调用选择 (每个组合含全部抽样帧)
+        batch_size = min(self.config.sweep_max_batch, len(combos)) * len(sources)
+        pipe = PipelineLoader.get_pipeline(self.config, sources[0].size, batch_size,
+                                           factory=self.pipeline_factory)
+        step_kwargs = step_callback_kwargs(pipe, self.cancel_token)
+
+        # 按除种子外的参数分组，每组一次批量调用 (种子 × 帧)
+        groups = {}
+        for combo in combos:
+            key = (combo["prompt_idx"], combo["cfg_scale"], combo["steps"], combo["denoising_strength"])
+            groups.setdefault(key, []).append(combo)
+
+        results = {}  # id(combo) -> [PIL.Image] (按帧)
+        latencies = {}
+        done = 0
+        for group in groups.values():
+            head = group[0]
+            for chunk_start in range(0, len(group), self.config.sweep_max_batch):
+                self.cancel_token.check()
+
+                chunk = group[chunk_start:chunk_start + self.config.sweep_max_batch]
+                batch_size = len(chunk) * len(sources)
+                generators = [
+                    torch.Generator(device=inference_device()).manual_seed(combo["seed"])
+                    for combo in chunk for _ in sources
+                ]
+                kwargs = dict(
+                    image=[src for _ in chunk for src in sources],
+                    num_inference_steps=head["steps"],
+                    generator=generators,
+                    guidance_scale=head["cfg_scale"],
+                    **PipelineLoader.prompt_kwargs(pipe, self.config, head["prompt"], batch_size),
+                    **step_kwargs
+                )
+                if not self.config.enable_pose:
+                    kwargs["strength"] = head["denoising_strength"]
+
+                start = time.perf_counter()
+                images = pipe(**kwargs).images
+                if torch.cuda.is_available():
+                    torch.cuda.synchronize()
+                elapsed = time.perf_counter() - start
+
+                for i, combo in enumerate(chunk):
+                    results[id(combo)] = images[i * len(sources):(i + 1) * len(sources)]
+                    # 批次耗时按组合数均摊
+                    latencies[id(combo)] = elapsed / len(chunk)
+
+                done += len(chunk)
+                prog = 25 + int(done / len(combos) * 65)
+                self.progress(prog, f"参数扫描: {done}/{len(combos)}")
+
+        # === 3. 输出对比图与耗时表 ===
+        self.progress(92, "生成对比图...")
+        csv_path = os.path.join(self.work_dir, "sweep_latency.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["prompt_idx", "seed", "cfg_scale", "steps", "denoising_strength",
+                             "frames", "latency_s", "latency_per_frame_s"])
+            for combo in combos:
+                latency = latencies[id(combo)]
+                writer.writerow([combo["prompt_idx"], combo["seed"], combo["cfg_scale"], combo["steps"],
+                                 combo["denoising_strength"], len(sources),
+                                 f"{latency:.3f}", f"{latency / len(sources):.3f}"])
+
+        labels = [
+            f"P{c['prompt_idx']} seed={c['seed']} cfg={c['cfg_scale']} steps={c['steps']}"
+            + ("" if self.config.enable_pose else f" strength={c['denoising_strength']}")
+            + f"  {latencies[id(c)]:.2f}s"
+            for c in combos
+        ]
+        sheet_path = os.path.join(self.work_dir, "contact_sheet.jpg")
+        make_contact_sheet([results[id(c)] for c in combos], labels).save(sheet_path)
+        self.preview(sheet_path)
+
+        self.progress(100, f"参数扫描完成: {csv_path}")
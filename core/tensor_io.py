@@ -0,0 +1,125 @@
+import time
+import contextlib
+
+
+class TensorFrameIO:
+    """
+    帧数据在 NumPy 与 torch 之间的零 PIL 转换 (拆帧 -> 管线 -> 编码全程不经过 PIL.Image)。
+    输入/输出均使用预分配的缓冲区，逐帧只做一次主机->显存与一次显存->主机拷贝：
+      to_input(frame)    HxWx3 uint8 -> 1x3xHxW [0,1] 张量 (管线会自行归一化到 [-1,1])
+      to_numpy(images)   管线 output_type="pt" 的输出 -> HxWx3 uint8 (复用的缓冲区，下一帧会被覆盖)
+    """
+
+    def __init__(self, height, width, device="cuda", dtype=None):
+        import torch
+
+        self.torch = torch
+        self.device = torch.device(device)
+        self.dtype = dtype or torch.float32
+        pin = self.device.type == "cuda"
+
+        # 输入：锁页内存 -> 显存 uint8 -> 显存浮点
+        self._host_in = torch.empty((height, width, 3), dtype=torch.uint8, pin_memory=pin)
+        self._dev_in_u8 = torch.empty((height, width, 3), dtype=torch.uint8, device=self.device)
+        self._dev_in = torch.empty((1, 3, height, width), dtype=self.dtype, device=self.device)
+        self._out_shape = None
+        self._host_out = None
+
+    def to_input(self, frame):
+        torch = self.torch
+        if frame.shape != tuple(self._host_in.shape):
+            # 尺寸不同 (如缓存的骨骼图)：退化为一次性张量
+            return torch.from_numpy(frame.copy()).to(self.device).permute(2, 0, 1).unsqueeze(0) \
+                .to(self.dtype).div_(255)
+        self._host_in.numpy()[...] = frame
+        self._dev_in_u8.copy_(self._host_in, non_blocking=True)
+        self._dev_in[0].copy_(self._dev_in_u8.permute(2, 0, 1))
+        return self._dev_in.div_(255)
+
+    def to_numpy(self, images):
+        """images: (B, 3, H, W) 取第一张，在显存中量化为 uint8 后整体拷回主机"""
+        torch = self.torch
+        image = images[0]
+        u8 = image.clamp(0, 1).mul(255).round_().to(torch.uint8).permute(1, 2, 0)
+        shape = tuple(u8.shape)
+        if self._host_out is None or self._out_shape != shape:
+            self._out_shape = shape
+            self._host_out = torch.empty(shape, dtype=torch.uint8, pin_memory=(u8.device.type == "cuda"))
+        self._host_out.copy_(u8)
+        return self._host_out.numpy()
+
+    @staticmethod
+    def supports_tensor_output(pipe):
+        """旧版 diffusers 的管线没有 image_processor，不支持 output_type="pt"，需回退到 PIL 输出"""
+        return hasattr(pipe, "image_processor")
+
+
+class StageProfiler:
+    """
+    按阶段累计耗时的简易分析器 (config.profile_frames 开启时生效，关闭时所有方法均为空操作)。
+    对 UNet 注册前后钩子单独计时，从而得到“管线内 UNet 之外”的开销。
+    开启后每个阶段都会调用 torch.cuda.synchronize()，会略微降低吞吐，仅用于测量。
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals = {}
+        self.frames = 0
+        self._hooks = []
+        self._unet_start = None
+
+    @staticmethod
+    def _synchronize():
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+    def section(self, name):
+        if not self.enabled:
+            return contextlib.nullcontext()
+        profiler = self
+
+        class _Section:
+            def __enter__(self):
+                profiler._synchronize()
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                profiler._synchronize()
+                profiler.add(name, time.perf_counter() - self.start)
+
+        return _Section()
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def attach_unet(self, pipe):
+        unet = getattr(pipe, "unet", None)
+        if not self.enabled or unet is None:
+            return
+
+        def pre_hook(module, args):
+            self._synchronize()
+            self._unet_start = time.perf_counter()
+
+        def post_hook(module, args, output):
+            self._synchronize()
+            self.add("unet", time.perf_counter() - self._unet_start)
+
+        self._hooks = [unet.register_forward_pre_hook(pre_hook), unet.register_forward_hook(post_hook)]
+
+    def detach(self):
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+
+    def summary(self):
+        """每帧平均耗时 (ms)；pipeline_other = 管线总耗时 - UNet"""
+        if not self.frames:
+            return ""
+        per_frame = {k: v / self.frames * 1000 for k, v in self.totals.items()}
+        if "pipeline" in per_frame:
+            per_frame["pipeline_other"] = per_frame["pipeline"] - per_frame.get("unet", 0.0)
+        overhead = sum(v for k, v in per_frame.items() if k not in ("pipeline", "unet"))
+        parts = [f"{k} {v:.1f}" for k, v in per_frame.items()]
+        return f"每帧耗时 (ms): {', '.join(parts)} | UNet 之外合计 {overhead:.1f}"
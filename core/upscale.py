@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+
+
+class BaseUpscaler:
+    """
+    放大阶段接口 (位于逐帧生成与编码之间，CPU 上运行)：
+    upscale(frame, size) 把 HxWx3 uint8 帧放大到 size=(宽, 高)
+    """
+
+    label = ""
+
+    def upscale(self, frame, size):
+        raise NotImplementedError
+
+
+class LanczosUpscaler(BaseUpscaler):
+    """OpenCV Lanczos4 插值：无需权重，512 -> 1080 宽度每帧仅数毫秒"""
+
+    label = "Lanczos"
+
+    def upscale(self, frame, size):
+        import cv2
+
+        if (frame.shape[1], frame.shape[0]) == tuple(size):
+            return frame
+        return cv2.resize(frame, tuple(size), interpolation=cv2.INTER_LANCZOS4)
+
+
+class LearnedUpscaler(BaseUpscaler):
+    """
+    轻量学习型超分 (ESPCN / FSRCNN 等 OpenCV dnn_superres 格式的 .pb 权重，只需本地文件)。
+    与 dnn_superres 相同的做法：网络只放大亮度通道 Y，色度通道用双三次插值；
+    网络放大倍数与目标尺寸不一致时，最后再用 Lanczos 调整到精确尺寸。
+    只依赖 OpenCV 的 dnn 模块 (opencv-python 自带，无需 contrib)。
+    """
+
+    label = "ESPCN/FSRCNN"
+
+    def __init__(self, model_path):
+        import cv2
+
+        if not model_path or not os.path.exists(model_path):
+            raise ValueError(f"未找到超分模型权重: {model_path or '(未设置)'}")
+        self.net = cv2.dnn.readNet(model_path)
+        self._fallback = LanczosUpscaler()
+
+    def upscale(self, frame, size):
+        import cv2
+
+        if (frame.shape[1], frame.shape[0]) == tuple(size):
+            return frame
+        ycrcb = cv2.cvtColor(frame, cv2.COLOR_RGB2YCrCb)
+        y = ycrcb[..., 0].astype(np.float32) / 255.0
+        self.net.setInput(cv2.dnn.blobFromImage(y))
+        y_up = self.net.forward()[0, 0]
+        h, w = y_up.shape
+        y_up = np.clip(y_up * 255.0 + 0.5, 0, 255).astype(np.uint8)
+        crcb = cv2.resize(ycrcb[..., 1:], (w, h), interpolation=cv2.INTER_CUBIC)
+        result = cv2.cvtColor(np.dstack([y_up, crcb]), cv2.COLOR_YCrCb2RGB)
+        return self._fallback.upscale(result, size)
+
+
+UPSCALERS = {
+    "lanczos": LanczosUpscaler,
+    "learned": LearnedUpscaler,
+}
+
+
+def render_size(config, src_width, src_height):
+    """
+    返回 ((生成宽, 生成高), (输出宽, 输出高))：
+    target_width 为输出宽度；render_width 在 (0, target_width) 之间时以该宽度生成，再放大到输出尺寸
+    """
+    from core.video_io import scaled_size
+
+    output = scaled_size(src_width, src_height, config.target_width)
+    if 0 < config.render_width < config.target_width:
+        return scaled_size(src_width, src_height, config.render_width), output
+    return output, output
+
+
+def create_upscaler(config):
+    if config.upscaler == "learned":
+        return LearnedUpscaler(config.upscaler_model_path)
+    if config.upscaler not in UPSCALERS:
+        raise ValueError(f"未知的放大方式: {config.upscaler}")
+    return UPSCALERS[config.upscaler]()
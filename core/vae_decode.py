@@ -0,0 +1,135 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 近似解码器 TAESD 的默认 Hub 仓库 (约 5MB，解码耗时约为完整 VAE 的几十分之一)
+TINY_VAE_REPO = "madebyollin/taesd"
+
+# 已加载的近似解码器：{(路径, 设备, dtype): AutoencoderTiny}
+_tiny_cache = {}
+
+
+def latents_to_uint8(torch, image):
+    """VAE 输出 (B, 3, H, W, 取值 [-1, 1]) 的第一张 -> HxWx3 uint8，与管线 postprocess + 量化的结果一致"""
+    u8 = (image[0] / 2 + 0.5).clamp(0, 1).mul(255).round_().to(torch.uint8).permute(1, 2, 0)
+    return u8.cpu().numpy()
+
+
+def run_safety_checker(pipe, image):
+    """
+    output_type="latent" 时 diffusers 管线不会运行安全检查器 (它只在管线内部解码之后调用)，独立解码后在这里补上。
+    image 为 VAE 输出 (B, 3, H, W)；返回 (image, 是否被判定)。被判定的帧由调用方输出为全黑，与管线的行为一致。
+    管线未加载安全检查器 (单文件模型默认不加载) 时直接返回。
+    """
+    if getattr(pipe, "safety_checker", None) is None:
+        return image, False
+    image, has_nsfw_concept = pipe.run_safety_checker(image, image.device, image.dtype)
+    return image, bool(has_nsfw_concept and has_nsfw_concept[0])
+
+
+class VAEDecodeStage:
+    """
+    独立的 VAE 解码阶段：管线以 output_type="latent" 只做去噪，潜变量交给后台线程解码，
+    与下一帧的去噪重叠 (CUDA 上在独立的 stream 中执行；解码结果拷回主机也在后台完成)。
+      submit(latents)   返回 Future，结果为新分配的 HxWx3 uint8 数组；排队数达到 max_pending 时阻塞
+      decode(latents)   同步解码 (overlap=False，或调用方需要立即拿到结果时)
+      close()           等待剩余解码完成并关闭线程
+    VAE 切片/分块 (vae.enable_slicing / enable_tiling) 由 PipelineLoader 按配置设置，这里直接生效。
+    管线加载了安全检查器时，每帧解码后都会运行它 (见 run_safety_checker)，被判定的帧输出为全黑。
+    """
+
+    max_pending = 2
+
+    def __init__(self, pipe, overlap=True):
+        import torch
+
+        self.torch = torch
+        self.pipe = pipe
+        self.vae = pipe.vae
+        self.scaling_factor = pipe.vae.config.scaling_factor
+        self.overlap = overlap
+        self._stream = None
+        self._executor = None
+        if overlap:
+            self._stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vae-decode")
+            self._slots = threading.Semaphore(self.max_pending)
+
+        self.frames = 0
+        self.flagged = 0
+        self.decode_time = 0.0
+
+    def submit(self, latents):
+        torch = self.torch
+        self._slots.acquire()
+        event = None
+        if self._stream is not None:
+            # 解码流等待去噪流中产生潜变量的操作完成；潜变量在解码流中使用期间不被显存分配器回收
+            event = torch.cuda.Event()
+            event.record()
+            latents.record_stream(self._stream)
+        future = self._executor.submit(self._decode_async, latents, event)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _decode_async(self, latents, event):
+        if self._stream is None:
+            return self.decode(latents)
+        self._stream.wait_event(event)
+        with self.torch.cuda.stream(self._stream):
+            return self.decode(latents)
+
+    def decode(self, latents):
+        torch = self.torch
+        start = time.perf_counter()
+        with torch.no_grad():
+            image = self.vae.decode(latents / self.scaling_factor, return_dict=False)[0]
+            image, flagged = run_safety_checker(self.pipe, image)
+            rgb = latents_to_uint8(torch, image)
+        if flagged:
+            rgb[:] = 0
+            self.flagged += 1
+        self.decode_time += time.perf_counter() - start
+        self.frames += 1
+        return rgb
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def summary(self):
+        per_frame = self.decode_time / self.frames * 1000 if self.frames else 0.0
+        mode = "后台解码 (与去噪重叠)" if self.overlap else "独立解码"
+        text = f"{mode} {self.frames} 帧，平均 {per_frame:.0f} ms/帧"
+        if self.flagged:
+            text += f"，安全检查器拦截 {self.flagged} 帧 (已输出为黑帧)"
+        return text
+
+
+class TinyDecoder:
+    """TAESD 近似解码器：用于实时预览/快速预览，画面略糊但几乎不占时间；最终输出不使用。同样经过安全检查器"""
+
+    def __init__(self, pipe, path=""):
+        import torch
+        from diffusers import AutoencoderTiny
+
+        self.torch = torch
+        self.pipe = pipe
+        path = path or TINY_VAE_REPO
+        key = (path, str(pipe.vae.device), pipe.vae.dtype)
+        if key not in _tiny_cache:
+            print(f">> 加载近似解码器: {path}")
+            _tiny_cache[key] = AutoencoderTiny.from_pretrained(path, torch_dtype=pipe.vae.dtype).to(pipe.vae.device)
+        self.vae = _tiny_cache[key]
+
+    def decode(self, latents):
+        torch = self.torch
+        with torch.no_grad():
+            latents = latents.to(self.vae.device, self.vae.dtype)
+            image = self.vae.decode(latents / self.vae.config.scaling_factor, return_dict=False)[0]
+            image, flagged = run_safety_checker(self.pipe, image)
+        rgb = latents_to_uint8(torch, image)
+        if flagged:
+            rgb[:] = 0
+        return rgb
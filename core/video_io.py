@@ -0,0 +1,211 @@
+import os
+import json
+import subprocess
+
+
+def get_startupinfo():
+    """Windows 下隐藏 ffmpeg 控制台窗口，其他平台返回 None"""
+    startupinfo = None
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return startupinfo
+
+
+def run_ffmpeg(cmd, cancel_token=None, poll_interval=0.1):
+    """
+    运行 ffmpeg 命令。传入 CancelToken 时轮询取消状态，
+    取消后立即终止子进程并抛出 JobCancelled。
+    """
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, startupinfo=get_startupinfo())
+    try:
+        while True:
+            try:
+                returncode = process.wait(timeout=poll_interval)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_token is not None and cancel_token.cancelled:
+                    process.terminate()
+                    process.wait()
+                    cancel_token.check()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+def probe_duration(video_path):
+    """使用 ffprobe 获取视频时长 (秒)，失败时返回 0.0"""
+    try:
+        result = subprocess.run([
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            video_path
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            check=True, startupinfo=get_startupinfo())
+        return float(result.stdout.strip())
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return 0.0
+
+
+def probe_video_size(video_path):
+    """
+    获取视频显示尺寸 (宽, 高)，已考虑旋转元数据 (ffmpeg 默认会自动旋转)。
+    失败时返回 (0, 0)。
+    """
+    try:
+        result = subprocess.run([
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:stream_tags=rotate:stream_side_data=rotation",
+            "-of", "json", video_path
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            check=True, startupinfo=get_startupinfo())
+        stream = json.loads(result.stdout)["streams"][0]
+    except (OSError, ValueError, KeyError, IndexError, subprocess.CalledProcessError):
+        return 0, 0
+
+    width, height = int(stream["width"]), int(stream["height"])
+    rotation = stream.get("tags", {}).get("rotate")
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+        width, height = height, width
+    return width, height
+
+
+def scaled_size(src_width, src_height, target_width):
+    """按目标宽度等比缩放，宽高取偶数 (yuv420p 编码要求)"""
+    width = max(2, target_width // 2 * 2)
+    height = max(2, int(round(src_height * width / src_width / 2)) * 2)
+    return width, height
+
+
+def seek_args(start=0.0, end=0.0):
+    """
+    子片段的 ffmpeg 参数：-ss 放在 -i 之前为输入端快速 seek (跳到最近的关键帧后精确解码到起点)，
+    只解码所需区间；end <= start 表示直到视频结尾。返回 (输入前参数, 输入后参数)
+    """
+    before = ["-ss", f"{start:.3f}"] if start > 0 else []
+    after = ["-t", f"{end - start:.3f}"] if end > start else []
+    return before, after
+
+
+def decode_frames(video_path, fps, width, height, cancel_token=None, start=0.0, end=0.0):
+    """
+    通过 rawvideo 管道解码视频，逐帧产出 (height, width, 3) 的 uint8 数组，
+    不落地任何中间图片文件。start/end (秒) 指定子片段，只解码该区间。
+    """
+    import numpy as np
+
+    frame_bytes = width * height * 3
+    before, after = seek_args(start, end)
+    process = subprocess.Popen([
+        "ffmpeg", "-v", "error", *before, "-i", video_path, *after,
+        "-vf", f"fps={fps},scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-"
+    ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, startupinfo=get_startupinfo(),
+        bufsize=frame_bytes)
+    try:
+        while True:
+            if cancel_token is not None:
+                cancel_token.check()
+            buf = process.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 3)
+        returncode = process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, "ffmpeg (decode)")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+class FrameEncoder:
+    """
+    流式 H.264 编码器：帧生成后立即写入 ffmpeg 的 rawvideo 管道，
+    生成帧无需在磁盘上留存。首帧写入时按其尺寸启动 ffmpeg。
+    """
+
+    def __init__(self, out_path, fps):
+        self.out_path = out_path
+        self.fps = fps
+        self.count = 0
+        self.process = None
+
+    def write(self, frame):
+        if self.process is None:
+            height, width = frame.shape[:2]
+            self.process = subprocess.Popen([
+                "ffmpeg", "-y", "-v", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(self.fps),
+                "-i", "-",
+                "-c:v", "libx264", "-pix_fmt", "yuv420p",
+                self.out_path
+            ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                startupinfo=get_startupinfo())
+        self.process.stdin.write(memoryview(frame).cast("B") if frame.flags.c_contiguous else frame.tobytes())
+        self.count += 1
+
+    @property
+    def is_open(self):
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """结束输入并等待编码完成"""
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        returncode = self.process.wait()
+        self.process = None
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, "ffmpeg (encode)")
+
+    def abort(self):
+        """终止编码并删除不完整的输出文件"""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process = None
+        if os.path.exists(self.out_path):
+            os.remove(self.out_path)
+
+
+def encode_frames(frames, fps, out_path, cancel_token=None):
+    """通过 rawvideo 管道将帧序列 (可迭代的 HxWx3 uint8 数组) 编码为 H.264 视频"""
+    encoder = FrameEncoder(out_path, fps)
+    try:
+        for frame in frames:
+            if cancel_token is not None:
+                cancel_token.check()
+            encoder.write(frame)
+        encoder.close()
+    except BaseException:
+        encoder.abort()
+        raise
+
+
+def clip_duration(video_path, start=0.0, end=0.0):
+    """子片段的实际时长 (秒)：end 为 0 或超出视频长度时截止到结尾"""
+    duration = probe_duration(video_path)
+    if end > start:
+        duration = min(duration, end)
+    return max(duration - start, 0.0)
+
+
+def estimate_frame_count(video_path, fps, start=0.0, end=0.0):
+    """按目标帧率估算拆帧后的帧数 (与 ffmpeg fps 滤镜的输出保持一致)"""
+    return max(int(clip_duration(video_path, start, end) * fps), 0)
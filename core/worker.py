@@ -1,182 +1,128 @@
-import os
-import subprocess
-import shutil  # 新增：用于清理目录
 from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from core.cancellation import CancelToken
 
 
 # 注意：移除了顶部的 torch, PIL, controlnet_aux 导入
-# 改为在 run() 方法中延迟导入，确保 GUI 启动时不崩溃
+# 任务逻辑位于 core.jobs (不依赖 Qt)，并在 run() 中延迟导入 AI 库，确保 GUI 启动时不崩溃
 
 class AIWorker(QThread):
+    """
+    在 GUI 进程的后台线程中运行任务 (execution_mode="thread")。
+    子类通过 job_type 指定任务类型。
+    """
+    job_type = "render"
+
     progress_signal = pyqtSignal(int, str)
+    preview_signal = pyqtSignal(str)  # 预览网格图/对比图路径
+    frame_signal = pyqtSignal(QImage)  # 实时预览帧
     finished_signal = pyqtSignal()
     error_signal = pyqtSignal(str)
 
     def __init__(self, config):
         super().__init__()
         self.config = config
-        self.running = True
+        self.cancel_token = CancelToken()
 
     def run(self):
-        # 确保 temp 目录变量在 try 块外部定义，以便在 finally 块中访问
-        temp_dir = None
-        base_dir = self.config.output_dir
-
+        from core.jobs import get_job_class
+
+        job = get_job_class(self.job_type)(
+            self.config, self.cancel_token,
+            on_progress=self.progress_signal.emit,
+            on_preview=self.preview_signal.emit,
+            on_frame=self._emit_frame
+        )
         try:
-            # === 延迟导入区 ===
-            import torch
-            from PIL import Image
-            from controlnet_aux import OpenposeDetector
-            from core.pipeline_utils import PipelineLoader
-            # =================
-
-            if not self.config.input_video_path or not os.path.exists(self.config.input_video_path):
-                raise ValueError("无效的视频输入路径")
-
-            # 确保主输出目录存在
-            os.makedirs(base_dir, exist_ok=True)
-
-            # 临时目录 (用于存放中间帧：raw, pose)
-            temp_dir = os.path.join(base_dir, self.config.temp_dir_name)
-
-            # 最终输出帧目录
-            final_out_dir_name = "frames_out"
-            out_dir = os.path.join(base_dir, final_out_dir_name)
-
-            dirs = {
-                # 原始帧和姿态帧放在临时目录
-                "raw": os.path.join(temp_dir, "frames_raw"),
-                "pose": os.path.join(temp_dir, "frames_pose"),
-                # 最终生成帧放在主目录
-                "out": out_dir
-            }
-
-            # 清理并创建必要的目录
-            if os.path.exists(temp_dir):
-                self.progress_signal.emit(1, "清理旧临时文件...")
-                shutil.rmtree(temp_dir)  # 每次运行前清理旧的临时目录
-
-            os.makedirs(temp_dir, exist_ok=True)
-            for d in dirs.values():
-                # 确保所有子目录都创建
-                os.makedirs(d, exist_ok=True)
-
-            startupinfo = None
-            if os.name == 'nt':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-            # === 1. 视频拆帧 ===
-            fps = self.config.target_fps
-            width = self.config.target_width
-
-            self.progress_signal.emit(5, f"拆帧中 ({fps}fps) -> 临时目录...")
-            subprocess.run([
-                "ffmpeg", "-y", "-i", self.config.input_video_path,
-                "-vf", f"fps={fps},scale={width}:-1",
-                "-q:v", "2",
-                os.path.join(dirs["raw"], "frame_%04d.jpg")
-            ], check=True, startupinfo=startupinfo)
-
-            frame_files = sorted([f for f in os.listdir(dirs["raw"]) if f.endswith(".jpg")])
-            total_frames = len(frame_files)
-
-            # === 2. 姿态估计 (可选) ===
-            if self.config.enable_pose:
-                self.progress_signal.emit(15, "OpenPose 检测中...")
-                detector = OpenposeDetector.from_pretrained("lllyasviel/ControlNet")
-
-                for idx, f_name in enumerate(frame_files):
-                    if not self.running: return
-
-                    # --- 内存优化：处理完即释放 ---
-                    img = Image.open(os.path.join(dirs["raw"], f_name))
-                    pose = detector(img)
-                    pose.save(os.path.join(dirs["pose"], f_name))
-                    del img, pose  # 释放当前帧的内存
-
-                    prog = 20 + int((idx / total_frames) * 20)
-                    self.progress_signal.emit(prog, f"提取骨骼: {idx + 1}/{total_frames}")
-
-                del detector
-                torch.cuda.empty_cache()
-            else:
-                self.progress_signal.emit(20, "跳过骨骼提取 (Img2Img 模式)")
-
-            # === 3. 风格化生成 ===
-            self.progress_signal.emit(40, "加载生成模型...")
-            pipe = PipelineLoader.load_pipeline(self.config)
-
-            self.progress_signal.emit(50, "生成中...")
-            for idx, f_name in enumerate(frame_files):
-                if not self.running: return
-
-                raw_img = Image.open(os.path.join(dirs["raw"], f_name))
-                generator = torch.Generator(device="cuda").manual_seed(self.config.seed)
-
-                # === 核心生成逻辑分支 ===
-                if self.config.enable_pose:
-                    # A: 使用骨骼控制网
-                    pose_img = Image.open(os.path.join(dirs["pose"], f_name))
-                    image = pipe(
-                        prompt=self.config.prompt,
-                        negative_prompt=self.config.negative_prompt,
-                        image=pose_img,  # ControlNet 输入骨骼
-                        num_inference_steps=self.config.steps,
-                        generator=generator,
-                        guidance_scale=self.config.cfg_scale
-                    ).images[0]
-                    del pose_img  # 释放骨骼图内存
-                else:
-                    # B: 使用图生图
-                    image = pipe(
-                        prompt=self.config.prompt,
-                        negative_prompt=self.config.negative_prompt,
-                        image=raw_img,  # Img2Img 输入原图
-                        strength=self.config.denoising_strength,  # 重绘幅度
-                        num_inference_steps=self.config.steps,
-                        generator=generator,
-                        guidance_scale=self.config.cfg_scale
-                    ).images[0]
-
-                image.save(os.path.join(dirs["out"], f_name))
-
-                # --- 内存优化：释放当前帧和生成结果的内存 ---
-                del raw_img, image
-                torch.cuda.empty_cache()  # 每次释放 VRAM
-
-                prog = 50 + int((idx / total_frames) * 45)
-                self.progress_signal.emit(prog, f"帧生成: {idx + 1}/{total_frames}")
-
-            del pipe  # 任务完成后卸载模型
-            torch.cuda.empty_cache()
-
-            # === 4. 视频合成 ===
-            self.progress_signal.emit(95, "合成视频...")
-            subprocess.run([
-                "ffmpeg", "-y", "-r", str(fps),
-                "-i", os.path.join(dirs["out"], "frame_%04d.jpg"),
-                "-c:v", "libx264", "-pix_fmt", "yuv420p",
-                os.path.join(base_dir, "final_output.mp4")
-            ], check=True, startupinfo=startupinfo)
-
-            self.progress_signal.emit(100, "完成！")
-            self.finished_signal.emit()
-
+            if job.execute():
+                self.finished_signal.emit()
         except Exception as e:
             import traceback
             traceback.print_exc()
             self.error_signal.emit(str(e))
 
-        finally:
-            # === 5. 清理临时文件 (每次清理) ===
-            if temp_dir and os.path.exists(temp_dir):
-                self.progress_signal.emit(100, "清理临时文件...")
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"清理临时目录失败: {e}")
-            # ==================================
-
-    def stop(self):
-        self.running = False
\ No newline at end of file
+    def _emit_frame(self, rgb):
+        h, w, _ = rgb.shape
+        self.frame_signal.emit(QImage(rgb.tobytes(), w, h, 3 * w, QImage.Format.Format_RGB888).copy())
+
+    def stop(self, finalize=False):
+        """
+        请求停止任务 (在下一个检查点生效，最长一个去噪步)。
+        finalize=True 时将已生成的帧合成为部分 final_output.mp4。
+        """
+        self.cancel_token.cancel(finalize)
+
+
+class PreviewWorker(AIWorker):
+    """快速预览任务 (见 core.preview.PreviewJob)"""
+    job_type = "preview"
+
+
+class SweepWorker(AIWorker):
+    """参数扫描任务 (见 core.sweep.SweepJob)"""
+    job_type = "sweep"
+
+
+class DaemonAIWorker(QThread):
+    """
+    与 AIWorker 接口一致的代理：任务提交给本地推理服务 (core.daemon)，
+    与命令行等其他客户端共享服务中已加载的模型。
+    """
+    progress_signal = pyqtSignal(int, str)
+    preview_signal = pyqtSignal(str)
+    frame_signal = pyqtSignal(QImage)
+    finished_signal = pyqtSignal()
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, config, job_type="render"):
+        super().__init__()
+        from core.daemon_client import DaemonClient
+
+        self.config = config
+        self.job_type = job_type
+        self.client = DaemonClient(config.daemon_host, config.daemon_port)
+
+    def run(self):
+        try:
+            self.client.run_job(self.job_type, self.config, self._on_event, stream_frames=True)
+        except OSError as e:
+            self.error_signal.emit(
+                f"无法连接本地推理服务 {self.config.daemon_host}:{self.config.daemon_port}，"
+                f"请先运行 python cli.py serve ({e})")
+
+    def _on_event(self, event):
+        kind = event.get("event")
+        if kind == "progress":
+            self.progress_signal.emit(event["value"], event["text"])
+        elif kind == "preview":
+            self.preview_signal.emit(event["path"])
+        elif kind == "frame":
+            self.frame_signal.emit(QImage.fromData(self.client.decode_frame(event)))
+        elif kind == "done":
+            self.finished_signal.emit()
+        elif kind == "error":
+            self.error_signal.emit(event["message"])
+
+    def stop(self, finalize=False):
+        try:
+            self.client.cancel(finalize=finalize)
+        except OSError:
+            pass
+
+
+def create_worker(config, job_type="render"):
+    """
+    按配置的执行方式创建 worker：
+    process - 独立的受监管推理进程 (默认)
+    thread  - GUI 进程内的 QThread
+    daemon  - 本地推理服务 (与命令行共享热模型)
+    """
+    if config.execution_mode == "process":
+        from core.process_worker import ProcessAIWorker
+        return ProcessAIWorker(config, job_type)
+    if config.execution_mode == "daemon":
+        return DaemonAIWorker(config, job_type)
+
+    workers = {"render": AIWorker, "preview": PreviewWorker, "sweep": SweepWorker}
+    return workers[job_type](config)
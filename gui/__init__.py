@@ -11,7 +11,8 @@ from .custom_components import (
     SimpleSpinBoxSettingCard,
     SimpleDoubleSpinBoxSettingCard,
     SimpleSwitchSettingCard,
-    SimpleLineEditSettingCard
+    SimpleLineEditSettingCard,
+    SimpleComboBoxSettingCard
 )
 
 __all__ = [
@@ -26,5 +27,6 @@ __all__ = [
     "SimpleSpinBoxSettingCard",
     "SimpleDoubleSpinBoxSettingCard",
     "SimpleSwitchSettingCard",
-    "SimpleLineEditSettingCard"
+    "SimpleLineEditSettingCard",
+    "SimpleComboBoxSettingCard"
 ]
\ No newline at end of file
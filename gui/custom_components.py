@@ -1,7 +1,7 @@
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import QLabel
 from qfluentwidgets import (
-    SettingCard, SwitchButton, SpinBox, DoubleSpinBox, LineEdit
+    SettingCard, SwitchButton, SpinBox, DoubleSpinBox, LineEdit, ComboBox
 )
 
 
@@ -99,4 +99,31 @@ class SimpleSwitchSettingCard(SettingCard):
 
     def __onCheckedChanged(self, is_checked):
         self.stateLabel.setText("开启" if is_checked else "关闭")
-        self.checkedChanged.emit(is_checked)
\ No newline at end of file
+        self.checkedChanged.emit(is_checked)
+
+
+class SimpleComboBoxSettingCard(SettingCard):
+    """
+    [新增] 下拉选择设置卡片 (用于执行方式、采样器等枚举选项)
+    options: [(值, 显示文本), ...]，valueChanged 发出选中项的值
+    """
+    valueChanged = pyqtSignal(str)
+
+    def __init__(self, value, options, icon, title, content=None, parent=None):
+        super().__init__(icon, title, content, parent)
+        self.values = [v for v, _ in options]
+
+        self.comboBox = ComboBox(self)
+        self.comboBox.addItems([text for _, text in options])
+        if value in self.values:
+            self.comboBox.setCurrentIndex(self.values.index(value))
+        self.comboBox.setFixedWidth(200)
+
+        self.hBoxLayout.addWidget(self.comboBox, 0, Qt.AlignmentFlag.AlignRight)
+        self.hBoxLayout.addSpacing(16)
+
+        self.comboBox.currentIndexChanged.connect(lambda i: self.valueChanged.emit(self.values[i]))
+
+    def setValue(self, value):
+        if value in self.values:
+            self.comboBox.setCurrentIndex(self.values.index(value))
@@ -0,0 +1,46 @@
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+
+class EventLoopMonitor(QObject):
+    """
+    GUI 事件循环延迟探针：以固定间隔触发定时器，测量实际触发时间相对预期的滞后。
+    滞后越大，说明主线程被阻塞 (如与推理代码争抢 GIL) 越严重。
+    """
+
+    def __init__(self, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._on_tick)
+        self.reset()
+
+    def reset(self):
+        self._last = None
+        self.samples = 0
+        self.total_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def start(self):
+        self.reset()
+        self._last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _on_tick(self):
+        now = time.perf_counter()
+        lag = max(0.0, (now - self._last) * 1000 - self.interval_ms)
+        self._last = now
+        self.samples += 1
+        self.total_lag_ms += lag
+        self.max_lag_ms = max(self.max_lag_ms, lag)
+
+    @property
+    def mean_lag_ms(self):
+        return self.total_lag_ms / self.samples if self.samples else 0.0
+
+    def summary(self):
+        return f"界面延迟: 平均 {self.mean_lag_ms:.1f} ms / 最大 {self.max_lag_ms:.1f} ms"
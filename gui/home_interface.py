@@ -15,7 +15,8 @@ from gui.custom_components import (
     SimpleSpinBoxSettingCard,
     SimpleDoubleSpinBoxSettingCard,
     SimpleSwitchSettingCard,
-    SimpleLineEditSettingCard
+    SimpleLineEditSettingCard,
+    SimpleComboBoxSettingCard
 )
 
 
@@ -87,6 +88,54 @@ class Step1Interface(ScrollArea):
         self.poseSwitch.checkedChanged.connect(lambda v: setattr(self.config, 'enable_pose', v))
         self.vBoxLayout.addWidget(self.poseSwitch)
 
+        # 姿态检测后端 与 检测分辨率
+        poseLayout = QHBoxLayout()
+        poseLayout.setSpacing(15)
+
+        self.poseBackendCard = SimpleComboBoxSettingCard(
+            self.config.pose_backend,
+            [("openpose", "OpenPose (精细，较慢)"), ("mediapipe", "MediaPipe (轻量，CPU 实时)")],
+            FIF.PEOPLE, "姿态检测后端", "两者均输出 ControlNet OpenPose 骨骼图", self.scrollWidget
+        )
+        self.poseBackendCard.valueChanged.connect(lambda v: setattr(self.config, 'pose_backend', v))
+
+        self.poseResolutionCard = SimpleSpinBoxSettingCard(
+            self.config.pose_resolution, 128, 1024, FIF.ZOOM,
+            "检测分辨率 (PX)", "短边像素，越低越快", self.scrollWidget
+        )
+        self.poseResolutionCard.valueChanged.connect(lambda v: setattr(self.config, 'pose_resolution', v))
+
+        poseLayout.addWidget(self.poseBackendCard)
+        poseLayout.addWidget(self.poseResolutionCard)
+        self.vBoxLayout.addLayout(poseLayout)
+
+        # 稀疏检测 (每 N 帧检测一次，中间帧插值) 与关键点平滑
+        sparseLayout = QHBoxLayout()
+        sparseLayout.setSpacing(15)
+
+        self.poseIntervalCard = SimpleSpinBoxSettingCard(
+            self.config.pose_interval, 1, 12, FIF.SKIP_FORWARD,
+            "检测间隔 (帧)", "1 为逐帧检测，中间帧插值关键点", self.scrollWidget
+        )
+        self.poseIntervalCard.valueChanged.connect(lambda v: setattr(self.config, 'pose_interval', v))
+
+        self.poseMotionCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.pose_motion_threshold, 0.0, 64.0, 1.0, FIF.SPEED_MEDIUM,
+            "运动触发阈值", "画面变化超过该值时提前检测，0 关闭", self.scrollWidget
+        )
+        self.poseMotionCard.valueChanged.connect(lambda v: setattr(self.config, 'pose_motion_threshold', v))
+
+        sparseLayout.addWidget(self.poseIntervalCard)
+        sparseLayout.addWidget(self.poseMotionCard)
+        self.vBoxLayout.addLayout(sparseLayout)
+
+        self.poseSmoothCard = SimpleSwitchSettingCard(
+            self.config.pose_smoothing, FIF.BRUSH, "骨骼平滑",
+            "对关键点轨迹做轻量滤波，减少逐帧检测带来的骨骼抖动", self.scrollWidget
+        )
+        self.poseSmoothCard.checkedChanged.connect(lambda v: setattr(self.config, 'pose_smoothing', v))
+        self.vBoxLayout.addWidget(self.poseSmoothCard)
+
         # 目标帧率 和 目标宽度
         prepLayout = QHBoxLayout()
         prepLayout.setSpacing(15)
@@ -107,6 +156,81 @@ class Step1Interface(ScrollArea):
         prepLayout.addWidget(self.widthCard)
         self.vBoxLayout.addLayout(prepLayout)
 
+        # 生成分辨率 与 放大方式 (以较低分辨率生成，编码前在 CPU 上放大到目标宽度)
+        upscaleLayout = QHBoxLayout()
+        upscaleLayout.setSpacing(15)
+
+        self.renderWidthCard = SimpleSpinBoxSettingCard(
+            self.config.render_width, 0, 2048, FIF.FIT_PAGE,
+            "生成宽度 (PX)", "0 与目标宽度相同；更低时先生成再放大", self.scrollWidget
+        )
+        self.renderWidthCard.valueChanged.connect(lambda v: setattr(self.config, 'render_width', v))
+
+        self.upscalerCard = SimpleComboBoxSettingCard(
+            self.config.upscaler,
+            [("lanczos", "Lanczos (无需权重)"), ("learned", "ESPCN/FSRCNN (本地权重)")],
+            FIF.ZOOM, "放大方式", "仅在生成宽度低于目标宽度时生效", self.scrollWidget
+        )
+        self.upscalerCard.valueChanged.connect(self._on_upscaler_changed)
+
+        upscaleLayout.addWidget(self.renderWidthCard)
+        upscaleLayout.addWidget(self.upscalerCard)
+        self.vBoxLayout.addLayout(upscaleLayout)
+
+        self.upscalerModelCard = PushSettingCard(
+            "选择文件", FIF.FOLDER, "超分模型权重",
+            self.config.upscaler_model_path if self.config.upscaler_model_path else "OpenCV dnn_superres 格式的 .pb 文件",
+            self.scrollWidget
+        )
+        self.upscalerModelCard.clicked.connect(self.select_upscaler_model)
+        self.upscalerModelCard.setVisible(self.config.upscaler == "learned")
+        self.vBoxLayout.addWidget(self.upscalerModelCard)
+
+        # 子片段范围 (只处理所选区间，结束时间为 0 表示直到结尾)
+        clipLayout = QHBoxLayout()
+        clipLayout.setSpacing(15)
+
+        self.clipStartCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.clip_start, 0.0, 86400.0, 0.5, FIF.STOP_WATCH,
+            "起始时间 (秒)", "只处理所选片段，快速重渲单个镜头", self.scrollWidget
+        )
+        self.clipStartCard.valueChanged.connect(lambda v: self._set_clip('clip_start', v))
+
+        self.clipEndCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.clip_end, 0.0, 86400.0, 0.5, FIF.STOP_WATCH,
+            "结束时间 (秒)", "0 表示直到结尾", self.scrollWidget
+        )
+        self.clipEndCard.valueChanged.connect(lambda v: self._set_clip('clip_end', v))
+
+        clipLayout.addWidget(self.clipStartCard)
+        clipLayout.addWidget(self.clipEndCard)
+        self.vBoxLayout.addLayout(clipLayout)
+
+        self.video_duration = 0.0
+        self.clipHintLabel = CaptionLabel("", self.scrollWidget)
+        self.vBoxLayout.addWidget(self.clipHintLabel)
+        self._update_clip_hint()
+
+        # 镜头切换检测
+        sceneLayout = QHBoxLayout()
+        sceneLayout.setSpacing(15)
+
+        self.sceneCard = SimpleSwitchSettingCard(
+            self.config.scene_detect, FIF.MOVIE, "镜头切换检测",
+            "切点处强制关键帧并重置跨帧缓存", self.scrollWidget
+        )
+        self.sceneCard.checkedChanged.connect(lambda v: setattr(self.config, 'scene_detect', v))
+
+        self.sceneThresholdCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.scene_cut_threshold, 0.05, 1.0, 0.05, FIF.FILTER,
+            "切点阈值", "越低越敏感", self.scrollWidget
+        )
+        self.sceneThresholdCard.valueChanged.connect(lambda v: setattr(self.config, 'scene_cut_threshold', v))
+
+        sceneLayout.addWidget(self.sceneCard)
+        sceneLayout.addWidget(self.sceneThresholdCard)
+        self.vBoxLayout.addLayout(sceneLayout)
+
         self.vBoxLayout.addStretch(1)
 
         # ==================================================
@@ -132,6 +256,56 @@ class Step1Interface(ScrollArea):
     # --------------------------------------------------
     # 逻辑部分 (保留和修改)
     # --------------------------------------------------
+    def sync_from_config(self):
+        """用当前配置刷新预处理控件 (步骤 2 加载预设后调用)"""
+        self.poseSwitch.switchButton.setChecked(self.config.enable_pose)
+        self.poseBackendCard.setValue(self.config.pose_backend)
+        self.poseResolutionCard.setValue(self.config.pose_resolution)
+        self.poseIntervalCard.setValue(self.config.pose_interval)
+        self.poseMotionCard.setValue(self.config.pose_motion_threshold)
+        self.poseSmoothCard.switchButton.setChecked(self.config.pose_smoothing)
+        self.fpsCard.setValue(self.config.target_fps)
+        self.widthCard.setValue(self.config.target_width)
+        self.renderWidthCard.setValue(self.config.render_width)
+        self.upscalerCard.setValue(self.config.upscaler)
+        self.upscalerModelCard.setVisible(self.config.upscaler == "learned")
+        self.sceneCard.switchButton.setChecked(self.config.scene_detect)
+        self.sceneThresholdCard.setValue(self.config.scene_cut_threshold)
+        self.clipStartCard.setValue(self.config.clip_start)
+        self.clipEndCard.setValue(self.config.clip_end)
+
+    def _on_upscaler_changed(self, name):
+        self.config.upscaler = name
+        self.upscalerModelCard.setVisible(name == "learned")
+
+    def select_upscaler_model(self):
+        """选择学习型放大使用的本地权重 (ESPCN/FSRCNN .pb)"""
+        fname, _ = QFileDialog.getOpenFileName(self, "选择超分模型", "", "TensorFlow PB (*.pb);;All Files (*)")
+        if fname:
+            self.upscalerModelCard.setContent(fname)
+            self.config.upscaler_model_path = fname
+
+    def _set_clip(self, name, value):
+        setattr(self.config, name, value)
+        self._update_clip_hint()
+
+    def _update_clip_hint(self):
+        """显示所选片段的时长与目标帧率下的帧数范围"""
+        start, end = self.config.clip_start, self.config.clip_end
+        if start <= 0 and end <= 0:
+            self.clipHintLabel.setText("处理整段视频")
+            return
+        stop = end if end > start else self.video_duration
+        if self.video_duration > 0:
+            stop = min(stop, self.video_duration)
+        fps = self.config.target_fps
+        if stop <= start:
+            self.clipHintLabel.setText("片段范围无效：结束时间需晚于起始时间 (或为 0)")
+            return
+        self.clipHintLabel.setText(
+            f"片段 {start:.2f}s - {stop:.2f}s，共 {stop - start:.2f}s，"
+            f"约第 {int(start * fps) + 1} - {int(stop * fps)} 帧 ({int((stop - start) * fps)} 帧)")
+
     def check_video_and_emit(self):
         """检查视频路径，如果有效则发射 nextClicked 信号"""
         if self.config.input_video_path and os.path.exists(self.config.input_video_path):
@@ -173,6 +347,16 @@ class Step1Interface(ScrollArea):
                 self.config.target_fps = int(fps) if fps < 24 else 24
                 self.fpsCard.setValue(self.config.target_fps)
 
+                # 新视频：片段范围复位，上限为视频时长
+                frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+                self.video_duration = frame_count / fps if fps > 0 else 0.0
+                if self.video_duration > 0:
+                    self.clipStartCard.spinBox.setMaximum(self.video_duration)
+                    self.clipEndCard.spinBox.setMaximum(self.video_duration)
+                self.clipStartCard.setValue(0.0)
+                self.clipEndCard.setValue(0.0)
+                self._update_clip_hint()
+
             cap.release()
         except Exception:
             pass
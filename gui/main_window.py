@@ -32,4 +32,10 @@ class MainWindow(FluentWindow):
         if not EnvironmentChecker.check_cuda():
             InfoBar.warning('GPU 不可用', '未检测到 CUDA 环境。', parent=self, duration=5000)
         else:
-            InfoBar.success('GPU 就绪', f'已连接至: {EnvironmentChecker.get_cuda_info()}', parent=self)
\ No newline at end of file
+            InfoBar.success('GPU 就绪', f'已连接至: {EnvironmentChecker.get_cuda_info()}', parent=self)
+
+    def closeEvent(self, e):
+        # 退出时关闭独立推理进程 (若已启动)
+        from core.process_worker import InferenceProcess
+        InferenceProcess.instance().shutdown()
+        super().closeEvent(e)
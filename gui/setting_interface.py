@@ -1,7 +1,11 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
 from qfluentwidgets import SubtitleLabel, ScrollArea, FluentIcon as FIF, SettingCard, PrimaryPushSettingCard
-from gui.custom_components import SimpleSwitchSettingCard
+from gui.custom_components import (
+    SimpleSwitchSettingCard, SimpleComboBoxSettingCard, SimpleSpinBoxSettingCard, SimpleLineEditSettingCard,
+    SimpleDoubleSpinBoxSettingCard
+)
 from core.env_checker import EnvironmentChecker
+from core.precision import PRECISIONS
 
 
 class SettingInterface(ScrollArea):
@@ -75,6 +79,53 @@ class SettingInterface(ScrollArea):
         self.xformersCard.checkedChanged.connect(lambda v: setattr(self.config, 'use_xformers', v))
         self.expandLayout.addWidget(self.xformersCard)
 
+        # --- Token Merging (动态检测) ---
+        has_tomesd = EnvironmentChecker.check_tomesd()
+        tome_desc = "合并相似的图像 token 以减少注意力计算量，以部分细节换取速度；比例越高合并越多，画面变化也越大。0 为关闭。"
+        if not has_tomesd:
+            tome_desc += " [当前环境未检测到 tomesd 库，选项已禁用]"
+            self.config.token_merging_ratio = 0.0
+
+        self.tomeCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.token_merging_ratio, 0.0, 0.75, 0.05, FIF.SPEED_MEDIUM,
+            "Token Merging 比例", tome_desc, self.scrollWidget
+        )
+        self.tomeCard.setEnabled(has_tomesd)
+        self.tomeCard.valueChanged.connect(lambda v: setattr(self.config, 'token_merging_ratio', v))
+        self.expandLayout.addWidget(self.tomeCard)
+
+        # --- 跨帧特征复用 ---
+        self.featureReuseCard = SimpleSwitchSettingCard(
+            self.config.feature_reuse, FIF.SYNC, "跨帧特征复用",
+            "相邻帧足够相似时复用上一帧的 UNet 深层特征，只重算浅层块。画面会略有变化，仅用于完整渲染。",
+            self.scrollWidget
+        )
+        self.featureReuseCard.checkedChanged.connect(lambda v: setattr(self.config, 'feature_reuse', v))
+        self.expandLayout.addWidget(self.featureReuseCard)
+
+        self.featureThresholdCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.feature_reuse_threshold, 0.80, 1.0, 0.01, FIF.FILTER,
+            "特征复用相似度阈值", "输入帧与刷新帧的相似度不低于该值时才复用，越高越保守。", self.scrollWidget
+        )
+        self.featureThresholdCard.valueChanged.connect(
+            lambda v: setattr(self.config, 'feature_reuse_threshold', v))
+        self.expandLayout.addWidget(self.featureThresholdCard)
+
+        self.featureRefreshCard = SimpleSpinBoxSettingCard(
+            self.config.feature_reuse_refresh, 1, 32, FIF.UPDATE, "特征刷新间隔 (帧)",
+            "连续复用达到该帧数后强制完整计算一次，避免误差累积。", self.scrollWidget
+        )
+        self.featureRefreshCard.valueChanged.connect(lambda v: setattr(self.config, 'feature_reuse_refresh', v))
+        self.expandLayout.addWidget(self.featureRefreshCard)
+
+        self.featureStepCard = SimpleSpinBoxSettingCard(
+            self.config.feature_reuse_step_interval, 1, 10, FIF.SPEED_HIGH, "帧内完整计算间隔 (步)",
+            "每 N 个去噪步完整计算一次，其余步复用上一步的深层特征 (1 表示关闭)。", self.scrollWidget
+        )
+        self.featureStepCard.valueChanged.connect(
+            lambda v: setattr(self.config, 'feature_reuse_step_interval', v))
+        self.expandLayout.addWidget(self.featureStepCard)
+
         # --- Low VRAM 开关 ---
         self.lowVramCard = SimpleSwitchSettingCard(
             self.config.low_vram, FIF.TILES, "低显存模式 (Low VRAM)",
@@ -83,8 +134,173 @@ class SettingInterface(ScrollArea):
         self.lowVramCard.checkedChanged.connect(lambda v: setattr(self.config, 'low_vram', v))
         self.expandLayout.addWidget(self.lowVramCard)
 
+        # --- CPU 推理精度 ---
+        self.precisionCard = SimpleComboBoxSettingCard(
+            self.config.inference_precision, PRECISIONS, FIF.DEVELOPER_TOOLS, "CPU 推理精度",
+            "仅在没有可用 GPU 时生效 | bf16：需要 CPU 支持 AVX512-BF16/AMX | int8：首次加载时量化并缓存，之后秒开",
+            self.scrollWidget
+        )
+        self.precisionCard.valueChanged.connect(lambda v: setattr(self.config, 'inference_precision', v))
+        self.expandLayout.addWidget(self.precisionCard)
+
+        # --- VAE 解码 ---
+        self.vaeOverlapCard = SimpleSwitchSettingCard(
+            self.config.vae_decode_overlap, FIF.SPEED_HIGH, "VAE 解码与去噪重叠",
+            "渲染时完整 VAE 解码在后台进行，同时开始下一帧的去噪 (仅 GPU，结果不变)。", self.scrollWidget
+        )
+        self.vaeOverlapCard.checkedChanged.connect(lambda v: setattr(self.config, 'vae_decode_overlap', v))
+        self.expandLayout.addWidget(self.vaeOverlapCard)
+
+        # --- 显存策略 (注意力切片 / VAE 切片 / VAE 分块) ---
+        self.memoryPolicyCard = SimpleComboBoxSettingCard(
+            self.config.memory_policy, [("auto", "自动 (按显存选择)"), ("manual", "手动")],
+            FIF.SPEED_HIGH, "显存策略",
+            "自动：每次生成前按可用显存、分辨率与批大小选择能放下的最快组合 | 手动：使用下面三个开关。",
+            self.scrollWidget
+        )
+        self.memoryPolicyCard.valueChanged.connect(self._on_memory_policy_changed)
+        self.expandLayout.addWidget(self.memoryPolicyCard)
+
+        self.attentionSlicingCard = SimpleSwitchSettingCard(
+            self.config.attention_slicing, FIF.ALIGNMENT, "注意力切片",
+            "分块计算注意力，显存峰值最低但明显变慢 (开启后 xFormers 不生效)。", self.scrollWidget
+        )
+        self.attentionSlicingCard.checkedChanged.connect(lambda v: setattr(self.config, 'attention_slicing', v))
+        self.expandLayout.addWidget(self.attentionSlicingCard)
+
+        self.vaeSlicingCard = SimpleSwitchSettingCard(
+            self.config.vae_slicing, FIF.ALIGNMENT, "VAE 切片解码",
+            "批量生成 (如参数扫描) 时逐张解码，降低显存峰值。", self.scrollWidget
+        )
+        self.vaeSlicingCard.checkedChanged.connect(lambda v: setattr(self.config, 'vae_slicing', v))
+        self.expandLayout.addWidget(self.vaeSlicingCard)
+
+        self.vaeTilingCard = SimpleSwitchSettingCard(
+            self.config.vae_tiling, FIF.TILES, "VAE 分块解码",
+            "大分辨率帧分块解码，显存占用与分辨率基本无关。", self.scrollWidget
+        )
+        self.vaeTilingCard.checkedChanged.connect(lambda v: setattr(self.config, 'vae_tiling', v))
+        self.expandLayout.addWidget(self.vaeTilingCard)
+        self._on_memory_policy_changed(self.config.memory_policy)
+
+        self.liveDecoderCard = SimpleComboBoxSettingCard(
+            self.config.live_preview_decoder,
+            [("full", "完整 VAE"), ("tiny", "近似解码器 (TAESD)"), ("off", "不显示")],
+            FIF.VIEW, "实时预览解码器",
+            "渲染时界面预览使用的解码器；近似解码器在去噪结束后立即显示，最终视频始终使用完整 VAE。",
+            self.scrollWidget
+        )
+        self.liveDecoderCard.valueChanged.connect(lambda v: setattr(self.config, 'live_preview_decoder', v))
+        self.expandLayout.addWidget(self.liveDecoderCard)
+
+        self.previewDecoderCard = SimpleComboBoxSettingCard(
+            self.config.preview_decoder,
+            [("full", "完整 VAE"), ("tiny", "近似解码器 (TAESD)")],
+            FIF.PHOTO, "快速预览解码器", "快速预览任务使用的解码器；近似解码器更快，画面略糊。", self.scrollWidget
+        )
+        self.previewDecoderCard.valueChanged.connect(lambda v: setattr(self.config, 'preview_decoder', v))
+        self.expandLayout.addWidget(self.previewDecoderCard)
+
+        # --- 执行方式 ---
+        self.executionCard = SimpleComboBoxSettingCard(
+            self.config.execution_mode,
+            [("process", "独立推理进程"), ("thread", "后台线程"), ("daemon", "本地推理服务")],
+            FIF.APPLICATION, "推理执行方式",
+            "独立进程 (默认)：界面不卡顿，崩溃可自动恢复 | 后台线程：与界面同进程 | 本地服务：与命令行共享已加载的模型 (需先运行 cli.py serve)",
+            self.scrollWidget
+        )
+        self.executionCard.valueChanged.connect(lambda v: setattr(self.config, 'execution_mode', v))
+        self.expandLayout.addWidget(self.executionCard)
+
+        # --- 中间帧存储 ---
+        self.frameStoreCard = SimpleComboBoxSettingCard(
+            self.config.frame_store,
+            [("memmap", "内存映射文件"), ("ram", "内存优先 (超出后换出)"),
+             ("chunked", "分块压缩文件"), ("jpeg", "JPEG 图片序列")],
+            FIF.SAVE, "中间帧存储格式",
+            "内存映射：最快，占用磁盘较多 | 内存优先：不写输出盘 | 分块压缩：节省磁盘 | JPEG：便于查看每一帧",
+            self.scrollWidget
+        )
+        self.frameStoreCard.valueChanged.connect(lambda v: setattr(self.config, 'frame_store', v))
+        self.expandLayout.addWidget(self.frameStoreCard)
+
+        self.ramBudgetCard = SimpleSpinBoxSettingCard(
+            self.config.ram_budget_mb, 256, 65536, FIF.TILES, "内存帧预算 (MB)",
+            "“内存优先”模式下所有中间帧共享的内存上限，超出部分换出到系统临时目录。", self.scrollWidget
+        )
+        self.ramBudgetCard.valueChanged.connect(lambda v: setattr(self.config, 'ram_budget_mb', v))
+        self.expandLayout.addWidget(self.ramBudgetCard)
+
+        self.spillDirCard = SimpleLineEditSettingCard(
+            self.config.spill_dir, "留空使用系统临时目录", FIF.FOLDER, "换出目录",
+            "建议选择本地 SSD 上的目录，避免中间帧写入较慢的外置硬盘。", self.scrollWidget
+        )
+        self.spillDirCard.textChanged.connect(lambda v: setattr(self.config, 'spill_dir', v.strip()))
+        self.expandLayout.addWidget(self.spillDirCard)
+
+        self.preflightCard = SimpleSwitchSettingCard(
+            self.config.disk_preflight, FIF.CHECKBOX, "渲染前检查磁盘空间",
+            "按视频时长、帧率与分辨率估算所需空间，不足时拒绝开始。", self.scrollWidget
+        )
+        self.preflightCard.checkedChanged.connect(lambda v: setattr(self.config, 'disk_preflight', v))
+        self.expandLayout.addWidget(self.preflightCard)
+
+        self.profileCard = SimpleSwitchSettingCard(
+            self.config.profile_frames, FIF.STOP_WATCH, "逐帧耗时分析",
+            "渲染结束后在日志中输出每帧 UNet 之外各环节的平均耗时 (会略微降低速度)。", self.scrollWidget
+        )
+        self.profileCard.checkedChanged.connect(lambda v: setattr(self.config, 'profile_frames', v))
+        self.expandLayout.addWidget(self.profileCard)
+
+        # --- 生成结果缓存 ---
+        self.resultCacheCard = SimpleSwitchSettingCard(
+            self.config.result_cache, FIF.HISTORY, "生成结果缓存",
+            "默认关闭。输入帧与模型/提示词/种子/步数/CFG/重绘幅度都未变化的帧直接复用，重新渲染或崩溃后重跑无需重算 (占用用户缓存目录的磁盘空间)。",
+            self.scrollWidget
+        )
+        self.resultCacheCard.checkedChanged.connect(lambda v: setattr(self.config, 'result_cache', v))
+        self.expandLayout.addWidget(self.resultCacheCard)
+
+        self.resultCacheSizeCard = SimpleSpinBoxSettingCard(
+            self.config.result_cache_mb, 256, 262144, FIF.ZIP_FOLDER, "生成结果缓存上限 (MB)",
+            "超出后淘汰最久未使用的帧。", self.scrollWidget
+        )
+        self.resultCacheSizeCard.valueChanged.connect(lambda v: setattr(self.config, 'result_cache_mb', v))
+        self.expandLayout.addWidget(self.resultCacheSizeCard)
+
+        self.clearCacheCard = PrimaryPushSettingCard(
+            "清空", FIF.DELETE, "清空生成结果缓存", "删除所有已缓存的生成帧。", self.scrollWidget
+        )
+        self.clearCacheCard.clicked.connect(self._clear_result_cache)
+        self.expandLayout.addWidget(self.clearCacheCard)
+
+        self.restartProcessCard = PrimaryPushSettingCard(
+            "重启", FIF.SYNC, "重启推理进程",
+            "释放推理进程占用的显存/内存，或在其异常后恢复。", self.scrollWidget
+        )
+        self.restartProcessCard.clicked.connect(self._restart_inference_process)
+        self.expandLayout.addWidget(self.restartProcessCard)
+
         self.expandLayout.addSpacing(20)
         self.expandLayout.addWidget(QLabel("注：以上设置将在下一次任务开始时生效。", self.scrollWidget))
         self.expandLayout.addStretch(1)
         self.setWidget(self.scrollWidget)
-        self.setWidgetResizable(True)
\ No newline at end of file
+        self.setWidgetResizable(True)
+
+    def _on_memory_policy_changed(self, policy):
+        """自动模式下三个手动开关不生效，置灰"""
+        self.config.memory_policy = policy
+        for card in (self.attentionSlicingCard, self.vaeSlicingCard, self.vaeTilingCard):
+            card.setEnabled(policy == "manual")
+
+    def _restart_inference_process(self):
+        """重启独立推理进程 (无需重启应用)"""
+        from core.process_worker import InferenceProcess
+        InferenceProcess.instance().restart()
+
+    def _clear_result_cache(self):
+        """清空生成结果缓存"""
+        from core.result_cache import FrameResultCache
+        cache = FrameResultCache(self.config.result_cache_dir or None, self.config.result_cache_mb * 1024 * 1024)
+        cache.clear()
+        self.clearCacheCard.setContent("缓存已清空。")
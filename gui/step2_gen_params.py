@@ -9,8 +9,12 @@ from qfluentwidgets import (
 from gui.custom_components import (
     SimpleSpinBoxSettingCard,
     SimpleDoubleSpinBoxSettingCard,
-    SimpleLineEditSettingCard
+    SimpleLineEditSettingCard,
+    SimpleComboBoxSettingCard,
+    SimpleSwitchSettingCard
 )
+from core.config import GenerationConfig
+from core.schedulers import SchedulerRegistry
 
 
 class Step2Interface(ScrollArea):
@@ -19,6 +23,7 @@ class Step2Interface(ScrollArea):
     """
     nextClicked = pyqtSignal()
     prevClicked = pyqtSignal()
+    presetApplied = pyqtSignal()  # 预设可能修改步骤 1 的字段 (帧率/宽度/骨骼开关)
 
     def __init__(self, config, parent=None):
         super().__init__(parent=parent)
@@ -30,8 +35,9 @@ class Step2Interface(ScrollArea):
         self.setWidget(self.scrollWidget)
         self.setWidgetResizable(True)
 
-        # 初始设置重绘幅度卡的可见性
+        # 初始设置重绘幅度卡、蒸馏权重卡的可见性
         self._on_pose_switch_changed(self.config.enable_pose)
+        self.distillCard.setVisible(SchedulerRegistry.spec(self.config.scheduler)["distilled"])
 
     def _init_ui(self):
         self.vBoxLayout.setSpacing(15)
@@ -82,6 +88,14 @@ class Step2Interface(ScrollArea):
         # 3. 核心参数
         # ==================================================
 
+        # 预设 (configs/presets/*.json)
+        self.presetCard = SimpleComboBoxSettingCard(
+            "", [("", "自定义")] + [(name, name) for name in GenerationConfig.list_presets()],
+            FIF.BOOK_SHELF, "参数预设", "加载 configs/presets 中保存的一组生成参数", self.scrollWidget
+        )
+        self.presetCard.valueChanged.connect(self._apply_preset)
+        self.vBoxLayout.addWidget(self.presetCard)
+
         # 重绘幅度 (条件显示)
         self.strengthCard = SimpleDoubleSpinBoxSettingCard(
             self.config.denoising_strength, 0.0, 1.0, 0.05, FIF.BRUSH,
@@ -90,6 +104,58 @@ class Step2Interface(ScrollArea):
         self.strengthCard.valueChanged.connect(lambda v: setattr(self.config, 'denoising_strength', v))
         self.vBoxLayout.addWidget(self.strengthCard)
 
+        # 链式图生图 (条件显示)：从上一帧结果与当前帧的混合开始，以更低的重绘幅度去噪
+        self.chainCard = SimpleSwitchSettingCard(
+            self.config.img2img_chain, FIF.LINK, "链式图生图",
+            "每帧从上一帧结果 (光流对齐) 与原图的混合开始，步数大幅减少、风格更稳定", self.scrollWidget
+        )
+        self.chainCard.checkedChanged.connect(self._on_chain_changed)
+        self.vBoxLayout.addWidget(self.chainCard)
+
+        self.chainWidget = QWidget(self.scrollWidget)
+        chainLayout = QHBoxLayout(self.chainWidget)
+        chainLayout.setContentsMargins(0, 0, 0, 0)
+        chainLayout.setSpacing(15)
+
+        self.chainStrengthCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.chain_strength, 0.05, 1.0, 0.05, FIF.BRUSH,
+            "链式重绘幅度", "非关键帧使用", self.chainWidget
+        )
+        self.chainStrengthCard.valueChanged.connect(lambda v: setattr(self.config, 'chain_strength', v))
+
+        self.chainBlendCard = SimpleDoubleSpinBoxSettingCard(
+            self.config.chain_blend, 0.0, 1.0, 0.05, FIF.TRANSPARENT,
+            "上一帧权重", "混合起点中上一帧结果的比例", self.chainWidget
+        )
+        self.chainBlendCard.valueChanged.connect(lambda v: setattr(self.config, 'chain_blend', v))
+
+        self.chainKeyCard = SimpleSpinBoxSettingCard(
+            self.config.chain_keyframe_interval, 1, 120, FIF.PIN,
+            "关键帧间隔", "每隔若干帧完整重绘一次", self.chainWidget
+        )
+        self.chainKeyCard.valueChanged.connect(lambda v: setattr(self.config, 'chain_keyframe_interval', v))
+
+        chainLayout.addWidget(self.chainStrengthCard)
+        chainLayout.addWidget(self.chainBlendCard)
+        chainLayout.addWidget(self.chainKeyCard)
+        self.vBoxLayout.addWidget(self.chainWidget)
+
+        # 采样器 (切换时按采样器推荐值设置步数与 CFG)
+        self.schedulerCard = SimpleComboBoxSettingCard(
+            self.config.scheduler, SchedulerRegistry.options(), FIF.ROBOT,
+            "采样器", "带 * 的为少步蒸馏采样器，需要本地蒸馏权重", self.scrollWidget
+        )
+        self.schedulerCard.valueChanged.connect(self._on_scheduler_changed)
+        self.vBoxLayout.addWidget(self.schedulerCard)
+
+        self.distillCard = PushSettingCard(
+            "选择文件", FIF.FOLDER, "蒸馏权重 (LoRA)",
+            self.config.distill_lora_path if self.config.distill_lora_path else "例如 LCM-LoRA 的 .safetensors 文件",
+            self.scrollWidget
+        )
+        self.distillCard.clicked.connect(self.select_distill_weights)
+        self.vBoxLayout.addWidget(self.distillCard)
+
         # 步数 和 CFG Scale
         genLayout = QHBoxLayout()
         genLayout.setSpacing(15)
@@ -120,10 +186,65 @@ class Step2Interface(ScrollArea):
         )
         self.vBoxLayout.addWidget(self.seedCard)
 
+        self.vBoxLayout.addSpacing(10)
+
+        # ==================================================
+        # 4. 参数扫描 (可选，在步骤 3 中运行)
+        # ==================================================
+        self.vBoxLayout.addWidget(CaptionLabel("参数扫描 (留空则使用上方的单值参数，支持 1,2,3 或 10-30:5 写法)", self.scrollWidget))
+
+        self.sweepSeedCard = SimpleLineEditSettingCard(
+            self.config.sweep_seeds, "例如 1-4", FIF.EDIT,
+            "扫描种子", "多个种子对比画面差异", self.scrollWidget
+        )
+        self.sweepSeedCard.textChanged.connect(lambda t: setattr(self.config, 'sweep_seeds', t))
+        self.vBoxLayout.addWidget(self.sweepSeedCard)
+
+        sweepLayout = QHBoxLayout()
+        sweepLayout.setSpacing(15)
+
+        self.sweepCfgCard = SimpleLineEditSettingCard(
+            self.config.sweep_cfg, "例如 5-9:2", FIF.PALETTE,
+            "扫描 CFG", None, self.scrollWidget
+        )
+        self.sweepCfgCard.textChanged.connect(lambda t: setattr(self.config, 'sweep_cfg', t))
+
+        self.sweepStepsCard = SimpleLineEditSettingCard(
+            self.config.sweep_steps, "例如 10,20,30", FIF.SYNC,
+            "扫描步数", None, self.scrollWidget
+        )
+        self.sweepStepsCard.textChanged.connect(lambda t: setattr(self.config, 'sweep_steps', t))
+
+        sweepLayout.addWidget(self.sweepCfgCard)
+        sweepLayout.addWidget(self.sweepStepsCard)
+        self.vBoxLayout.addLayout(sweepLayout)
+
+        self.sweepStrengthCard = SimpleLineEditSettingCard(
+            self.config.sweep_strength, "例如 0.4-0.8:0.2", FIF.BRUSH,
+            "扫描重绘幅度", "仅 Img2Img 模式生效", self.scrollWidget
+        )
+        self.sweepStrengthCard.textChanged.connect(lambda t: setattr(self.config, 'sweep_strength', t))
+        self.vBoxLayout.addWidget(self.sweepStrengthCard)
+
+        self.vBoxLayout.addWidget(BodyLabel("扫描提示词 - 每行一个，留空则使用正向提示词", self.scrollWidget))
+        self.sweepPromptEdit = TextEdit(self.scrollWidget)
+        self.sweepPromptEdit.setText(self.config.sweep_prompts)
+        self.sweepPromptEdit.setFixedHeight(70)
+        self.sweepPromptEdit.textChanged.connect(
+            lambda: setattr(self.config, 'sweep_prompts', self.sweepPromptEdit.toPlainText()))
+        self.vBoxLayout.addWidget(self.sweepPromptEdit)
+
+        self.sweepFramesCard = SimpleSpinBoxSettingCard(
+            self.config.sweep_frames, 1, 8, FIF.ALBUM,
+            "扫描帧数", "固定抽样帧数量，越少越快", self.scrollWidget
+        )
+        self.sweepFramesCard.valueChanged.connect(lambda v: setattr(self.config, 'sweep_frames', v))
+        self.vBoxLayout.addWidget(self.sweepFramesCard)
+
         self.vBoxLayout.addStretch(1)
 
         # ==================================================
-        # 4. 底部导航
+        # 5. 底部导航
         # ==================================================
         navLayout = QHBoxLayout()
         self.prevBtn = PushButton("上一步", self.scrollWidget)
@@ -148,6 +269,57 @@ class Step2Interface(ScrollArea):
             self.modelCard.setContent(fname)
             self.config.model_path = fname
 
+    def select_distill_weights(self):
+        """选择少步蒸馏采样器使用的 LoRA 权重"""
+        fname, _ = QFileDialog.getOpenFileName(self, "选择蒸馏权重", "", "Safetensors (*.safetensors);;All Files (*)")
+        if fname:
+            self.distillCard.setContent(fname)
+            self.config.distill_lora_path = fname
+
+    def _on_scheduler_changed(self, name):
+        """切换采样器：步数/CFG 改为该采样器的推荐值 (加载预设时配置已是该值，保持预设中的步数)"""
+        if name == self.config.scheduler:
+            return
+        self.config.scheduler = name
+        spec = SchedulerRegistry.spec(name)
+        self.stepsCard.setValue(spec["steps"])
+        self.config.steps = spec["steps"]
+        if spec["cfg"] is not None:
+            self.cfgCard.setValue(spec["cfg"])
+            self.config.cfg_scale = spec["cfg"]
+        self.distillCard.setVisible(spec["distilled"])
+
+    def _apply_preset(self, name):
+        """加载预设并刷新界面"""
+        if not name:
+            return
+        self.config.apply_preset(name)
+        self.sync_from_config()
+        self.presetApplied.emit()
+
+    def sync_from_config(self):
+        """用当前配置刷新本页控件 (加载预设后调用)"""
+        self.promptEdit.setText(self.config.prompt)
+        self.negativePromptEdit.setText(self.config.negative_prompt)
+        self.strengthCard.setValue(self.config.denoising_strength)
+        self.chainCard.switchButton.setChecked(self.config.img2img_chain)
+        self.chainStrengthCard.setValue(self.config.chain_strength)
+        self.chainBlendCard.setValue(self.config.chain_blend)
+        self.chainKeyCard.setValue(self.config.chain_keyframe_interval)
+        self.stepsCard.setValue(self.config.steps)
+        self.cfgCard.setValue(self.config.cfg_scale)
+        self.schedulerCard.setValue(self.config.scheduler)
+        self.distillCard.setVisible(SchedulerRegistry.spec(self.config.scheduler)["distilled"])
+        self.seedCard.setText(str(self.config.seed))
+        self._on_pose_switch_changed(self.config.enable_pose)
+
     def _on_pose_switch_changed(self, is_checked):
         """根据骨骼开关状态更新重绘幅度卡的可见性"""
-        self.strengthCard.setVisible(not is_checked)
\ No newline at end of file
+        self.strengthCard.setVisible(not is_checked)
+        self.sweepStrengthCard.setVisible(not is_checked)
+        self.chainCard.setVisible(not is_checked)
+        self.chainWidget.setVisible(not is_checked and self.config.img2img_chain)
+
+    def _on_chain_changed(self, is_checked):
+        self.config.img2img_chain = is_checked
+        self.chainWidget.setVisible(is_checked and not self.config.enable_pose)
\ No newline at end of file
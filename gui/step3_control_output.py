@@ -1,13 +1,17 @@
 import os
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog, QLabel
 from qfluentwidgets import (
     SubtitleLabel, PrimaryPushButton, PushButton, ProgressBar,
     InfoBar, InfoBarPosition, BodyLabel, FluentIcon as FIF,
     ScrollArea, PushSettingCard
 )
 
-from core.worker import AIWorker
+from core.worker import create_worker
+from core.cost_model import estimate_render
+from gui.custom_components import SimpleSpinBoxSettingCard, SimpleSwitchSettingCard
+from gui.event_loop_monitor import EventLoopMonitor
 
 
 class Step3Interface(ScrollArea):
@@ -30,6 +34,8 @@ class Step3Interface(ScrollArea):
 
         # 保持 worker 的引用，防止被垃圾回收
         self.worker = None
+        # 任务运行期间测量界面事件循环延迟
+        self.loopMonitor = EventLoopMonitor(parent=self)
 
     def _init_ui(self):
         self.vBoxLayout.setSpacing(15)
@@ -53,7 +59,62 @@ class Step3Interface(ScrollArea):
         self.vBoxLayout.addSpacing(20)
 
         # ==================================================
-        # 2. 控制区
+        # 2. 快速预览 (抽样帧 + 低步数)
+        # ==================================================
+        previewLayout = QHBoxLayout()
+        previewLayout.setSpacing(15)
+
+        self.previewFramesCard = SimpleSpinBoxSettingCard(
+            self.config.preview_frames, 1, 16, FIF.ALBUM,
+            "预览帧数", "抽取的代表帧数量", self.scrollWidget
+        )
+        self.previewFramesCard.valueChanged.connect(lambda v: setattr(self.config, 'preview_frames', v))
+
+        self.previewStepsCard = SimpleSpinBoxSettingCard(
+            self.config.preview_steps, 1, 50, FIF.SYNC,
+            "预览步数", "建议 6-10", self.scrollWidget
+        )
+        self.previewStepsCard.valueChanged.connect(lambda v: setattr(self.config, 'preview_steps', v))
+
+        previewLayout.addWidget(self.previewFramesCard)
+        previewLayout.addWidget(self.previewStepsCard)
+        self.vBoxLayout.addLayout(previewLayout)
+
+        self.sceneSampleCard = SimpleSwitchSettingCard(
+            self.config.preview_sampling == "scene", FIF.MOVIE,
+            "按镜头切换抽帧",
+            "开启：优先抽取镜头切换处的帧 | 关闭：均匀抽帧",
+            self.scrollWidget
+        )
+        self.sceneSampleCard.checkedChanged.connect(
+            lambda v: setattr(self.config, 'preview_sampling', "scene" if v else "uniform"))
+        self.vBoxLayout.addWidget(self.sceneSampleCard)
+
+        # 预览网格图
+        self.previewLabel = QLabel(self.scrollWidget)
+        self.previewLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.previewLabel.setVisible(False)
+        self.vBoxLayout.addWidget(self.previewLabel)
+
+        self.vBoxLayout.addSpacing(20)
+
+        # ==================================================
+        # 3. 开始前预估 (帧数 / 各阶段耗时 / 显存峰值 / 磁盘占用)
+        # ==================================================
+        estimateLayout = QHBoxLayout()
+        estimateLayout.setSpacing(15)
+        self.estimateLabel = BodyLabel("", self.scrollWidget)
+        self.estimateLabel.setWordWrap(True)
+        self.estimateBtn = PushButton("重新估算", self.scrollWidget)
+        self.estimateBtn.clicked.connect(self.refresh_estimate)
+        estimateLayout.addWidget(self.estimateLabel, 1)
+        estimateLayout.addWidget(self.estimateBtn, 0, Qt.AlignmentFlag.AlignTop)
+        self.vBoxLayout.addLayout(estimateLayout)
+
+        self.vBoxLayout.addSpacing(20)
+
+        # ==================================================
+        # 4. 控制区
         # ==================================================
         self.progressBar = ProgressBar(self.scrollWidget)
         self.statusLabel = BodyLabel("准备就绪", self.scrollWidget)
@@ -63,6 +124,12 @@ class Step3Interface(ScrollArea):
         buttonLayout = QHBoxLayout()
         buttonLayout.setSpacing(20)
 
+        self.previewBtn = PushButton("快速预览", self.scrollWidget)
+        self.previewBtn.clicked.connect(self.start_preview)
+
+        self.sweepBtn = PushButton("运行参数扫描", self.scrollWidget)
+        self.sweepBtn.clicked.connect(self.start_sweep)
+
         self.startBtn = PrimaryPushButton("开始生成处理", self.scrollWidget)
         self.startBtn.clicked.connect(self.start_processing)
 
@@ -70,8 +137,16 @@ class Step3Interface(ScrollArea):
         self.stopBtn.setEnabled(False)  # 默认不可用
         self.stopBtn.clicked.connect(self.stop_processing)
 
+        # 停止并合成：中止后将已生成的帧合成为部分视频
+        self.finalizeBtn = PushButton("停止并合成", self.scrollWidget)
+        self.finalizeBtn.setEnabled(False)
+        self.finalizeBtn.clicked.connect(lambda: self.stop_processing(finalize=True))
+
+        buttonLayout.addWidget(self.previewBtn)
+        buttonLayout.addWidget(self.sweepBtn)
         buttonLayout.addWidget(self.startBtn)
         buttonLayout.addWidget(self.stopBtn)
+        buttonLayout.addWidget(self.finalizeBtn)
 
         self.vBoxLayout.addWidget(self.statusLabel)
         self.vBoxLayout.addWidget(self.progressBar)
@@ -80,7 +155,7 @@ class Step3Interface(ScrollArea):
         self.vBoxLayout.addStretch(1)
 
         # ==================================================
-        # 3. 底部导航
+        # 5. 底部导航
         # ==================================================
         navLayout = QHBoxLayout()
         self.prevBtn = PushButton("上一步", self.scrollWidget)
@@ -94,12 +169,83 @@ class Step3Interface(ScrollArea):
     # --------------------------------------------------
     # 逻辑部分
     # --------------------------------------------------
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 每次进入本页时按最新的步骤 1/2 参数重新估算
+        if self.worker is None or not self.worker.isRunning():
+            self.refresh_estimate()
+
+    def refresh_estimate(self):
+        """按探测到的视频信息、当前配置与本机吞吐历史估算完整渲染的开销"""
+        try:
+            estimate = estimate_render(self.config)
+        except ValueError as e:
+            self.estimateLabel.setText(f"预估: {e}")
+            return
+        self.estimateLabel.setText("预估: " + "\n".join(estimate.lines()))
+
     def select_output_dir(self):
         """选择输出目录"""
         dir_path = QFileDialog.getExistingDirectory(self, "选择最终输出目录", self.config.output_dir)
         if dir_path:
             self.config.output_dir = dir_path
             self.outputDirCard.setContent(f"当前: {os.path.abspath(dir_path)}")
+            self.refresh_estimate()  # 骨骼缓存与磁盘占用随输出目录变化
+
+    def start_preview(self):
+        """启动快速预览任务"""
+        self._start_trial_job("preview")
+
+    def start_sweep(self):
+        """启动参数扫描任务"""
+        self._start_trial_job("sweep")
+
+    def _start_trial_job(self, job_type):
+        """运行预览/扫描类任务：结果以图片显示在本页，结束后不返回欢迎页"""
+        if not self.config.input_video_path or not os.path.exists(self.config.input_video_path):
+            self._msg("提示", "未检测到有效的视频文件，请返回步骤 1 选择。", True)
+            return
+
+        self.previewBtn.setEnabled(False)
+        self.sweepBtn.setEnabled(False)
+        self.startBtn.setEnabled(False)
+        self.stopBtn.setEnabled(True)
+
+        self.worker = create_worker(self.config, job_type)
+        self.worker.progress_signal.connect(lambda v, t: (self.progressBar.setValue(v), self.statusLabel.setText(t)))
+        self.worker.preview_signal.connect(self._show_preview)
+        self.worker.error_signal.connect(lambda e: (self.statusLabel.setText("错误"), self._msg("失败", e, True)))
+        self.worker.finished.connect(self._on_preview_finished)
+        self.loopMonitor.start()
+        self.worker.start()
+
+    def _show_preview(self, grid_path):
+        """显示预览网格图 / 参数扫描对比图"""
+        pixmap = QPixmap(grid_path)
+        if pixmap.isNull():
+            return
+        self.previewLabel.setPixmap(pixmap.scaledToWidth(
+            min(pixmap.width(), 900), Qt.TransformationMode.SmoothTransformation))
+        self.previewLabel.setVisible(True)
+
+    def _show_frame(self, image):
+        """显示渲染过程中的实时预览帧"""
+        pixmap = QPixmap.fromImage(image)
+        self.previewLabel.setPixmap(pixmap.scaledToWidth(
+            min(pixmap.width(), 512), Qt.TransformationMode.SmoothTransformation))
+        self.previewLabel.setVisible(True)
+
+    def _report_loop_latency(self):
+        self.loopMonitor.stop()
+        print(f">> {self.loopMonitor.summary()}")
+
+    def _on_preview_finished(self):
+        """预览结束后恢复按钮状态 (不返回欢迎页，便于继续调参)"""
+        self._report_loop_latency()
+        self.previewBtn.setEnabled(True)
+        self.sweepBtn.setEnabled(True)
+        self.startBtn.setEnabled(True)
+        self.stopBtn.setEnabled(False)
 
     def start_processing(self):
         """启动 AI 任务"""
@@ -108,15 +254,19 @@ class Step3Interface(ScrollArea):
             return
 
         # 切换按钮状态
+        self.previewBtn.setEnabled(False)
+        self.sweepBtn.setEnabled(False)
         self.startBtn.setEnabled(False)
         self.startBtn.setText("处理中...")
         self.stopBtn.setEnabled(True)
+        self.finalizeBtn.setEnabled(True)
 
-        # 初始化 Worker
-        self.worker = AIWorker(self.config)
+        # 初始化 Worker (按设置在后台线程或独立推理进程中运行)
+        self.worker = create_worker(self.config)
 
         # 绑定信号
         self.worker.progress_signal.connect(lambda v, t: (self.progressBar.setValue(v), self.statusLabel.setText(t)))
+        self.worker.frame_signal.connect(self._show_frame)
 
         # 1. 正常完成的信号 (显示成功消息)
         self.worker.finished_signal.connect(lambda: self._msg("完成", "处理结束", False))
@@ -127,26 +277,35 @@ class Step3Interface(ScrollArea):
         # 3. 线程结束信号 (无论是完成、停止还是报错，都会触发，用于重置 UI)
         self.worker.finished.connect(self._on_worker_finished)
 
+        self.loopMonitor.start()
         self.worker.start()
 
-    def stop_processing(self):
-        """用户点击停止按钮"""
+    def stop_processing(self, finalize=False):
+        """用户点击停止按钮 (finalize=True 时合成已生成的部分)"""
         if self.worker and self.worker.isRunning():
             self.statusLabel.setText("正在中止任务，请稍候...")
             self.stopBtn.setEnabled(False)
-            self.worker.stop()
+            self.finalizeBtn.setEnabled(False)
+            self.worker.stop(finalize)
 
     def _on_worker_finished(self):
         """
         线程结束后的清理工作，并发送重置信号。
         """
+        self._report_loop_latency()
+        self.previewBtn.setEnabled(True)
+        self.sweepBtn.setEnabled(True)
         self.startBtn.setEnabled(True)
         self.startBtn.setText("开始生成处理")
         self.stopBtn.setEnabled(False)
+        self.finalizeBtn.setEnabled(False)
 
         # 检查是否是用户手动停止
-        if "中止" in self.statusLabel.text():
-            self.statusLabel.setText("任务已中止")
+        if "部分视频" in self.statusLabel.text():
+            pass  # 已中止但合成了部分视频，保留状态文本
+        elif "中止" in self.statusLabel.text():
+            if "停止耗时" not in self.statusLabel.text():
+                self.statusLabel.setText("任务已中止")
             self.progressBar.setValue(0)
         elif self.progressBar.value() == 100:
             self.statusLabel.setText("处理完成")
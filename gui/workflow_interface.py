@@ -109,6 +109,7 @@ class WorkflowInterface(QWidget):
 
         # 此外，监听 Step1 的 Pose Switch 变化，同步到 Step2
         self.step1Interface.poseSwitch.checkedChanged.connect(self._sync_pose_switch)
+        self.step2Interface.presetApplied.connect(self.step1Interface.sync_from_config)
 
         # 禁用列表导航，强制用户使用按钮
         self.stepList.itemClicked.connect(self._disable_list_click)
@@ -1,6 +1,7 @@
 import sys
 import os
 import platform
+import multiprocessing
 import warnings
 import torch #提前加载torch以避免出现dll错误
 
@@ -19,6 +20,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from gui import MainWindow
 
 if __name__ == "__main__":
+    # 打包后的程序启动推理子进程时需要
+    multiprocessing.freeze_support()
+
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubPipeline:
+    """桩管线：不加载任何模型，把输入图像反相后返回，用于端到端测试任务流程"""
+
+    def __init__(self, config=None):
+        self.calls = 0
+
+    def __call__(self, image=None, callback_on_step_end=None, **kwargs):
+        from PIL import ImageOps
+
+        self.calls += 1
+        images = image if isinstance(image, list) else [image]
+        return type("Output", (), {"images": [ImageOps.invert(img.convert("RGB")) for img in images]})()
+
+
+class FakeEncoder:
+    """代替 ffmpeg 的编码器：记录写入的帧，close 时写出占位文件"""
+
+    def __init__(self, out_path, fps):
+        self.out_path = out_path
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame.copy())
+
+    @property
+    def is_open(self):
+        return True
+
+    def close(self):
+        with open(self.out_path, "wb") as f:
+            f.write(b"\0" * 16)
+
+    def abort(self):
+        pass
+
+
+@pytest.fixture
+def user_cache(tmp_path, monkeypatch):
+    """把用户级缓存目录 (结果缓存、吞吐历史等) 重定向到临时目录"""
+    cache = tmp_path / "user_cache"
+    monkeypatch.setenv("LOCALAPPDATA", str(cache))
+    return cache
+
+
+@pytest.fixture
+def fake_video(tmp_path, monkeypatch):
+    """
+    不依赖 ffmpeg 的测试片段：替换 core.jobs 中的视频探测、拆帧与编码。
+    返回 (视频路径, 源尺寸, 帧数)
+    """
+    import core.jobs
+
+    src_size = (96, 64)
+    frame_count = 6
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"")
+
+    def decode_frames(path, fps, width, height, *args, **kwargs):
+        for i in range(frame_count):
+            frame = np.zeros((height, width, 3), dtype=np.uint8)
+            frame[:, :, 0] = i * 20
+            frame[:, : width // 2, 1] = 200
+            yield frame
+
+    monkeypatch.setattr(core.jobs, "probe_video_size", lambda path: src_size)
+    monkeypatch.setattr(core.jobs, "estimate_frame_count", lambda *args: frame_count)
+    monkeypatch.setattr(core.jobs, "decode_frames", decode_frames)
+    monkeypatch.setattr(core.jobs, "FrameEncoder", FakeEncoder)
+    return str(video), src_size, frame_count
+
+
+class StubPoseBackend:
+    """桩姿态检测后端：返回输入帧的灰度图，统计检测次数"""
+
+    supports_keypoints = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frame):
+        self.calls += 1
+        gray = frame.mean(axis=2, keepdims=True).astype(np.uint8)
+        return np.repeat(gray, 3, axis=2)
+
+    def close(self):
+        pass
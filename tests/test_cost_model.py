@@ -0,0 +1,43 @@
+import pytest
+
+import core.cost_model
+from core.config import GenerationConfig
+from core.cost_model import ThroughputHistory, estimate_render
+
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"")
+    monkeypatch.setattr(core.cost_model, "probe_video_size", lambda path: (640, 360))
+    monkeypatch.setattr(core.cost_model, "estimate_frame_count", lambda *args: 48)
+    return str(path)
+
+
+def make_config(video, tmp_path):
+    return GenerationConfig(input_video_path=video, output_dir=str(tmp_path / "out"), enable_pose=False)
+
+
+@pytest.mark.parametrize("smi, device", [(None, "cpu"), ("/usr/bin/nvidia-smi", "cuda")])
+def test_device_is_probed_until_a_render_is_recorded(tmp_path, video, monkeypatch, smi, device):
+    monkeypatch.setattr(core.cost_model.shutil, "which", lambda name: smi)
+    history = ThroughputHistory(str(tmp_path / "history.json"))
+    estimate = estimate_render(make_config(video, tmp_path), history)
+
+    assert estimate.device == device
+    assert not estimate.device_measured
+    assert any("按推断的设备" in line for line in estimate.lines())
+
+
+def test_recorded_device_wins_over_the_probe(tmp_path, video, monkeypatch):
+    monkeypatch.setattr(core.cost_model.shutil, "which", lambda name: "/usr/bin/nvidia-smi")
+    history = ThroughputHistory(str(tmp_path / "history.json"))
+    history.device = {"type": "cpu", "name": "CPU", "vram_total": 0, "efficient_attention": True}
+    estimate = estimate_render(make_config(video, tmp_path), history)
+
+    assert estimate.device == "cpu" and estimate.device_measured
+    assert not any("按推断的设备" in line for line in estimate.lines())
+    # CPU 估算使用 CPU 的默认吞吐，而不是 GPU 的
+    generate = dict((stage, seconds) for stage, seconds, _ in estimate.stages)["generate"]
+    gpu = estimate_render(make_config(video, tmp_path), ThroughputHistory(str(tmp_path / "none.json")))
+    assert generate > dict((s, t) for s, t, _ in gpu.stages)["generate"] * 10
@@ -0,0 +1,111 @@
+import os
+import json
+import threading
+import http.client
+
+import pytest
+
+from conftest import StubPipeline
+from core.config import GenerationConfig
+from core.daemon import InferenceDaemon
+from core.daemon_client import DaemonClient
+from core.pipeline_utils import PipelineLoader
+
+
+@pytest.fixture
+def daemon():
+    daemon = InferenceDaemon("127.0.0.1", 0, pipeline_factory=StubPipeline)
+    daemon.start_in_background()
+    yield daemon
+    daemon.shutdown()
+    PipelineLoader.release()
+
+
+def client_for(daemon):
+    host, port = daemon.address
+    return DaemonClient(host, port, timeout=30)
+
+
+def test_render_over_http_streams_ndjson_events(daemon, tmp_path, fake_video, user_cache):
+    pytest.importorskip("torch")
+    video, _, frame_count = fake_video
+    config = GenerationConfig(input_video_path=video, output_dir=str(tmp_path / "out"), enable_pose=False,
+                              target_width=96)
+
+    host, port = daemon.address
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.request("POST", "/jobs", body=json.dumps({"job_type": "render", "config": config.to_dict(),
+                                                   "stream_frames": True}))
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response if line.strip()]
+    conn.close()
+
+    assert events[0]["event"] == "accepted" and events[0]["job_id"]
+    assert events[-1] == {"event": "done"}
+    assert any(e["event"] == "progress" for e in events)
+    assert sum(e["event"] == "frame" for e in events) == frame_count
+    assert os.path.exists(os.path.join(config.output_dir, "final_output.mp4"))
+
+    # 桩管线只作用于服务创建的任务，不修改全局的 PipelineLoader
+    assert not hasattr(PipelineLoader, "pipeline_factory")
+    assert isinstance(PipelineLoader._cached_pipe, StubPipeline)
+    status = client_for(daemon).status()
+    assert status == {"busy": False, "pipeline_loaded": True, "jobs": []}
+
+
+def test_cancel_is_scoped_to_job_id(daemon):
+    client = client_for(daemon)
+    events = []
+    accepted = threading.Event()
+
+    def on_event(event):
+        events.append(event)
+        if event["event"] == "accepted":
+            accepted.set()
+
+    # 占住任务锁，使提交的任务停在排队状态
+    with daemon._job_lock:
+        thread = threading.Thread(target=client.run_job, args=("render", GenerationConfig(), on_event))
+        thread.start()
+        assert accepted.wait(10)
+        job_id = client.job_id
+        assert client.status()["jobs"] == [job_id]
+
+        assert not DaemonClient(*daemon.address).cancel("not-a-job")
+        assert DaemonClient(*daemon.address).cancel() is False  # 没有提交过任务的客户端不会取消别人的任务
+        assert client.cancel()
+    thread.join(10)
+
+    assert [e["event"] for e in events] == ["accepted", "cancelled"]
+    assert client.status()["jobs"] == []
+    assert not client.cancel(job_id)  # 已结束的任务
+
+
+def test_cancel_requires_job_id(daemon):
+    host, port = daemon.address
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("POST", "/cancel", body=json.dumps({"finalize": True}))
+    response = conn.getresponse()
+    assert response.status == 400
+    conn.close()
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "192.168.1.10", "example.com"])
+def test_daemon_refuses_non_loopback_hosts(host):
+    from cli import build_parser
+
+    with pytest.raises(ValueError):
+        InferenceDaemon(host, 0)
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["serve", "--host", host])
+
+
+def test_serve_and_status_accept_the_same_host():
+    from cli import build_parser
+
+    parser = build_parser()
+    assert parser.parse_args(["serve", "--host", "127.0.0.2"]).host == "127.0.0.2"
+    args = parser.parse_args(["status", "--host", "127.0.0.2", "--port", "9000"])
+    assert (args.host, args.port) == ("127.0.0.2", 9000)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from core.feature_cache import FrameReuseGate, frame_similarity
+
+SHAPE = (256, 384, 3)
+
+
+def pose_map(shift=0):
+    """几乎全黑的骨骼图：只有一条细线"""
+    out = np.zeros(SHAPE, dtype=np.uint8)
+    out[10:50, 40 + shift:42 + shift] = 255
+    return out
+
+
+def source(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_pose_maps_look_alike_even_when_the_video_changes():
+    # 前提：骨骼图几乎相同，源视频帧完全不同
+    assert frame_similarity(pose_map(), pose_map(1)) > 0.97
+    assert frame_similarity(source(20), source(220)) < 0.5
+
+
+def test_gate_rejects_reuse_across_different_source_frames():
+    gate = FrameReuseGate(threshold=0.97, refresh=4)
+    assert gate.decide(source(20)) is False  # 第一帧总是完整计算
+    assert gate.decide(source(220)) is False
+    assert gate.decide(source(221)) is True
+
+
+def test_gate_refreshes_and_resets_on_cut():
+    gate = FrameReuseGate(threshold=0.9, refresh=2)
+    decisions = [gate.decide(source(100)) for _ in range(5)]
+    assert decisions == [False, True, True, False, True]
+    assert gate.decide(source(100), cut=True) is False
+
+
+def test_gate_keeps_its_own_copy_of_the_refresh_frame():
+    gate = FrameReuseGate(threshold=0.97, refresh=4)
+    frame = source(0)
+    gate.decide(frame)
+    frame[:] = 255  # 帧存储回收/复用了该帧的缓冲区
+    assert gate.decide(source(0)) is True
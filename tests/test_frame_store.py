@@ -0,0 +1,144 @@
+import os
+import glob
+
+import numpy as np
+import pytest
+
+from core.config import GenerationConfig
+from core.frame_store import (create_frame_store, open_frame_store, store_path, MemoryBudget, RamFrameStore,
+                              MemmapFrameStore)
+
+SHAPE = (24, 32, 3)
+
+
+def frames(n):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=SHAPE, dtype=np.uint8) for _ in range(n)]
+
+
+def segment_files(path):
+    return glob.glob(glob.escape(path) + ".[0-9][0-9][0-9][0-9]")
+
+
+@pytest.mark.parametrize("kind", ["memmap", "chunked", "jpeg", "ram"])
+def test_round_trip(tmp_path, kind):
+    config = GenerationConfig(frame_store_chunk=4, spill_dir=str(tmp_path / "spill"))
+    data = frames(10)
+    store = create_frame_store(kind, str(tmp_path / "stream"), config)
+    for i, frame in enumerate(data):
+        assert store.append(frame) == i
+    store.flush()
+
+    assert len(store) == 10
+    assert store.shape == SHAPE
+    for expected, frame in zip(data, store):
+        if kind == "jpeg":
+            assert np.abs(frame.astype(int) - expected).mean() < 60  # 有损压缩
+        else:
+            np.testing.assert_array_equal(frame, expected)
+    assert store[-1].shape == SHAPE
+    with pytest.raises(IndexError):
+        store[10]
+    store.discard()
+
+
+@pytest.mark.parametrize("kind", ["memmap", "chunked"])
+def test_reopen_persisted_store(tmp_path, kind):
+    base = str(tmp_path / "poses")
+    data = frames(7)
+    store = create_frame_store(kind, base, GenerationConfig(frame_store_chunk=3))
+    for frame in data:
+        store.append(frame)
+    store.close()
+
+    reopened = open_frame_store(kind, base)
+    assert len(reopened) == 7
+    for expected, frame in zip(data, reopened):
+        np.testing.assert_array_equal(frame, expected)
+    reopened.discard()
+    assert not os.path.exists(store_path(kind, base))
+    assert open_frame_store(kind, base) is None
+
+
+def test_open_rejects_foreign_file(tmp_path):
+    base = str(tmp_path / "bad")
+    with open(store_path("memmap", base), "wb") as f:
+        f.write(b"\0" * 64)
+    assert open_frame_store("memmap", base) is None
+
+
+def test_memmap_release_deletes_consumed_segments(tmp_path):
+    path = str(tmp_path / "raw.v2af")
+    store = MemmapFrameStore(path, segment_frames=4)
+    for frame in frames(10):
+        store.append(frame)
+    store.flush()
+    assert len(segment_files(path)) == 3
+
+    for i in range(3):
+        store.release(i)
+    assert len(segment_files(path)) == 3  # 第一段尚未全部用完
+    store.release(3)
+    assert not os.path.exists(path + ".0000")
+    assert len(segment_files(path)) == 2
+    with pytest.raises(KeyError):
+        store[0]
+    assert store[4].shape == SHAPE
+
+    for i in range(4, 10):
+        store.release(i)
+    assert len(segment_files(path)) == 1  # 最后一段未写满，保留到 discard
+    store.discard()
+    assert not os.path.exists(path)
+    assert segment_files(path) == []
+
+
+def test_ram_store_spills_over_budget_and_reuses_slots(tmp_path):
+    frame_bytes = int(np.prod(SHAPE))
+    budget = MemoryBudget(frame_bytes * 3)
+    store = RamFrameStore("raw", budget, str(tmp_path), segment_frames=4)
+    data = frames(8)
+    for frame in data:
+        store.append(frame)
+
+    assert budget.used_bytes <= budget.limit_bytes
+    assert budget.peak_bytes == frame_bytes * 3
+    st = store.stats()
+    assert st["in_memory"] == 3
+    assert st["spilled"] == 5
+    for expected, frame in zip(data, store):
+        np.testing.assert_array_equal(frame, expected)
+    assert store.stats()["misses"] == 5
+
+    # 已释放帧的换出槽位被后续换出复用，换出文件不再增长
+    spill_path = store._spill_file.path
+    for i in range(5):
+        store.release(i)
+    with pytest.raises(KeyError):
+        store[0]
+    for frame in frames(4):
+        store.append(frame)
+    assert len(store._spill_file) == 5
+    assert len(segment_files(spill_path)) == 2
+
+    store.close()
+    assert budget.used_bytes == 0
+    assert not os.path.exists(spill_path)
+    assert segment_files(spill_path) == []
+
+
+def test_stores_share_one_budget(tmp_path):
+    frame_bytes = int(np.prod(SHAPE))
+    budget = MemoryBudget(frame_bytes * 4)
+    raw = RamFrameStore("raw", budget, str(tmp_path))
+    pose = RamFrameStore("pose", budget, str(tmp_path))
+    for frame in frames(4):
+        raw.append(frame)
+    for frame in frames(2):
+        pose.append(frame)
+    # 全局最早写入的两帧 (均属于 raw) 被换出
+    assert raw.stats()["spilled"] == 2
+    assert pose.stats()["spilled"] == 0
+    raw.close()
+    pose.close()
+    assert budget.used_bytes == 0
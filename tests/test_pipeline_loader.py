@@ -0,0 +1,44 @@
+import types
+
+import pytest
+
+import core.pipeline_utils
+from core.config import GenerationConfig
+from core.pipeline_utils import PipelineLoader
+
+
+@pytest.fixture
+def loads():
+    calls = []
+
+    def factory(config):
+        calls.append(config.inference_precision)
+        return types.SimpleNamespace()
+
+    PipelineLoader.release()
+    yield factory, calls
+    PipelineLoader.release()
+
+
+@pytest.mark.parametrize("device, reloads", [("cuda", 1), ("cpu", 2)])
+def test_precision_only_reloads_on_cpu(monkeypatch, loads, device, reloads):
+    monkeypatch.setattr(core.pipeline_utils, "inference_device", lambda: device)
+    factory, calls = loads
+    config = GenerationConfig(inference_precision="fp32")
+    first = PipelineLoader.get_pipeline(config, factory=factory)
+    config.inference_precision = "int8"
+    second = PipelineLoader.get_pipeline(config, factory=factory)
+
+    assert len(calls) == reloads
+    assert (first is second) == (reloads == 1)
+
+
+def test_factory_is_part_of_the_cache_key(monkeypatch, loads):
+    monkeypatch.setattr(core.pipeline_utils, "inference_device", lambda: "cpu")
+    factory, calls = loads
+    config = GenerationConfig()
+    PipelineLoader.get_pipeline(config, factory=factory)
+    PipelineLoader.get_pipeline(config, factory=factory)
+    assert len(calls) == 1
+    other = PipelineLoader.get_pipeline(config, factory=lambda c: "other")
+    assert other == "other"
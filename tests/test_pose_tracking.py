@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from core.pose_tracking import SparsePoseTracker, KeypointSmoother, interpolate_keypoints
+
+
+class FakeBackend:
+    """关键点 = 帧的像素值 / 100 (每帧像素值等于帧号)，记录在哪些帧上运行了检测"""
+
+    def __init__(self):
+        self.detected = []
+
+    def keypoints(self, frame):
+        value = float(frame[0, 0, 0])
+        self.detected.append(int(value))
+        return [(value / 100, value / 100)] * 18
+
+
+def frame(index, size=16):
+    return np.full((size, size, 3), index, dtype=np.uint8)
+
+
+def run(tracker, count, cuts=()):
+    out = []
+    for i in range(count):
+        out.extend(tracker.push(frame(i), cut=i in cuts))
+    out.extend(tracker.finish())
+    return [round(points[0][0] * 100, 6) for points in out]
+
+
+def test_interval_detects_keyframes_and_interpolates_between_them():
+    backend = FakeBackend()
+    tracker = SparsePoseTracker(backend, interval=4)
+    values = run(tracker, 10)
+
+    assert backend.detected == [0, 4, 8, 9]
+    assert values == list(range(10))  # 线性画面上插值结果与逐帧检测一致
+    assert tracker.detector_calls == 4
+    assert tracker.frames == 10
+
+
+def test_cut_closes_the_previous_shot_without_interpolating_across_it():
+    backend = FakeBackend()
+    tracker = SparsePoseTracker(backend, interval=4)
+    out = []
+    for i in range(10):
+        out.extend(tracker.push(frame(i if i < 6 else 100 + i), cut=i == 6))
+    out.extend(tracker.finish())
+    values = [round(points[0][0] * 100, 6) for points in out]
+
+    # 切点前的最后一帧 (5) 作为上一镜头的收尾关键帧，切点 (6) 作为新镜头的首个关键帧
+    assert backend.detected == [0, 4, 5, 106, 109]
+    assert values[:6] == [0, 1, 2, 3, 4, 5]
+    # 新镜头内只在 106 与 109 之间插值，不会出现跨镜头的中间值
+    assert values[6:] == [106, 107, 108, 109]
+
+
+def test_cut_right_after_a_keyframe_and_on_the_first_frame():
+    backend = FakeBackend()
+    tracker = SparsePoseTracker(backend, interval=2)
+    values = run(tracker, 5, cuts={0, 3})
+    assert values == [0, 1, 2, 3, 4]
+    # 帧 2 是关键帧，切点 3 不需要额外的收尾检测
+    assert backend.detected == [0, 2, 3, 4]
+
+
+def test_cut_resets_the_smoother():
+    class RecordingSmoother(KeypointSmoother):
+        resets = 0
+
+        def reset(self):
+            self.resets += 1
+            super().reset()
+
+    smoother = RecordingSmoother(fps=10)
+    tracker = SparsePoseTracker(FakeBackend(), interval=3, smoother=smoother)
+    run(tracker, 8, cuts={4})
+    assert smoother.resets == 1
+
+
+def test_motion_forces_an_early_keyframe():
+    backend = FakeBackend()
+    tracker = SparsePoseTracker(backend, interval=8, motion_threshold=20)
+    out = []
+    for value in [0, 1, 2, 60, 61, 62]:
+        out.extend(tracker.push(frame(value)))
+    out.extend(tracker.finish())
+    assert backend.detected == [0, 60, 62]
+    assert tracker.motion_keyframes == 1
+    assert len(out) == 6
+
+
+def test_pending_frame_is_copied_before_the_source_is_released():
+    backend = FakeBackend()
+    tracker = SparsePoseTracker(backend, interval=4)
+    tracker.push(frame(0))
+    last = frame(7)
+    tracker.push(last)
+    last[:] = 0  # 帧存储回收/复用了该帧的缓冲区
+    tracker.finish()
+    assert backend.detected == [0, 7]
+
+
+@pytest.mark.parametrize("t, expected", [(0.25, 0.25), (0.75, 0.75)])
+def test_interpolate_keeps_points_missing_on_one_side_near_that_side(t, expected):
+    start = [(0.0, 0.0), None]
+    end = [(1.0, 1.0), (0.5, 0.5)]
+    result = interpolate_keypoints(start, end, t)
+    assert result[0] == (expected, expected)
+    assert result[1] == (None if t < 0.5 else (0.5, 0.5))
+    assert interpolate_keypoints(None, end, t) == (None if t < 0.5 else end)
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import pytest
+
+from core.config import GenerationConfig
+from core.preflight import DiskPreflight
+
+W, H, N = 640, 360, 100
+FRAME = W * H * 3
+MB = 1024 * 1024
+
+
+def make_config(tmp_path, **overrides):
+    return GenerationConfig(output_dir=str(tmp_path / "out"), **overrides)
+
+
+def test_memmap_counts_raw_stream_pose_cache_and_video(tmp_path):
+    config = make_config(tmp_path, frame_store="memmap", enable_pose=True)
+    needs = DiskPreflight.estimate(config, N, W, H)
+    temp_dir = os.path.join(config.output_dir, config.temp_dir_name)
+    assert needs[temp_dir] == N * FRAME
+    assert needs[config.output_dir] > N * FRAME  # 骨骼流 + 最终视频
+
+    cached = DiskPreflight.estimate(config, N, W, H, pose_cached=True)
+    assert cached[temp_dir] == 0
+    assert cached[config.output_dir] < N * FRAME
+
+    # 特征复用按源视频帧判定相似度，骨骼流已缓存也需要拆帧
+    config.feature_reuse = True
+    assert DiskPreflight.estimate(config, N, W, H, pose_cached=True)[temp_dir] == N * FRAME
+
+
+def test_ram_mode_never_counts_the_output_disk_for_intermediates(tmp_path):
+    spill = str(tmp_path / "spill")
+    config = make_config(tmp_path, frame_store="ram", enable_pose=True, spill_dir=spill, ram_budget_mb=10)
+    needs = DiskPreflight.estimate(config, N, W, H)
+    video_only = DiskPreflight.estimate(make_config(tmp_path, frame_store="ram", enable_pose=False,
+                                                    spill_dir=spill, ram_budget_mb=10), N, W, H)
+    assert needs[config.output_dir] == video_only[config.output_dir]
+    # 骨骼流与拆帧流共享预算，两份换出量
+    assert needs[spill] == 2 * (N * FRAME - 10 * MB)
+    assert video_only[spill] == N * FRAME - 10 * MB
+
+
+def test_ram_mode_within_budget_spills_nothing(tmp_path):
+    config = make_config(tmp_path, frame_store="ram", enable_pose=True, ram_budget_mb=4096)
+    needs = DiskPreflight.estimate(config, N, W, H)
+    assert needs.get(tempfile.gettempdir(), 0) == 0
+
+
+def test_check_raises_when_space_is_short(tmp_path):
+    config = make_config(tmp_path, frame_store="memmap", enable_pose=False)
+    with pytest.raises(ValueError, match="磁盘空间不足"):
+        DiskPreflight.check(config, 10 ** 9, 1920, 1080)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import core.preview
+from core.config import GenerationConfig
+from core.preview import sample_frames, sample_uniform
+
+
+@pytest.fixture
+def clip(monkeypatch):
+    """40 帧的合成片段：第 0 / 15 / 30 帧处换镜头 (整体颜色突变)；记录解码参数"""
+    calls = []
+    colors = [(200, 30, 30), (30, 200, 30), (30, 30, 200)]
+
+    def decode_frames(path, fps, width, height, cancel_token=None, start=0.0, end=0.0):
+        calls.append((fps, width, height, start, end))
+        for i in range(40):
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:] = colors[min(i // 15, 2)]
+            frame[:, : (i % 5) + 1] = 128  # 镜头内的轻微变化
+            yield frame
+
+    monkeypatch.setattr(core.preview, "probe_video_size", lambda path: (320, 180))
+    monkeypatch.setattr(core.preview, "estimate_frame_count", lambda *args: 40)
+    monkeypatch.setattr(core.preview, "decode_frames", decode_frames)
+    return calls
+
+
+def test_samples_use_render_size_and_filter(clip):
+    config = GenerationConfig(input_video_path="clip.mp4", target_fps=12, target_width=160, render_width=80,
+                              clip_start=1.5)
+    samples = sample_frames(config, 4)
+    assert [idx for idx, _ in samples] == sample_uniform(40, 4)
+    # 与 RenderJob 相同：按生成分辨率 (偶数高度) 与子片段范围解码
+    assert clip == [(12, 80, 44, 1.5, 0.0)]
+    assert all(frame.shape == (44, 80, 3) for _, frame in samples)
+
+
+def test_scene_sampling_prefers_shot_starts(clip):
+    config = GenerationConfig(input_video_path="clip.mp4", target_width=160)
+    indices = [idx for idx, _ in sample_frames(config, 3, scene=True)]
+    assert indices == [1, 16, 31]
+
+    indices = [idx for idx, _ in sample_frames(config, 5, scene=True)]
+    assert {1, 16, 31} <= set(indices) and len(indices) == 5
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import subprocess
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from core.config import GenerationConfig
+from core.process_worker import (FRAME_HEADER_SIZE, FRAME_SHM_BYTES, InferenceProcess, ProcessAIWorker,
+                                 read_shared_frame, write_shared_frame)
+
+
+def test_execution_defaults_to_the_supervised_process():
+    assert GenerationConfig().execution_mode == "process"
+
+
+def test_job_modules_do_not_import_qt():
+    code = ("import sys, core, core.config, core.jobs; "
+            "assert not [m for m in sys.modules if m.startswith('PyQt6')], 'Qt imported'")
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_shared_frame_header_always_matches_pixels():
+    buf = bytearray(FRAME_HEADER_SIZE + FRAME_SHM_BYTES)
+    assert read_shared_frame(buf)[:3] == (0, 0, 0)
+
+    big = np.full((40, 60, 3), 7, dtype=np.uint8)
+    small = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    write_shared_frame(buf, 1, big)
+    write_shared_frame(buf, 2, small)
+    # 收到第 1 帧的事件时共享内存中已是第 2 帧：按帧头读取，尺寸与像素一致
+    seq, h, w, data = read_shared_frame(buf)
+    assert (seq, h, w) == (2, 4, 6)
+    assert data == small.tobytes()
+
+
+@pytest.fixture
+def inference_process():
+    proc = InferenceProcess.instance()
+    yield proc
+    proc.shutdown()
+
+
+def test_child_failure_is_reported_and_process_survives(inference_process):
+    errors, finished = [], []
+    worker = ProcessAIWorker(GenerationConfig(), job_type="no_such_job")
+    worker.error_signal.connect(errors.append)
+    worker.finished_signal.connect(lambda: finished.append(True))
+
+    worker.run()  # 同步执行，不启动 QThread
+    assert len(errors) == 1
+    assert not finished
+    assert inference_process.is_alive()
+    pid = inference_process.process.pid
+
+    worker.run()  # 同一个推理进程继续服务
+    assert len(errors) == 2
+    assert inference_process.process.pid == pid
+
+
+def test_unexpected_parent_side_failure_is_reported(inference_process, monkeypatch):
+    errors = []
+    worker = ProcessAIWorker(GenerationConfig(), job_type="render")
+    worker.error_signal.connect(errors.append)
+
+    def broken_submit(job_type, config):
+        raise TypeError("cannot pickle")
+
+    monkeypatch.setattr(inference_process, "submit", broken_submit)
+    worker.run()
+    assert len(errors) == 1
+    assert "cannot pickle" in errors[0]
+    assert inference_process.is_alive()  # 已自动重启
+
+
+def test_cancel_reaches_the_running_job_not_the_queued_one(monkeypatch):
+    import core.jobs
+    from core.jobs import BaseJob
+    from core.process_worker import _worker_main
+
+    started = []
+    running = threading.Event()
+
+    class BlockingJob(BaseJob):
+        """一直运行到被取消"""
+
+        def run(self):
+            started.append(self.cancel_token)
+            running.set()
+            while True:
+                self.cancel_token.check()
+                threading.Event().wait(0.01)
+
+    monkeypatch.setattr(core.jobs, "get_job_class", lambda job_type: BlockingJob)
+    cmd_recv, cmd_send = mp.Pipe(duplex=False)
+    evt_recv, evt_send = mp.Pipe(duplex=False)
+    shm = shared_memory.SharedMemory(create=True, size=FRAME_HEADER_SIZE + 16)
+    worker = threading.Thread(target=_worker_main, args=(cmd_recv, evt_send, shm.name, threading.Lock()))
+    worker.start()
+
+    def next_result():
+        while evt_recv.poll(10):
+            msg = evt_recv.recv()
+            if msg[0] != "progress":
+                return msg
+        raise TimeoutError
+
+    try:
+        cmd_send.send(("job", "running", "block", {}))
+        cmd_send.send(("job", "queued", "block", {}))
+        cmd_send.send(("cancel", "queued", False))  # 排队中的任务：开始时即被取消
+        assert running.wait(10)
+        assert not started[0].cancelled  # 取消排队任务不影响正在运行的任务
+
+        cmd_send.send(("cancel", "running", True))
+        assert next_result() == ("cancelled",)
+        assert started[0].finalize
+        assert next_result() == ("cancelled",)
+        assert len(started) == 2 and not started[1].finalize
+    finally:
+        cmd_send.send(("shutdown",))
+        worker.join(10)
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,179 @@
+import os
+import json
+
+import numpy as np
+import pytest
+
+from conftest import StubPipeline, StubPoseBackend
+from core.config import GenerationConfig
+
+torch = pytest.importorskip("torch")
+
+
+@pytest.fixture
+def stub_loader():
+    from core.pipeline_utils import PipelineLoader
+
+    PipelineLoader.release()
+    yield PipelineLoader
+    PipelineLoader.release()
+
+
+def render_job(config):
+    from core.jobs import RenderJob
+
+    return RenderJob(config, pipeline_factory=StubPipeline)
+
+
+def make_config(video, tmp_path, **overrides):
+    options = dict(input_video_path=video, output_dir=str(tmp_path / "out"), enable_pose=False, target_width=96,
+                   model_path="")
+    options.update(overrides)
+    return GenerationConfig(**options)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"frame_store": "memmap"},
+    {"frame_store": "ram"},
+    {"frame_store": "jpeg"},
+    {"frame_store": "chunked"},
+    {"img2img_chain": True},
+    {"render_width": 48},
+])
+def test_render_finishes_and_records_throughput(tmp_path, fake_video, user_cache, stub_loader, overrides):
+    from core.cost_model import default_history_path
+
+    video, _, frame_count = fake_video
+    config = make_config(video, tmp_path, **overrides)
+    job = render_job(config)
+
+    assert job.execute() is True
+    assert job.produced == frame_count
+    assert os.path.exists(os.path.join(config.output_dir, "final_output.mp4"))
+
+    with open(default_history_path(), "r", encoding="utf-8") as f:
+        history = json.load(f)
+    assert history["device"]["type"] == "cpu"
+    assert "extract" in history["rates"]
+    assert "finalize" in history["rates"]
+    assert any(key.startswith("generate|cpu|img2img") for key in history["rates"])
+
+
+def test_result_cache_hit_skips_pipeline(tmp_path, fake_video, user_cache, stub_loader):
+    video, _, frame_count = fake_video
+    config = make_config(video, tmp_path, result_cache=True)
+    assert render_job(config).execute()
+    calls = stub_loader._cached_pipe.calls
+    assert calls == frame_count
+
+    stub_loader.release()
+    job = render_job(config)
+    assert job.execute()
+    assert job.produced == frame_count
+    assert stub_loader._cached_pipe is None  # 全部命中缓存，不加载模型
+
+
+@pytest.fixture
+def stub_pose(monkeypatch):
+    import core.pose_backends
+
+    backends = []
+
+    def create(config, video=True):
+        backends.append(StubPoseBackend())
+        return backends[-1]
+
+    monkeypatch.setattr(core.pose_backends, "create_pose_backend", create)
+    return backends
+
+
+def pose_files(config):
+    return [name for _, _, files in os.walk(os.path.join(config.output_dir, "pose_cache")) for name in files]
+
+
+def test_pose_stream_is_persisted_and_reused(tmp_path, fake_video, user_cache, stub_loader, stub_pose):
+    video, _, frame_count = fake_video
+    config = make_config(video, tmp_path, enable_pose=True, frame_store="memmap")
+    assert render_job(config).execute()
+    assert stub_pose[0].calls == frame_count
+    assert "poses.done" in pose_files(config)
+
+    job = render_job(config)
+    assert job.execute()
+    assert job.produced == frame_count
+    assert len(stub_pose) == 1  # 复用完整的骨骼流，不再检测
+
+
+def test_ram_mode_keeps_pose_stream_off_the_output_disk(tmp_path, fake_video, user_cache, stub_loader, stub_pose):
+    video, _, frame_count = fake_video
+    config = make_config(video, tmp_path, enable_pose=True, frame_store="ram", ram_budget_mb=0,
+                         spill_dir=str(tmp_path / "spill"))
+    job = render_job(config)
+    assert job.execute()
+    assert job.produced == frame_count
+    assert pose_files(config) == []
+    assert job.streams == {}
+    assert os.listdir(tmp_path / "spill" / "video2ai_spill") == []
+
+
+def test_feature_reuse_compares_source_frames_not_pose_maps(tmp_path, fake_video, user_cache, stub_loader,
+                                                            monkeypatch):
+    import core.jobs
+    import core.pose_backends
+    import core.feature_cache
+
+    video, _, frame_count = fake_video
+
+    def decode_frames(path, fps, width, height, *args, **kwargs):
+        for i in range(frame_count):
+            yield np.full((height, width, 3), 0 if i % 2 else 230, dtype=np.uint8)  # 相邻帧完全不同
+
+    class BlackPose(StubPoseBackend):
+        def detect(self, frame):
+            self.calls += 1
+            return np.zeros_like(frame)  # 骨骼图完全相同
+
+    decisions = []
+
+    class RecordingCache:
+        def __init__(self, unet, **kwargs):
+            pass
+
+        def install(self):
+            return self
+
+        def begin_frame(self, reuse):
+            decisions.append(reuse)
+
+        def summary(self):
+            return ""
+
+        def uninstall(self):
+            pass
+
+    class UNetStubPipeline(StubPipeline):
+        unet = None
+
+    monkeypatch.setattr(core.jobs, "decode_frames", decode_frames)
+    monkeypatch.setattr(core.pose_backends, "create_pose_backend", lambda config, video=True: BlackPose())
+    monkeypatch.setattr(core.feature_cache, "UNetFeatureCache", RecordingCache)
+
+    config = make_config(video, tmp_path, enable_pose=True, frame_store="memmap", feature_reuse=True)
+    for _ in range(2):  # 第二次复用已缓存的骨骼流，仍按源视频帧判定
+        decisions.clear()
+        assert core.jobs.RenderJob(config, pipeline_factory=UNetStubPipeline).execute()
+        assert decisions == [False] * frame_count
+
+
+def test_pose_throughput_uses_actual_detector_calls(tmp_path, fake_video, user_cache, stub_loader, stub_pose,
+                                                    monkeypatch):
+    from core.cost_model import ThroughputHistory
+
+    recorded = []
+    monkeypatch.setattr(ThroughputHistory, "record_render",
+                        lambda self, config, size, out_size, stats: recorded.append(stats))
+    video, _, frame_count = fake_video
+    # 桩后端不输出关键点，回退为逐帧检测：实际检测次数多于按 pose_interval 估算的次数
+    config = make_config(video, tmp_path, enable_pose=True, pose_interval=3)
+    assert render_job(config).execute()
+    assert recorded[0]["pose"][1] == stub_pose[0].calls == frame_count
@@ -0,0 +1,79 @@
+import os
+import time
+
+import numpy as np
+
+from core.config import GenerationConfig
+from core.preflight import DiskPreflight, RESULT_CACHE_RATIO
+from core.result_cache import FrameResultCache
+
+SHAPE = (32, 48, 3)
+
+
+def frame(value):
+    out = np.zeros(SHAPE, dtype=np.uint8)
+    out[::2] = value
+    return out
+
+
+def test_round_trip_is_compressed(tmp_path):
+    cache = FrameResultCache(str(tmp_path))
+    cache.put("a", frame(9))
+    np.testing.assert_array_equal(cache.get("a"), frame(9))
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+    assert os.listdir(tmp_path) == ["a.npz"]
+    assert cache.total_bytes < frame(9).nbytes / 4
+
+
+def test_lru_order_is_kept_incrementally(tmp_path):
+    probe = FrameResultCache(str(tmp_path / "probe"))
+    probe.put("p", frame(1))
+    cache = FrameResultCache(str(tmp_path / "cache"), max_bytes=probe.total_bytes * 3)
+    for key in "abc":
+        cache.put(key, frame(1))
+    cache.get("a")  # a 变为最近使用
+    cache.put("d", frame(1))
+
+    assert cache.evictions == 1
+    assert list(cache._entries) == ["c", "a", "d"]
+    assert not os.path.exists(os.path.join(cache.cache_dir, "b.npz"))
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_order_restored_from_mtime_and_legacy_entries_removed(tmp_path):
+    cache = FrameResultCache(str(tmp_path))
+    for i, key in enumerate("xyz"):
+        cache.put(key, frame(2))
+        stamp = time.time() - 100 + i * 10
+        os.utime(os.path.join(tmp_path, key + ".npz"), (stamp, stamp))
+    os.utime(os.path.join(tmp_path, "x.npz"))  # x 最近使用
+    np.save(os.path.join(tmp_path, "old.npy"), frame(3))
+
+    reopened = FrameResultCache(str(tmp_path))
+    assert list(reopened._entries) == ["y", "z", "x"]
+    assert not os.path.exists(os.path.join(tmp_path, "old.npy"))
+
+
+def test_corrupt_entry_counts_as_miss(tmp_path):
+    cache = FrameResultCache(str(tmp_path))
+    cache.put("a", frame(4))
+    with open(os.path.join(tmp_path, "a.npz"), "wb") as f:
+        f.write(b"PK\x03\x04broken")
+    assert cache.get("a") is None
+    assert "a" not in cache._entries
+    assert cache.total_bytes == 0
+
+
+def test_preflight_counts_cache_growth_only_when_enabled(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    config = GenerationConfig(output_dir=str(tmp_path / "out"), result_cache_dir=cache_dir, enable_pose=False)
+    assert GenerationConfig().result_cache is False
+    assert cache_dir not in DiskPreflight.estimate(config, 100, 64, 64)
+
+    config.result_cache = True
+    needs = DiskPreflight.estimate(config, 100, 64, 64)
+    assert needs[cache_dir] == int(100 * 64 * 64 * 3 * RESULT_CACHE_RATIO)
+
+    config.result_cache_mb = 1
+    assert DiskPreflight.estimate(config, 10000, 64, 64)[cache_dir] == 1024 * 1024
@@ -0,0 +1,50 @@
+import numpy as np
+
+from core.scene_cuts import SceneCutDetector, shots_from_cuts, save_shots, load_shots
+
+W, H = 128, 72
+
+
+def panning_shot(length, base, speed=4, seed=0):
+    """镜头内缓慢平移的块状纹理 (色调由 base 决定)"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 96, (H // 8, (W + length * speed) // 8 + 1, 3))
+    texture = np.repeat(np.repeat(blocks, 8, axis=0), 8, axis=1) + np.asarray(base) - 48
+    texture = np.clip(texture, 0, 255).astype(np.uint8)
+    return [texture[:, t * speed:t * speed + W].copy() for t in range(length)]
+
+
+def detect(frames, **kwargs):
+    detector = SceneCutDetector(**kwargs)
+    flags = [detector.push(frame) for frame in frames]
+    return detector, flags
+
+
+def test_hard_cuts_are_found_and_pans_are_not():
+    frames = (panning_shot(20, (60, 90, 200), seed=1)
+              + panning_shot(15, (220, 120, 40), seed=2)
+              + panning_shot(10, (90, 200, 90), seed=3))
+    detector, flags = detect(frames)
+
+    assert detector.cuts == [0, 20, 35]
+    assert [i for i, cut in enumerate(flags) if cut] == [20, 35]
+    assert detector.shots == [(0, 20), (20, 35), (35, 45)]
+    # 平移只让直方图缓慢变化，远低于阈值
+    inner = [s for i, s in enumerate(detector.scores) if i not in (20, 35)]
+    assert max(inner) < detector.threshold / 3
+
+
+def test_cuts_closer_than_min_shot_are_ignored():
+    frames = panning_shot(10, (60, 90, 200)) + panning_shot(3, (220, 120, 40)) + panning_shot(10, (60, 90, 200))
+    detector, _ = detect(frames, min_shot=6)
+    assert detector.cuts == [0, 10]  # 第二个切点距上一个只有 3 帧
+
+
+def test_shots_from_cuts_and_round_trip(tmp_path):
+    assert shots_from_cuts([0, 5, 5, 12, 40], 20) == [(0, 5), (5, 12), (12, 20)]
+    assert shots_from_cuts([7], 10) == [(0, 7), (7, 10)]
+
+    path = str(tmp_path / "shots.json")
+    save_shots(path, [(0, 5), (5, 12)])
+    assert load_shots(path) == [(0, 5), (5, 12)]
+    assert load_shots(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,78 @@
+import sys
+import types
+
+import pytest
+
+import core.pipeline_utils
+from core.config import GenerationConfig
+from core.pipeline_utils import PipelineLoader
+from core.schedulers import SCHEDULERS, SchedulerRegistry
+
+
+class FakeScheduler:
+    """按 diffusers 的 from_config 语义合并配置：基础配置 + 覆盖参数"""
+
+    def __init__(self, **config):
+        self.config = dict(config)
+
+    @classmethod
+    def from_config(cls, base_config, **kwargs):
+        return cls(**{**base_config, **kwargs})
+
+
+@pytest.fixture
+def fake_diffusers(monkeypatch):
+    module = types.ModuleType("diffusers")
+    for spec in SCHEDULERS.values():
+        setattr(module, spec["cls"], type(spec["cls"], (FakeScheduler,), {}))
+    monkeypatch.setitem(sys.modules, "diffusers", module)
+    return module
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    monkeypatch.setattr(core.pipeline_utils, "inference_device", lambda: "cpu")
+    pipe = types.SimpleNamespace(scheduler=FakeScheduler(beta_schedule="scaled_linear", use_karras_sigmas=False))
+    PipelineLoader.release()
+    yield lambda config: pipe
+    PipelineLoader.release()
+
+
+def test_switching_builds_from_original_config(fake_diffusers, factory):
+    config = GenerationConfig(steps=25)
+    for name in ("dpmpp_2m_karras", "dpmpp_2m", "euler", "unipc"):
+        config.scheduler = name
+        pipe = PipelineLoader.get_pipeline(config, factory=factory)
+        scheduler = pipe.scheduler
+        assert type(scheduler).__name__ == SCHEDULERS[name]["cls"]
+        assert scheduler.config["beta_schedule"] == "scaled_linear"
+        # Karras 采样器的参数不能带到之后的选择中
+        expected_karras = SCHEDULERS[name]["kwargs"].get("use_karras_sigmas", False)
+        assert scheduler.config["use_karras_sigmas"] is expected_karras
+        if name == "euler":
+            assert "algorithm_type" not in scheduler.config
+
+
+def test_missing_dependency_hides_scheduler(monkeypatch):
+    monkeypatch.setitem(SCHEDULERS["dpmpp_sde_karras"], "requires", "no_such_module_for_test")
+    assert "dpmpp_sde_karras" not in SchedulerRegistry.names()
+    assert "dpmpp_sde_karras" not in dict(SchedulerRegistry.options())
+    with pytest.raises(ValueError):
+        SchedulerRegistry.check(GenerationConfig(scheduler="dpmpp_sde_karras", steps=25))
+
+
+def test_distilled_scheduler_requires_weights():
+    with pytest.raises(ValueError):
+        SchedulerRegistry.check(GenerationConfig(scheduler="lcm", steps=4, distill_lora_path=""))
+    warning = SchedulerRegistry.check(GenerationConfig(scheduler="euler", steps=5))
+    assert warning is not None and "20" in warning
+
+
+def test_real_schedulers_do_not_leak_karras():
+    diffusers = pytest.importorskip("diffusers")
+    pipe = types.SimpleNamespace(scheduler=diffusers.PNDMScheduler())
+    base = pipe.scheduler.config
+    SchedulerRegistry.apply(pipe, "dpmpp_2m_karras", base)
+    assert pipe.scheduler.config.use_karras_sigmas
+    SchedulerRegistry.apply(pipe, "dpmpp_2m", base)
+    assert not pipe.scheduler.config.use_karras_sigmas
@@ -0,0 +1,65 @@
+import pytest
+
+from core.config import GenerationConfig
+from core.sweep import parse_values, build_combinations
+
+
+@pytest.mark.parametrize("text, cast, expected", [
+    ("1,2,3", int, [1, 2, 3]),
+    ("10-30:5", int, [10, 15, 20, 25, 30]),
+    ("5-8", int, [5, 6, 7, 8]),
+    ("0.3-0.7:0.2", float, [0.3, 0.5, 0.7]),
+    ("0.1-0.5:0.1", float, [0.1, 0.2, 0.3, 0.4, 0.5]),
+    ("7, 1-3, 2，9", int, [7, 1, 2, 3, 9]),  # 混用写法、全角逗号、去重并保持顺序
+    ("4.5,6", float, [4.5, 6.0]),
+])
+def test_parse_values(text, cast, expected):
+    assert parse_values(text, cast, 0) == expected
+
+
+@pytest.mark.parametrize("text", ["", "   ", None, ",,"])
+def test_parse_values_empty_uses_default(text):
+    assert parse_values(text, int, 42) == [42]
+
+
+@pytest.mark.parametrize("text", ["1-5:0", "1-5:-1"])
+def test_parse_values_rejects_non_positive_step(text):
+    with pytest.raises(ValueError):
+        parse_values(text, int, 0)
+
+
+def test_parse_values_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_values("a,b", int, 0)
+
+
+def test_build_combinations_is_a_cartesian_product():
+    config = GenerationConfig(enable_pose=False, prompt="base", seed=1, sweep_prompts="cat\n\n dog \n",
+                              sweep_seeds="1,2", sweep_cfg="5,7", sweep_steps="", sweep_strength="0.4,0.6")
+    combos = build_combinations(config)
+
+    assert len(combos) == 2 * 2 * 2 * 2
+    assert {c["prompt"] for c in combos} == {"cat", "dog"}
+    assert {c["prompt_idx"] for c in combos} == {0, 1}
+    assert {c["steps"] for c in combos} == {config.steps}
+    # 种子变化最快：同一组参数的不同种子相邻，便于在对比图中逐行比较
+    assert [c["seed"] for c in combos[:2]] == [1, 2]
+    assert combos[0]["cfg_scale"] == combos[1]["cfg_scale"]
+    assert len({tuple(sorted(c.items())) for c in combos}) == len(combos)
+
+
+def test_build_combinations_defaults_to_current_parameters():
+    config = GenerationConfig(prompt="base", seed=3, sweep_prompts="", sweep_seeds="", sweep_cfg="", sweep_steps="",
+                              sweep_strength="")
+    assert build_combinations(config) == [{
+        "prompt_idx": 0, "prompt": "base", "seed": 3, "cfg_scale": config.cfg_scale, "steps": config.steps,
+        "denoising_strength": config.denoising_strength,
+    }]
+
+
+def test_pose_mode_ignores_strength_sweep():
+    config = GenerationConfig(enable_pose=True, sweep_prompts="", sweep_seeds="1,2", sweep_cfg="", sweep_steps="",
+                              sweep_strength="0.2,0.4,0.6")
+    combos = build_combinations(config)
+    assert len(combos) == 2
+    assert {c["denoising_strength"] for c in combos} == {config.denoising_strength}
@@ -0,0 +1,47 @@
+import types
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from core.vae_decode import VAEDecodeStage, run_safety_checker  # noqa: E402
+
+
+class FakeVAE:
+    config = types.SimpleNamespace(scaling_factor=1.0)
+
+    def decode(self, latents, return_dict=False):
+        return (torch.full((1, 3, 4, 6), 0.5),)
+
+
+def make_pipe(flag=None):
+    pipe = types.SimpleNamespace(vae=FakeVAE(), safety_checker=None, checked=0)
+    if flag is not None:
+        def run(image, device, dtype):
+            pipe.checked += 1
+            return torch.zeros_like(image) if flag else image, [flag]
+
+        pipe.safety_checker = object()
+        pipe.run_safety_checker = run
+    return pipe
+
+
+def test_without_checker_image_is_untouched():
+    image = torch.ones(1, 3, 2, 2)
+    assert run_safety_checker(make_pipe(), image) == (image, False)
+
+
+@pytest.mark.parametrize("flag", [False, True])
+def test_separate_decode_runs_the_safety_checker(flag):
+    pipe = make_pipe(flag)
+    stage = VAEDecodeStage(pipe, overlap=False)
+    rgb = stage.decode(torch.zeros(1, 4, 1, 1))
+
+    assert pipe.checked == 1
+    assert rgb.shape == (4, 6, 3)
+    if flag:
+        assert rgb.max() == 0  # 与管线一致：被判定的帧输出为全黑
+        assert "拦截 1 帧" in stage.summary()
+    else:
+        assert rgb.min() == 191
+        assert stage.flagged == 0